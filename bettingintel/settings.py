@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 import django_heroku
 from dotenv import load_dotenv
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',  # First, so its latency covers the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,7 +50,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'core.middleware.AutoScraperMiddleware',
     'core.middleware.RedirectDefaultDomainMiddleware',
 ]
 
@@ -64,6 +65,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.cache_version',
             ],
         },
     },
@@ -79,12 +81,35 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+# Shared by every gunicorn worker and the scheduler: a table in the main database
+# (create it with `manage.py createcachetable`), or Redis when REDIS_URL is set.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'bettingintel_cache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+# Ceiling for cached public pages; new scrapes invalidate them sooner (see core/cache.py)
+PAGE_CACHE_TIMEOUT = 600
+# Request sampling for the dashboard performance page (see core/perf.py for the other knobs)
+PERF_SAMPLE_RATE = float(os.getenv('PERF_SAMPLE_RATE', '0.1'))
+
+# Sitemap files are rebuilt when their section changes; this only bounds how long an unused one lingers
+SITEMAP_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Scraped pages and their validators, so unchanged pages are not parsed again (see predictions/httpcache.py)
+SCRAPER_CACHE_DIR = os.getenv('SCRAPER_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'bettingintel-scraper-cache'))
+SCRAPER_CACHE_MAX_BYTES = 50 * 2 ** 20
 
 
 AUTH_PASSWORD_VALIDATORS = [
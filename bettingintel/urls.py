@@ -1,16 +1,8 @@
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from core.views import index, hilltop_verification  # Import index directly for the homepage
-from django.contrib.sitemaps.views import sitemap
-from core.views import index, ads_txt, robots_txt # Import new views
-from core.sitemaps import StaticViewSitemap, MatchSitemap
-
-# Define Sitemaps Dictionary
-sitemaps = {
-    'static': StaticViewSitemap,
-    'matches': MatchSitemap,
-}
+from core.views import index, ads_txt, robots_txt, sitemap_index, sitemap_section # Import new views
 urlpatterns = [
     path('admin/', admin.site.urls),
 
@@ -28,6 +20,8 @@ urlpatterns = [
     path('news/', include('news.urls')),
     path('ads.txt', ads_txt, name='ads_txt'),
     path('robots.txt', robots_txt, name='robots_txt'),
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    # Sitemap index plus one cached file per section (see core/sitemaps.py)
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    re_path(r'^sitemap-(?P<section>static|news|matches-\d{4}-\d{2})\.xml$', sitemap_section, name='sitemap_section'),
 path('9ba727961954f1830b3b.txt', hilltop_verification),
 ]
\ No newline at end of file
@@ -1,3 +1,36 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import JobLock, JobRun, RequestSample, ScrapeRun, ScrapeSourceRun
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    list_display = ('job', 'status', 'trigger', 'created_at', 'started_at', 'finished_at', 'worker')
+    list_filter = ('job', 'status', 'trigger')
+    readonly_fields = ('created_at',)
+
+
+@admin.register(JobLock)
+class JobLockAdmin(admin.ModelAdmin):
+    list_display = ('name', 'owner', 'acquired_at', 'expires_at')
+
+
+@admin.register(RequestSample)
+class RequestSampleAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'view_name', 'method', 'status', 'duration_ms', 'queries', 'db_ms', 'render_ms')
+    list_filter = ('view_name', 'status')
+
+
+class ScrapeSourceRunInline(admin.TabularInline):
+    model = ScrapeSourceRun
+    extra = 0
+    fields = ('source', 'http_status', 'unchanged', 'fetch_ms', 'rows_seen', 'rows_parsed', 'rejected',
+              'matches_created', 'items_created', 'items_updated', 'db_ms', 'total_ms', 'error')
+    readonly_fields = fields
+
+
+@admin.register(ScrapeRun)
+class ScrapeRunAdmin(admin.ModelAdmin):
+    list_display = ('command', 'started_at', 'finished_at')
+    list_filter = ('command',)
+    inlines = [ScrapeSourceRunInline]
@@ -0,0 +1,110 @@
+"""
+Page and fragment caching for the public views.
+
+Everything cached here is keyed on a global data version. Ingestion bumps
+that version when its transaction commits, so every cached page and fragment
+built from older data is simply never looked up again. The timeout is only a
+ceiling: pages such as the index also depend on the clock (matches drop off
+once they kick off), so they should not outlive a few minutes even when no
+scrape has run.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, QueryDict
+from django.utils import timezone
+
+DATA_VERSION_KEY = 'data-version'
+DATA_MODIFIED_KEY = 'data-modified'
+
+# Query parameters that change what the public pages show; anything else (utm_*, fbclid...) is ignored
+PAGE_PARAMS = ('league', 'date', 'from', 'to', 'cursor')
+
+
+def data_version():
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        # Seeded from the clock so a cleared cache never revives pages stored under an old version
+        cache.add(DATA_VERSION_KEY, int(time.time()), None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def data_last_modified():
+    """When scraped data last changed; Last-Modified of the site-wide listings."""
+    modified = cache.get(DATA_MODIFIED_KEY)
+    if modified is None:
+        # Unknown (cache cleared): claim "now" so clients revalidate once
+        cache.add(DATA_MODIFIED_KEY, timezone.now(), None)
+        modified = cache.get(DATA_MODIFIED_KEY)
+    return modified
+
+
+def bump_data_version():
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        cache.set(DATA_VERSION_KEY, int(time.time()), None)
+    cache.set(DATA_MODIFIED_KEY, timezone.now(), None)
+
+
+def bump_data_version_on_commit():
+    """Invalidates cached pages once the surrounding transaction commits (or now, outside one)."""
+    transaction.on_commit(bump_data_version)
+
+
+def page_key(request, params=PAGE_PARAMS):
+    query = "&".join(f"{name}={request.GET.get(name, '')}" for name in params)
+    digest = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    return f"page:{data_version()}:{digest}"
+
+
+def page_query(query, params=PAGE_PARAMS):
+    """`query` reduced to the values page_key() reads, so the page renders the same for every request with that key."""
+    kept = QueryDict(mutable=True)
+    for name in params:
+        if query.get(name):
+            kept[name] = query.get(name)
+    kept._mutable = False
+    return kept
+
+
+def cache_public_page(view=None, params=PAGE_PARAMS, timeout=None):
+    """
+    Caches a view's response for anonymous GET/HEAD requests, keyed on the path,
+    the given query parameters and the data version. Signed-in users always get
+    a fresh page because base.html renders their account links.
+
+    The view sees only those parameters: links built from request.GET (param_replace) and
+    the canonical URL would otherwise bake one visitor's utm_*/fbclid into the page
+    everyone else is served.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+
+            key = page_key(request, params)
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            request.GET = page_query(request.GET, params)
+            # build_absolute_uri (canonical and og:url in base.html) reads the raw query string
+            request.META['QUERY_STRING'] = request.GET.urlencode()
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                if hasattr(response, 'render'):
+                    response.render()
+                page_timeout = settings.PAGE_CACHE_TIMEOUT if timeout is None else timeout
+                cache.set(key, (response.content, response['Content-Type']), page_timeout)
+            return response
+        return wrapper
+
+    return decorator(view) if view else decorator
@@ -0,0 +1,82 @@
+"""
+Conditional GET for the public pages.
+
+Each page gets a cheap "last modified" lookup: the match or league
+updated_at column, or for the site-wide listings the time the scraped data
+last changed (core.cache). Django's condition() turns it into Last-Modified
+and ETag headers and answers 304 Not Modified before the view runs its
+queries. The ETag also carries the viewer, because base.html renders
+different navigation for signed-in users.
+"""
+import hashlib
+
+from django.db.models import Max
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from predictions.models import League, Match, MatchSnapshot
+from predictions.snapshots import build_snapshots
+
+from .cache import data_last_modified
+
+
+def conditional_page(last_modified):
+    """
+    condition() driven by `last_modified(request, *args, **kwargs)`, which is looked up
+    once per request. Returning None (e.g. unknown slug) lets the view run and 404.
+    """
+    def modified(request, *args, **kwargs):
+        if not hasattr(request, '_last_modified'):
+            request._last_modified = last_modified(request, *args, **kwargs)
+        return request._last_modified
+
+    def etag(request, *args, **kwargs):
+        value = modified(request, *args, **kwargs)
+        if value is None:
+            return None
+        viewer = request.user.pk if request.user.is_authenticated else 0
+        return hashlib.md5(f"{value.isoformat()}:{viewer}:{request.get_full_path()}".encode()).hexdigest()
+
+    return condition(etag_func=etag, last_modified_func=modified)
+
+
+def match_modified(request, slug):
+    """
+    The later of the match's updated_at and its snapshot's build time, as source accuracy
+    changes drop the snapshot without touching the match. A missing snapshot is built here,
+    where the view would build it anyway, so the first response already has a stable ETag.
+    """
+    row = Match.objects.filter(slug=slug).values_list('id', 'updated_at', 'snapshot__built_at').first()
+    if row is None:
+        return None
+    match_id, updated_at, built_at = row
+    if built_at is None:
+        build_snapshots([match_id])
+        built_at = MatchSnapshot.objects.filter(match_id=match_id).values_list('built_at', flat=True).first()
+    return max(updated_at, built_at or updated_at)
+
+
+def league_modified(request, league_slug):
+    """The league's updated_at, or its latest kickoff if later: that match left the upcoming page."""
+    league = League.objects.filter(slug=league_slug).values_list('id', 'updated_at').first()
+    if league is None:
+        return None
+    last_kickoff = Match.objects.filter(league_id=league[0], status='scheduled', start_time__lte=timezone.now()) \
+        .aggregate(last=Max('start_time'))['last']
+    return max(filter(None, [league[1], last_kickoff]))
+
+
+def news_modified(request):
+    return data_last_modified()
+
+
+def listing_modified(request):
+    """
+    Upcoming-match listings also change with the clock: a match drops off at kickoff and
+    "today" moves at midnight. Whichever happened last counts as a modification.
+    """
+    now = timezone.now()
+    last_kickoff = Match.objects.filter(status='scheduled', start_time__lte=now) \
+        .aggregate(last=Max('start_time'))['last']
+    midnight = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(filter(None, [data_last_modified(), last_kickoff, midnight]))
@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cache import data_version
+
+
+def cache_version(request):
+    """Exposes the data version for {% cache %} fragments; only read if a template uses it."""
+    return {'data_version': SimpleLazyObject(data_version)}
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.perf import prune, setting
+
+
+class Command(BaseCommand):
+    help = 'Delete performance samples older than PERF_RETENTION_DAYS.'
+
+    def handle(self, *args, **options):
+        deleted = prune()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} request samples older than {setting('PERF_RETENTION_DAYS')} days"))
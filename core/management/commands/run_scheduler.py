@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core.scheduler import get_jobs, tick, worker_id
+
+
+class Command(BaseCommand):
+    help = 'Run scheduled jobs (scrapers) on their intervals, plus any queued from the dashboard. Meant for the Procfile worker.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run whatever is due, then exit (for cron).')
+        parser.add_argument('--poll', type=int, default=30, help='Seconds between checks for due or queued jobs.')
+        parser.add_argument('--job', action='append', dest='jobs', metavar='NAME',
+                            help='Only run this job (repeatable).')
+
+    def handle(self, *args, **options):
+        unknown = set(options['jobs'] or ()) - set(get_jobs())
+        if unknown:
+            raise CommandError(f"Unknown job(s): {', '.join(sorted(unknown))}")
+
+        owner = worker_id()
+        self.stdout.write(f"Scheduler {owner} started: {', '.join(get_jobs())}")
+
+        try:
+            while True:
+                close_old_connections()
+                for run in tick(owner, only=options['jobs']):
+                    style = self.style.SUCCESS if run.status == run.SUCCEEDED else self.style.ERROR
+                    self.stdout.write(style(f"{run.job}: {run.status} in {run.duration}"))
+                if options['once']:
+                    break
+                time.sleep(options['poll'])
+        except KeyboardInterrupt:
+            self.stdout.write("Scheduler stopped.")
@@ -1,8 +1,11 @@
-import threading
-from django.core.cache import cache
-from django.core.management import call_command
-from django.contrib import messages
+import random
+import time
+
+from django.db import connection
 from django.http import HttpResponsePermanentRedirect
+from django.utils import timezone
+
+from . import perf
 
 
 class RedirectDefaultDomainMiddleware:
@@ -24,49 +27,56 @@ class RedirectDefaultDomainMiddleware:
         response = self.get_response(request)
         return response
 
-class AutoScraperMiddleware:
+
+class PerformanceMiddleware:
+    """
+    Records view name, SQL count and time, template render time, response size and latency
+    for a sampled fraction of requests (see core/perf.py). Unsampled requests cost one
+    random() call; samples are written after the response is sent.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
+        perf.install_render_timer()
+        perf.install_flush()
 
     def __call__(self, request):
-        # 1. Check if the user is a Superuser
-        # 2. Check if they are visiting the Dashboard (we don't want this running on Home)
-        if request.user.is_authenticated and request.user.is_superuser and request.path == '/dashboard/':
-
-            # 3. Check the "Cooldown" Lock
-            # We check if 'is_scraping' exists in the cache.
-            if not cache.get('is_scraping_active'):
+        if random.random() >= perf.setting('PERF_SAMPLE_RATE'):
+            return self.get_response(request)
 
-                # Create a background thread so the page loads INSTANTLY
-                scraper_thread = threading.Thread(target=self.run_background_jobs)
-                scraper_thread.daemon = True  # Ensures thread dies if server stops
-                scraper_thread.start()
+        statements = []
 
-                # Inform the user (Optional - shows on NEXT refresh)
-                messages.info(request, "Auto-Scraper started in background! Refresh in 1 minute to see results.")
-            else:
-                print("Scraper is already running or on cooldown.")
+        def timed(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                statements.append((sql, time.perf_counter() - started))
 
-        response = self.get_response(request)
-        return response
-
-    def run_background_jobs(self):
-        """
-        This runs in the background.
-        """
+        render = [0.0]
+        token = perf.current_render.set(render)
+        started = time.perf_counter()
         try:
-            # SET THE LOCK (Prevent others from running for 60 minutes)
-            # 3600 seconds = 1 hour. Change this to 300 for 5 minutes.
-            print("--- MIDDLEWARE: Starting Scrapers ---")
-            cache.set('is_scraping_active', True, 3600)
-
-            # Run the Master Commands
-            call_command('scrape_all')  # Football Matches
-            call_command('scrape_news')  # Pulse Sports News
+            with connection.execute_wrapper(timed):
+                response = self.get_response(request)
+        finally:
+            perf.current_render.reset(token)
+        duration_ms = (time.perf_counter() - started) * 1000
 
-            print("--- MIDDLEWARE: Scrapers Finished ---")
-
-        except Exception as e:
-            print(f"Middleware Scraper Error: {e}")
-            # If it fails, release the lock so we can try again
-            cache.delete('is_scraping_active')
\ No newline at end of file
+        slow = duration_ms >= perf.setting('PERF_SLOW_MS')
+        match = request.resolver_match
+        perf.buffer.add({
+            'created_at': timezone.now(),
+            'view_name': (match.view_name if match else '') or '(unresolved)',
+            'path': request.path[:255],
+            'method': request.method,
+            'status': response.status_code,
+            'duration_ms': duration_ms,
+            'queries': len(statements),
+            'db_ms': sum(elapsed for _, elapsed in statements) * 1000,
+            'render_ms': render[0] * 1000,
+            'response_bytes': 0 if response.streaming else len(response.content),
+            'sql': [[sql, round(elapsed * 1000, 2)]
+                    for sql, elapsed in sorted(statements, key=lambda s: -s[1])[:perf.MAX_SQL]] if slow else [],
+        })
+        return response
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_requestsample'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('command', models.CharField(max_length=50)),
+                ('started_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScrapeSourceRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50)),
+                ('url', models.URLField(max_length=500)),
+                ('error', models.TextField(blank=True)),
+                ('http_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('fetch_ms', models.FloatField(default=0.0)),
+                ('bytes', models.PositiveIntegerField(default=0)),
+                ('parse_ms', models.FloatField(default=0.0)),
+                ('rows_seen', models.PositiveIntegerField(default=0)),
+                ('rows_parsed', models.PositiveIntegerField(default=0)),
+                ('rejected', models.JSONField(blank=True, default=dict)),
+                ('matches_created', models.PositiveIntegerField(default=0)),
+                ('matches_matched', models.PositiveIntegerField(default=0)),
+                ('items_created', models.PositiveIntegerField(default=0)),
+                ('items_updated', models.PositiveIntegerField(default=0)),
+                ('db_ms', models.FloatField(default=0.0)),
+                ('total_ms', models.FloatField(default=0.0)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sources', to='core.scraperun')),
+            ],
+            options={
+                'ordering': ['-run__started_at'],
+                'indexes': [models.Index(fields=['source', 'run'], name='core_scrape_source_3fbfd1_idx')],
+            },
+        ),
+    ]
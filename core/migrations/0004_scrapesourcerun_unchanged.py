@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_scraperun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapesourcerun',
+            name='unchanged',
+            field=models.BooleanField(default=False),
+        ),
+    ]
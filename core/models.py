@@ -1,3 +1,127 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class JobRun(models.Model):
+    """One run of a scheduled job (see core.scheduler), queued from the dashboard or due by its interval."""
+    QUEUED, RUNNING, SUCCEEDED, FAILED = 'queued', 'running', 'succeeded', 'failed'
+    STATUS_CHOICES = ((QUEUED, 'Queued'), (RUNNING, 'Running'), (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed'))
+    TRIGGER_CHOICES = (('schedule', 'Schedule'), ('manual', 'Manual'))
+
+    job = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    trigger = models.CharField(max_length=20, choices=TRIGGER_CHOICES, default='schedule')
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    output = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['job', 'status'])]
+
+    @property
+    def duration(self):
+        if self.started_at and self.finished_at:
+            return self.finished_at - self.started_at
+        return None
+
+    def __str__(self):
+        return f"{self.job} ({self.status}) {self.created_at:%Y-%m-%d %H:%M}"
+
+
+class JobLock(models.Model):
+    """Cross-process lock row; held by `owner` until `expires_at`."""
+    name = models.CharField(max_length=50, primary_key=True)
+    owner = models.CharField(max_length=100, blank=True)
+    acquired_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} held by {self.owner or 'nobody'} until {self.expires_at:%H:%M:%S}"
+
+
+class RequestSample(models.Model):
+    """Timing of one sampled request, written in batches by core.middleware.PerformanceMiddleware."""
+    created_at = models.DateTimeField(db_index=True)
+    view_name = models.CharField(max_length=100)
+    path = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    status = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    queries = models.PositiveIntegerField()
+    db_ms = models.FloatField()
+    render_ms = models.FloatField()
+    response_bytes = models.PositiveIntegerField()
+    # [[sql, ms], ...] for slow requests only
+    sql = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['view_name', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.method} {self.path} {self.duration_ms:.0f}ms"
+
+
+class ScrapeRun(models.Model):
+    """One invocation of a scraper command (scrape_all, scrape_tips, scrape_news)."""
+    command = models.CharField(max_length=50)
+    started_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def finish(self):
+        self.finished_at = timezone.now()
+        self.save(update_fields=['finished_at'])
+
+    def __str__(self):
+        return f"{self.command} {self.started_at:%Y-%m-%d %H:%M}"
+
+
+class ScrapeSourceRun(models.Model):
+    """What one source produced in a ScrapeRun, stage by stage. Times are in milliseconds."""
+    run = models.ForeignKey(ScrapeRun, related_name='sources', on_delete=models.CASCADE)
+    source = models.CharField(max_length=50)  # Adapter key, or 'pulsesports' for news
+    url = models.URLField(max_length=500)
+    error = models.TextField(blank=True)
+    # The page was the same as last run, so it was neither parsed nor written
+    unchanged = models.BooleanField(default=False)
+
+    # Fetch
+    http_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    fetch_ms = models.FloatField(default=0.0)
+    bytes = models.PositiveIntegerField(default=0)
+
+    # Parse
+    parse_ms = models.FloatField(default=0.0)
+    rows_seen = models.PositiveIntegerField(default=0)
+    rows_parsed = models.PositiveIntegerField(default=0)
+    # {reason: count} across parsing and ingestion, e.g. {"no teams": 2, "kickoff passed": 5}
+    rejected = models.JSONField(default=dict, blank=True)
+
+    # Write
+    matches_created = models.PositiveIntegerField(default=0)
+    matches_matched = models.PositiveIntegerField(default=0)
+    items_created = models.PositiveIntegerField(default=0)  # Tips, or articles for news
+    items_updated = models.PositiveIntegerField(default=0)
+    db_ms = models.FloatField(default=0.0)
+    total_ms = models.FloatField(default=0.0)
+
+    class Meta:
+        ordering = ['-run__started_at']
+        indexes = [models.Index(fields=['source', 'run'])]
+
+    @property
+    def rows_rejected(self):
+        return sum(self.rejected.values())
+
+    def __str__(self):
+        return f"{self.source} in {self.run}"
@@ -0,0 +1,125 @@
+"""
+Keyset (cursor) pagination for the public listings.
+
+Paginator counts every row and skips `offset` rows on each page, so deep pages
+cost more than shallow ones and crawlers walk them all. Here each page instead
+continues from the (timestamp, id) of the row it stopped at. That is one
+indexed range scan per page, whatever the depth. Cursors are opaque strings in
+the query string; a missing or tampered one gives the first page.
+"""
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .cache import data_version
+
+CURSOR_PARAM = 'cursor'
+
+
+def encode_cursor(moment, pk, backwards=False):
+    raw = json.dumps([moment.isoformat(), pk, int(backwards)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Returns (moment, pk, backwards), or None if the cursor is not one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        moment, pk, backwards = json.loads(raw)
+        moment = parse_datetime(moment)
+        if moment is None or not isinstance(pk, int):
+            return None
+        return moment, pk, bool(backwards)
+    except (ValueError, TypeError):
+        return None
+
+
+class KeysetPage:
+    """
+    One page of rows plus cursors to its neighbours. Quacks enough like a
+    Paginator page (iteration, has_next/has_previous, has_other_pages) for the
+    templates; `count` is the total when the view asked for it, else None.
+    """
+
+    def __init__(self, rows, field, next_cursor=None, previous_cursor=None, count=None):
+        self.object_list = rows
+        self.field = field
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def cached_count(queryset, key):
+    """
+    COUNT(*) of `queryset`, cached under `key` and the data version, so it runs once
+    per filter combination per scrape rather than on every page view. `key` names the
+    filters rather than hashing the SQL, which embeds "now" for the upcoming listings;
+    the page cache timeout bounds how stale a count gets as matches kick off.
+    """
+    digest = hashlib.md5(key.encode()).hexdigest()
+    return cache.get_or_set(f"count:{data_version()}:{digest}", queryset.count, settings.PAGE_CACHE_TIMEOUT)
+
+
+def paginate(queryset, cursor, per_page, order, count_key=None):
+    """
+    Returns the KeysetPage of `queryset` after `cursor`.
+
+    `order` is a DateTimeField name, prefixed with '-' for newest first; the
+    primary key breaks ties, so the pair is unique and no row is skipped or
+    repeated when several share a timestamp. Pass `count_key` for a cached total.
+    """
+    descending = order.startswith('-')
+    field = order.lstrip('-')
+    position = decode_cursor(cursor) if cursor else None
+    backwards = bool(position and position[2])
+
+    # Walking backwards flips both the comparison and the sort, then the rows are put back in order
+    forward = descending == backwards
+    after = 'gt' if forward else 'lt'
+    rows = queryset.order_by(f"{'' if forward else '-'}{field}", f"{'' if forward else '-'}pk")
+    if position:
+        moment, pk = position[:2]
+        rows = rows.filter(Q(**{f"{field}__{after}": moment}) | Q(**{field: moment, f"pk__{after}": pk}))
+
+    rows = list(rows[:per_page + 1])
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    def key(row, back):
+        # Model instances, or values() dicts that include the key field and 'id'
+        if isinstance(row, dict):
+            return encode_cursor(row[field], row['id'], back)
+        return encode_cursor(getattr(row, field), row.pk, back)
+
+    # Coming back from a later page means there is a next one; the reverse for previous
+    has_next = (more if not backwards else True) and bool(rows)
+    has_previous = (more if backwards else position is not None) and bool(rows)
+    return KeysetPage(
+        rows,
+        field,
+        next_cursor=key(rows[-1], False) if has_next else None,
+        previous_cursor=key(rows[0], True) if has_previous else None,
+        count=cached_count(queryset, count_key) if count_key else None,
+    )
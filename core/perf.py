@@ -0,0 +1,170 @@
+"""
+Per-request performance samples.
+
+PerformanceMiddleware (core.middleware) measures a sampled fraction of
+requests and appends each sample to an in-process ring buffer. Once the
+response has been sent (request_finished), the buffer is written to
+RequestSample with one bulk INSERT if it holds PERF_FLUSH_SIZE samples or
+PERF_FLUSH_INTERVAL seconds have passed, so no visitor waits on the write.
+If the database is unavailable the oldest samples are simply dropped, never
+the request. Old samples are deleted by the prune_request_samples job.
+
+Settings, all optional:
+    PERF_SAMPLE_RATE     fraction of requests measured (0 disables)
+    PERF_BUFFER_SIZE     ring buffer capacity per process
+    PERF_FLUSH_SIZE      samples per batch insert
+    PERF_FLUSH_INTERVAL  seconds before a partial batch is written anyway
+    PERF_SLOW_MS         requests at least this slow keep their SQL
+    PERF_RETENTION_DAYS  samples older than this are deleted by prune_request_samples
+"""
+import contextvars
+import math
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.template.backends.django import Template
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'PERF_SAMPLE_RATE': 0.1,
+    'PERF_BUFFER_SIZE': 1000,
+    'PERF_FLUSH_SIZE': 50,
+    'PERF_FLUSH_INTERVAL': 60,
+    'PERF_SLOW_MS': 500,
+    'PERF_RETENTION_DAYS': 7,
+}
+# Keep at most this many statements per slow request, slowest first
+MAX_SQL = 20
+
+
+def setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+# =====================================================
+# TEMPLATE RENDER TIME
+# =====================================================
+# Set by the middleware for sampled requests only; everything else pays one ContextVar.get()
+current_render = contextvars.ContextVar('current_render', default=None)
+_original_render = Template.render
+
+
+def _timed_render(self, context=None, request=None):
+    timer = current_render.get()
+    if timer is None:
+        return _original_render(self, context, request)
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        timer[0] += time.perf_counter() - started
+
+
+def install_render_timer():
+    # Only the backend Template is wrapped: {% include %} and {% extends %} render inside it
+    Template.render = _timed_render
+
+
+# =====================================================
+# RING BUFFER
+# =====================================================
+class SampleBuffer:
+    def __init__(self):
+        self.samples = deque(maxlen=setting('PERF_BUFFER_SIZE'))
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def add(self, sample):
+        self.samples.append(sample)
+
+    def flush_if_due(self):
+        if len(self.samples) >= setting('PERF_FLUSH_SIZE') or \
+                (self.samples and time.monotonic() - self.last_flush >= setting('PERF_FLUSH_INTERVAL')):
+            return self.flush()
+        return 0
+
+    def flush(self):
+        from .models import RequestSample
+
+        # Another thread already flushing just leaves its samples for the next batch
+        if not self.lock.acquire(blocking=False):
+            return 0
+        try:
+            batch = []
+            while self.samples:
+                batch.append(self.samples.popleft())
+            self.last_flush = time.monotonic()
+            if not batch:
+                return 0
+            try:
+                RequestSample.objects.bulk_create([RequestSample(**sample) for sample in batch])
+            except Exception as e:
+                logger.warning("Dropped %d performance samples: %s", len(batch), e)
+                return 0
+            return len(batch)
+        finally:
+            self.lock.release()
+
+
+buffer = SampleBuffer()
+
+
+def _flush_after_response(**kwargs):
+    buffer.flush_if_due()
+
+
+def install_flush():
+    # request_finished fires when the server closes the response, after the body went out
+    request_finished.connect(_flush_after_response, dispatch_uid='core.perf.flush')
+
+
+def prune(now=None):
+    """Deletes samples older than PERF_RETENTION_DAYS. Returns how many went."""
+    from .models import RequestSample
+
+    cutoff = (now or timezone.now()) - timedelta(days=setting('PERF_RETENTION_DAYS'))
+    deleted, _ = RequestSample.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+# =====================================================
+# REPORTING
+# =====================================================
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def view_stats(rows):
+    """rows: (view_name, duration_ms, queries, db_ms). Returns per-view p50/p95/p99, slowest p99 first."""
+    by_view = {}
+    for view_name, duration, queries, db_ms in rows:
+        stats = by_view.setdefault(view_name, {'durations': [], 'queries': [], 'db_ms': 0.0})
+        stats['durations'].append(duration)
+        stats['queries'].append(queries)
+        stats['db_ms'] += db_ms
+
+    report = []
+    for view_name, stats in by_view.items():
+        durations, queries = sorted(stats['durations']), sorted(stats['queries'])
+        report.append({
+            'view': view_name,
+            'count': len(durations),
+            'p50': percentile(durations, 50),
+            'p95': percentile(durations, 95),
+            'p99': percentile(durations, 99),
+            'queries_p50': percentile(queries, 50),
+            'queries_max': queries[-1],
+            'db_avg': stats['db_ms'] / len(durations),
+        })
+    return sorted(report, key=lambda row: row['p99'], reverse=True)
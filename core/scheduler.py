@@ -0,0 +1,176 @@
+"""
+Background job scheduling.
+
+Scrapers run in their own `manage.py run_scheduler` process (the Procfile
+`worker`), never inside a web worker. Every job has an interval; the
+dashboard can also queue a run, which the scheduler picks up on its next
+tick. A JobLock row stops two scheduler processes from running the same job
+at once, and every run is recorded as a JobRun. A running job renews its lock
+in the background, so the lock only lapses when the worker is gone.
+"""
+import io
+import logging
+import os
+import socket
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .models import JobLock, JobRun
+
+logger = logging.getLogger(__name__)
+
+# Overridable with settings.SCHEDULER_JOBS. `timeout` is how long the lock is held without
+# a heartbeat before another worker may assume the run died; a live run renews it every third of that.
+DEFAULT_JOBS = {
+    'scrape_all': {'command': 'scrape_all', 'interval': timedelta(hours=1), 'timeout': timedelta(hours=1)},
+    'scrape_news': {'command': 'scrape_news', 'interval': timedelta(minutes=30), 'timeout': timedelta(minutes=15)},
+    'settle_matches': {'command': 'settle_matches', 'interval': timedelta(hours=1), 'timeout': timedelta(minutes=30)},
+    'prune_request_samples': {'command': 'prune_request_samples', 'interval': timedelta(days=1),
+                              'timeout': timedelta(minutes=15)},
+}
+
+# Keep the tail of a command's output, the end is where the summary and errors are
+OUTPUT_LIMIT = 20000
+
+
+def get_jobs():
+    return getattr(settings, 'SCHEDULER_JOBS', DEFAULT_JOBS)
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lock(name, owner, ttl):
+    """Takes the named lock if it is free or expired. Safe across processes: the claim is one conditional UPDATE."""
+    now = timezone.now()
+    JobLock.objects.get_or_create(name=name, defaults={'expires_at': now})
+    claimed = JobLock.objects.filter(name=name).filter(Q(expires_at__lte=now) | Q(owner=owner)) \
+        .update(owner=owner, acquired_at=now, expires_at=now + ttl)
+    return bool(claimed)
+
+
+def renew_lock(name, owner, ttl):
+    """Pushes out the expiry of a lock `owner` still holds. Returns False if it has lost it."""
+    return bool(JobLock.objects.filter(name=name, owner=owner).update(expires_at=timezone.now() + ttl))
+
+
+@contextmanager
+def lock_heartbeat(name, owner, ttl):
+    """
+    Renews the lock every ttl/3 on a background thread for as long as the block runs.
+    Yields an Event that is set if the lock was lost (taken by another worker) meanwhile.
+    """
+    stop, lost = threading.Event(), threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(ttl.total_seconds() / 3):
+                try:
+                    held = renew_lock(name, owner, ttl)
+                except Exception:
+                    # A blip in the database; the next beat tries again on a fresh connection
+                    logger.exception("Could not renew the %s lock", name)
+                    connection.close_if_unusable_or_obsolete()
+                    continue
+                if not held:
+                    logger.warning("%s lost the %s lock; another worker may now run it too", owner, name)
+                    lost.set()
+                    break
+        finally:
+            # The thread had its own connection; don't leave it open
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"lock-heartbeat:{name}", daemon=True)
+    thread.start()
+    try:
+        yield lost
+    finally:
+        stop.set()
+        thread.join()
+
+
+def release_lock(name, owner):
+    JobLock.objects.filter(name=name, owner=owner).update(owner='', expires_at=timezone.now())
+
+
+def queue_job(name, user=None):
+    """
+    Asks the scheduler to run `name` on its next tick. Returns (run, created);
+    a run that is already queued or running is returned instead of a duplicate.
+    """
+    if name not in get_jobs():
+        raise KeyError(f"Unknown job '{name}'")
+
+    pending = JobRun.objects.filter(job=name, status__in=[JobRun.QUEUED, JobRun.RUNNING]).first()
+    if pending:
+        return pending, False
+    return JobRun.objects.create(job=name, trigger='manual', requested_by=user), True
+
+
+def due_jobs(now):
+    """Job names with a queued run, or whose last run started at least one interval ago."""
+    jobs = get_jobs()
+    queued = set(JobRun.objects.filter(status=JobRun.QUEUED).values_list('job', flat=True))
+    last_started = dict(JobRun.objects.filter(started_at__isnull=False).values_list('job')
+                        .annotate(last=Max('started_at')).values_list('job', 'last'))
+
+    return [name for name, job in jobs.items()
+            if name in queued or name not in last_started or last_started[name] + job['interval'] <= now]
+
+
+def run_job(name, owner):
+    """Runs one job under its lock and records it. Returns the JobRun, or None if another worker holds the lock."""
+    job = get_jobs()[name]
+    if not acquire_lock(name, owner, job['timeout']):
+        return None
+
+    try:
+        # We hold the lock and live runs keep theirs renewed, so a run another worker
+        # still has marked running belongs to a worker that died
+        JobRun.objects.filter(job=name, status=JobRun.RUNNING).exclude(worker=owner) \
+            .update(status=JobRun.FAILED, finished_at=timezone.now(), error="Interrupted: worker stopped")
+
+        run = JobRun.objects.filter(job=name, status=JobRun.QUEUED).order_by('created_at').first()
+        if run is None:
+            run = JobRun(job=name)
+        run.status, run.started_at, run.worker = JobRun.RUNNING, timezone.now(), owner
+        run.save()
+
+        output = io.StringIO()
+        try:
+            with lock_heartbeat(name, owner, job['timeout']) as lost:
+                call_command(job['command'], *job.get('args', ()), stdout=output, stderr=output)
+            run.status = JobRun.SUCCEEDED
+            if lost.is_set():
+                run.error = "Lock lost during the run: another worker may have run this job at the same time."
+        except Exception:
+            run.status = JobRun.FAILED
+            run.error = traceback.format_exc()
+
+        run.output = output.getvalue()[-OUTPUT_LIMIT:]
+        run.finished_at = timezone.now()
+        run.save()
+        return run
+    finally:
+        release_lock(name, owner)
+
+
+def tick(owner, now=None, only=None):
+    """Runs every due job once, in order. Returns the JobRuns this worker executed."""
+    runs = []
+    for name in due_jobs(now or timezone.now()):
+        if only and name not in only:
+            continue
+        run = run_job(name, owner)
+        if run:
+            runs.append(run)
+    return runs
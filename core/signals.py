@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+
+from news.models import NewsArticle
+from predictions.models import League, Match, Source, Tip
+
+from .cache import bump_data_version_on_commit
+from .sitemaps import invalidate_matches_on_commit, invalidate_sections
+
+# Admin and dashboard edits. Bulk ingestion bypasses signals and invalidates explicitly.
+
+
+def invalidate_pages(sender, **kwargs):
+    bump_data_version_on_commit()
+
+
+def remember_match_kickoff(sender, instance, **kwargs):
+    # __dict__, so a match loaded without start_time (only()/defer()) costs no query
+    instance._loaded_start_time = instance.__dict__.get('start_time')
+
+
+def invalidate_match_sitemap(sender, instance, **kwargs):
+    # A rescheduled match also has to leave the month it was listed in
+    kickoffs = {instance.start_time, getattr(instance, '_loaded_start_time', None)} - {None}
+    invalidate_matches_on_commit(kickoffs)
+    instance._loaded_start_time = instance.start_time
+
+
+def invalidate_news_sitemap(sender, **kwargs):
+    transaction.on_commit(lambda: invalidate_sections(['news']))
+
+
+post_init.connect(remember_match_kickoff, sender=Match)
+for signal in (post_save, post_delete):
+    for model in (League, Match, Source, Tip, NewsArticle):
+        signal.connect(invalidate_pages, sender=model)
+    signal.connect(invalidate_match_sitemap, sender=Match)
+    signal.connect(invalidate_news_sitemap, sender=NewsArticle)
@@ -1,9 +1,33 @@
+"""
+Sitemaps.
+
+/sitemap.xml is an index of sections: the static pages, the news page and one
+section per calendar month of matches, each split into pages of SITEMAP_LIMIT
+URLs. Sections are rendered from values_list() iterators instead of model
+instances and cached under a per-section version. A section is only rebuilt
+after ingestion or an admin edit changes matches in its month.
+"""
+import hashlib
+import time
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncMonth
 from django.urls import reverse
-from predictions.models import Match
-from news.models import NewsArticle
 from django.utils import timezone
 
+from news.models import NewsArticle
+from predictions.models import Match
+
+# URLs per sitemap file; the protocol allows 50,000
+SITEMAP_LIMIT = 10000
+SLUG_PLACEHOLDER = 'sitemap-slug'
+
 
 class StaticViewSitemap(Sitemap):
     priority = 0.8
@@ -16,28 +40,147 @@ class StaticViewSitemap(Sitemap):
         return reverse(item)
 
 
-class MatchSitemap(Sitemap):
-    changefreq = 'hourly'  # Matches change status/consensus often
-    priority = 0.9
+# =====================================================
+# VERSIONS / INVALIDATION
+# =====================================================
+def _version_key(section):
+    return f"sitemap-version:{section}"
 
-    def items(self):
-        # Only index future matches or recently finished ones
-        return Match.objects.filter(status='scheduled')
 
-    def lastmod(self, obj):
-        return obj.start_time
+def section_version(section):
+    version = cache.get(_version_key(section))
+    if version is None:
+        cache.add(_version_key(section), int(time.time()), None)
+        version = cache.get(_version_key(section))
+    return version
 
 
-class NewsSitemap(Sitemap):
-    changefreq = 'weekly'
-    priority = 0.7
+def invalidate_sections(sections):
+    """Marks the given sections, and the index listing them, for rebuild on their next request."""
+    for section in set(sections) | {'index'}:
+        try:
+            cache.incr(_version_key(section))
+        except ValueError:
+            cache.set(_version_key(section), int(time.time()), None)
 
-    def items(self):
-        return NewsArticle.objects.all().order_by('-published_at')[:100]
-
-    # News articles don't have a Detail View in your app (they link externally),
-    # so we might technically skip this if you don't have internal pages for news.
-    # But if you add a detail page later, this logic applies.
-    # For now, since news links OUT, we usually don't map them in sitemap
-    # unless we have a local page for them.
-    # Let's keep matches as the priority.
\ No newline at end of file
+
+def match_section(start_time):
+    return f"matches-{timezone.localtime(start_time):%Y-%m}"
+
+
+def invalidate_matches_on_commit(start_times):
+    """Rebuilds the month sections of these kickoff times once the surrounding transaction commits."""
+    sections = {match_section(start_time) for start_time in start_times}
+    if sections:
+        transaction.on_commit(lambda: invalidate_sections(sections))
+
+
+# =====================================================
+# RENDERING
+# =====================================================
+def render_urlset(entries):
+    """Yields the XML of a <urlset> chunk by chunk; entries are (loc, lastmod, changefreq, priority)."""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for loc, lastmod, changefreq, priority in entries:
+        yield f"<url><loc>{escape(loc)}</loc>"
+        if lastmod:
+            yield f"<lastmod>{lastmod:%Y-%m-%d}</lastmod>"
+        yield f"<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n"
+    yield '</urlset>\n'
+
+
+def render_index(locations):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for loc in locations:
+        yield f"<sitemap><loc>{escape(loc)}</loc></sitemap>\n"
+    yield '</sitemapindex>\n'
+
+
+def month_counts():
+    """Matches per kickoff month, one grouped query."""
+    return Match.objects.annotate(month=TruncMonth('start_time')).values('month') \
+        .annotate(n=Count('id')).order_by('month')
+
+
+def section_pages():
+    """[(section, page)] for every sitemap file, from one grouped query over matches."""
+    pages = [('static', 1), ('news', 1)]
+    for row in month_counts():
+        section = f"matches-{row['month']:%Y-%m}"
+        pages.extend((section, page) for page in range(1, (row['n'] - 1) // SITEMAP_LIMIT + 2))
+    return pages
+
+
+def match_rows(section, page):
+    """(slug, updated_at, status) of one page of a month section, or None if `section` is not a month."""
+    try:
+        month = datetime.strptime(section, "matches-%Y-%m")
+    except ValueError:
+        return None
+    start = timezone.make_aware(month)
+    end = timezone.make_aware(month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1))
+    return Match.objects.filter(start_time__gte=start, start_time__lt=end).order_by('start_time', 'id') \
+        .values_list('slug', 'updated_at', 'status')[(page - 1) * SITEMAP_LIMIT:page * SITEMAP_LIMIT]
+
+
+def match_entries(section, page, base_url):
+    rows = match_rows(section, page)
+    if rows is None:
+        return None
+    # reverse() once, then substitute each slug
+    url = base_url + reverse('match_detail', kwargs={'slug': SLUG_PLACEHOLDER})
+
+    def entries():
+        for slug, updated_at, status in rows.iterator(chunk_size=2000):
+            if status == 'scheduled':
+                yield url.replace(SLUG_PLACEHOLDER, slug), updated_at, 'hourly', 0.9
+            else:
+                yield url.replace(SLUG_PLACEHOLDER, slug), updated_at, 'monthly', 0.5
+    return entries()
+
+
+def section_entries(section, page, base_url):
+    """Entries for one sitemap file, or None if the section does not exist."""
+    if section == 'static' and page == 1:
+        static = StaticViewSitemap()
+        return ((base_url + static.location(item), None, static.changefreq, static.priority)
+                for item in static.items())
+    if section == 'news' and page == 1:
+        # Articles link out to their publishers, so only our news page is listed
+        latest = NewsArticle.objects.aggregate(latest=Max('published_at'))['latest']
+        return [(base_url + reverse('news_list'), latest, 'hourly', 0.7)]
+    if section.startswith('matches-'):
+        return match_entries(section, page, base_url)
+    return None
+
+
+def _cached(section, page, base_url, build):
+    host = hashlib.md5(base_url.encode()).hexdigest()[:8]
+    key = f"sitemap:{section}:{page}:{section_version(section)}:{host}"
+    content = cache.get(key)
+    if content is None:
+        content = build()
+        if content is not None:
+            cache.set(key, content, settings.SITEMAP_CACHE_TIMEOUT)
+    return content
+
+
+def sitemap_index_xml(base_url):
+    def build():
+        locations = [base_url + reverse('sitemap_section', kwargs={'section': section}) + (f"?p={page}" if page > 1 else "")
+                     for section, page in section_pages()]
+        return "".join(render_index(locations)).encode()
+    return _cached('index', 1, base_url, build)
+
+
+def sitemap_section_xml(section, page, base_url):
+    """The cached XML of one sitemap file, or None if it does not exist."""
+    def build():
+        entries = section_entries(section, page, base_url)
+        if entries is None:
+            return None
+        content = "".join(render_urlset(entries))
+        if page > 1 and "<url>" not in content:
+            return None
+        return content.encode()
+    return _cached(section, page, base_url, build)
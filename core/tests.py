@@ -1,3 +1,414 @@
-from django.test import TestCase
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.signals import request_finished
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from predictions.ingestion import ingest_tips
+from predictions.models import League, Match, Source, Tip
+from predictions.settlement import ResultRow, record_results, settle
+from predictions.sources import ScrapedTip
+
+from . import perf
+from .cache import bump_data_version_on_commit, page_key
+from .middleware import PerformanceMiddleware
+from .models import JobLock, JobRun, RequestSample
+from .pagination import paginate
+from .scheduler import acquire_lock, due_jobs, queue_job, release_lock, renew_lock, run_job, tick
+from .sitemaps import section_version
+
+JOBS = {
+    'scrape_all': {'command': 'scrape_all', 'interval': timedelta(hours=1), 'timeout': timedelta(hours=1)},
+    'scrape_news': {'command': 'scrape_news', 'interval': timedelta(minutes=30), 'timeout': timedelta(minutes=15)},
+}
+
+
+@override_settings(SCHEDULER_JOBS=JOBS)
+class SchedulerTests(TestCase):
+    def test_lock_is_exclusive_until_released_or_expired(self):
+        self.assertTrue(acquire_lock('scrape_all', 'a', timedelta(minutes=5)))
+        self.assertFalse(acquire_lock('scrape_all', 'b', timedelta(minutes=5)))
+        release_lock('scrape_all', 'a')
+        self.assertTrue(acquire_lock('scrape_all', 'b', timedelta(minutes=5)))
+
+        JobLock.objects.filter(name='scrape_all').update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(acquire_lock('scrape_all', 'c', timedelta(minutes=5)))
+
+    def test_jobs_are_due_by_interval_or_queue(self):
+        now = timezone.now()
+        self.assertEqual(due_jobs(now), ['scrape_all', 'scrape_news'])
+
+        JobRun.objects.create(job='scrape_all', status=JobRun.SUCCEEDED, started_at=now - timedelta(minutes=10))
+        JobRun.objects.create(job='scrape_news', status=JobRun.SUCCEEDED, started_at=now - timedelta(minutes=40))
+        self.assertEqual(due_jobs(now), ['scrape_news'])
+
+        queue_job('scrape_all')
+        self.assertEqual(due_jobs(now), ['scrape_all', 'scrape_news'])
+
+    @mock.patch('core.scheduler.call_command')
+    def test_run_job_records_history(self, call):
+        call.side_effect = lambda name, *args, stdout, **kwargs: stdout.write("done")
+        queued, _ = queue_job('scrape_news')
+
+        run = run_job('scrape_news', 'worker-1')
+
+        self.assertEqual(run.pk, queued.pk)
+        self.assertEqual(run.status, JobRun.SUCCEEDED)
+        self.assertEqual(run.output, "done")
+        self.assertIsNotNone(run.duration)
+        # Lock is free again
+        self.assertTrue(acquire_lock('scrape_news', 'worker-2', timedelta(minutes=1)))
+
+    @mock.patch('core.scheduler.call_command', side_effect=RuntimeError("site down"))
+    def test_failed_job_is_recorded(self, call):
+        run = run_job('scrape_all', 'worker-1')
+        self.assertEqual(run.status, JobRun.FAILED)
+        self.assertIn("site down", run.error)
+
+    @mock.patch('core.scheduler.call_command')
+    def test_locked_job_is_skipped(self, call):
+        acquire_lock('scrape_all', 'other', timedelta(minutes=5))
+        runs = tick('worker-1', only=['scrape_all'])
+        self.assertEqual(runs, [])
+        call.assert_not_called()
+
+    @mock.patch('core.scheduler.call_command')
+    def test_run_scheduler_once(self, call):
+        call_command('run_scheduler', '--once', stdout=StringIO())
+        self.assertEqual(sorted(c.args[0] for c in call.call_args_list), ['scrape_all', 'scrape_news'])
+        self.assertEqual(JobRun.objects.filter(status=JobRun.SUCCEEDED).count(), 2)
+
+    def test_lock_is_renewed_while_the_job_runs(self):
+        jobs = {'slow': {'command': 'slow', 'interval': timedelta(hours=1), 'timeout': timedelta(seconds=0.06)}}
+
+        def slow(*args, **kwargs):
+            time.sleep(0.1)
+
+        with override_settings(SCHEDULER_JOBS=jobs), mock.patch('core.scheduler.call_command', side_effect=slow), \
+                mock.patch('core.scheduler.renew_lock') as renew:
+            self.assertEqual(run_job('slow', 'worker-1').status, JobRun.SUCCEEDED)
+        self.assertGreaterEqual(renew.call_count, 2)
+        renew.assert_called_with('slow', 'worker-1', timedelta(seconds=0.06))
+
+        acquire_lock('slow', 'worker-1', timedelta(minutes=5))
+        self.assertTrue(renew_lock('slow', 'worker-1', timedelta(minutes=5)))
+        self.assertFalse(renew_lock('slow', 'worker-2', timedelta(minutes=5)))
+
+    def test_heartbeat_retries_errors_and_flags_a_lost_lock(self):
+        jobs = {'slow': {'command': 'slow', 'interval': timedelta(hours=1), 'timeout': timedelta(seconds=0.06)}}
+
+        def slow(*args, **kwargs):
+            time.sleep(0.1)
+
+        with override_settings(SCHEDULER_JOBS=jobs), mock.patch('core.scheduler.call_command', side_effect=slow):
+            with mock.patch('core.scheduler.renew_lock', side_effect=[DatabaseError("locked"), True, True, True]) \
+                    as renew, self.assertLogs('core.scheduler', 'ERROR'):
+                run = run_job('slow', 'worker-1')
+            self.assertGreaterEqual(renew.call_count, 2)
+            self.assertEqual((run.status, run.error), (JobRun.SUCCEEDED, ''))
+
+            with mock.patch('core.scheduler.renew_lock', return_value=False), \
+                    self.assertLogs('core.scheduler', 'WARNING'):
+                run = run_job('slow', 'worker-1')
+            self.assertEqual(run.status, JobRun.SUCCEEDED)
+            self.assertIn("Lock lost", run.error)
+
+    @mock.patch('core.scheduler.call_command')
+    def test_only_runs_of_dead_workers_are_failed(self, call):
+        dead = JobRun.objects.create(job='scrape_all', status=JobRun.RUNNING, worker='gone:1', started_at=timezone.now())
+        run = run_job('scrape_all', 'worker-1')
+        dead.refresh_from_db()
+        self.assertEqual((dead.status, dead.error), (JobRun.FAILED, "Interrupted: worker stopped"))
+        self.assertEqual(run.status, JobRun.SUCCEEDED)
+
+    def test_queue_job_does_not_duplicate(self):
+        first, created = queue_job('scrape_all')
+        again, created_again = queue_job('scrape_all')
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(first.pk, again.pk)
+        with self.assertRaises(KeyError):
+            queue_job('nope')
+
+
+@override_settings(PERF_SAMPLE_RATE=0)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        league = League.objects.create(name="Premier League", country="England")
+        self.match = Match.objects.create(league=league, home_team="Arsenal", away_team="Chelsea",
+                                          start_time=timezone.now() + timedelta(days=1))
+
+    def test_anonymous_pages_are_cached_until_data_changes(self):
+        url = reverse('all_predictions')
+        self.client.get(url, secure=True)
+        # Last-Modified (last kickoff + data timestamp), then data version + page lookup in the cache table
+        with self.assertNumQueries(4):
+            response = self.client.get(url, secure=True)
+        self.assertContains(response, "Arsenal")
+
+        # Ingestion-style write: bulk update, then an explicit bump on commit
+        Match.objects.filter(pk=self.match.pk).update(home_team="Arsenal Women")
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version_on_commit()
+        self.assertContains(self.client.get(url, secure=True), "Arsenal Women")
+
+    def test_cache_key_uses_only_page_params(self):
+        factory = RequestFactory()
+        self.assertEqual(page_key(factory.get('/predictions/', {'league': 'x', 'utm_source': 'fb'})),
+                         page_key(factory.get('/predictions/', {'league': 'x'})))
+        self.assertNotEqual(page_key(factory.get('/predictions/', {'cursor': 'abc'})),
+                            page_key(factory.get('/predictions/')))
+
+    def test_cached_page_links_carry_no_visitor_params(self):
+        url = reverse('all_predictions')
+        self.assertContains(self.client.get(url, {'league': 'x', 'utm_source': 'fb', 'fbclid': 'abc'}, secure=True),
+                            "league=x")
+        response = self.client.get(url, {'league': 'x'}, secure=True)
+        self.assertContains(response, "league=x")
+        self.assertNotContains(response, "utm_source")
+        self.assertNotContains(response, "fbclid")
+
+    def test_signed_in_users_bypass_cache(self):
+        self.client.get(reverse('home'), secure=True)
+        self.client.force_login(User.objects.create_user('reader', password='pw'))
+        self.assertContains(self.client.get(reverse('home'), secure=True), "Dashboard")
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        league = League.objects.create(name="Premier League", country="England")
+        start = timezone.now() + timedelta(days=1)
+        # Pairs share a kickoff, so the id tiebreak matters
+        Match.objects.bulk_create(
+            Match(league=league, home_team=f"Home {i}", away_team=f"Away {i}",
+                  slug=f"match-{i}", start_time=start + timedelta(hours=i // 2),
+                  local_date=timezone.localdate(start + timedelta(hours=i // 2)))
+            for i in range(25))
+        self.matches = Match.objects.filter(status='scheduled')
+        self.expected = list(self.matches.order_by('start_time', 'pk').values_list('pk', flat=True))
+
+    def test_walks_forward_and_back_without_gaps(self):
+        pages, cursor = [], None
+        while True:
+            page = paginate(self.matches, cursor, 10, 'start_time')
+            pages.append([match.pk for match in page])
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertEqual([len(p) for p in pages], [10, 10, 5])
+
+        back = paginate(self.matches, page.previous_cursor, 10, 'start_time')
+        self.assertEqual([match.pk for match in back], pages[1])
+        self.assertTrue(back.has_next() and back.has_previous())
+        first = paginate(self.matches, back.previous_cursor, 10, 'start_time')
+        self.assertEqual([match.pk for match in first], pages[0])
+        self.assertFalse(first.has_previous())
+
+    def test_deep_pages_cost_one_query_and_bad_cursors_start_over(self):
+        page = paginate(self.matches, None, 10, '-start_time')
+        self.assertEqual([match.pk for match in page], self.expected[::-1][:10])
+        with self.assertNumQueries(1):
+            deeper = paginate(self.matches, page.next_cursor, 10, '-start_time')
+        self.assertEqual([match.pk for match in deeper], self.expected[::-1][10:20])
+        self.assertEqual([m.pk for m in paginate(self.matches, "not-a-cursor", 10, '-start_time')],
+                         [m.pk for m in page])
+
+    def test_count_is_cached(self):
+        self.assertIsNone(paginate(self.matches, None, 10, 'start_time').count)
+        self.assertEqual(paginate(self.matches, None, 10, 'start_time', count_key="all").count, 25)
+        with CaptureQueriesContext(connection) as queries:
+            page = paginate(self.matches, None, 10, 'start_time', count_key="all")
+        self.assertEqual(page.count, 25)
+        self.assertFalse([q for q in queries if 'COUNT' in q['sql'] and 'predictions_match' in q['sql']])
+
+
+@override_settings(PERF_SAMPLE_RATE=0)
+class SitemapTests(TestCase):
+    def setUp(self):
+        self.league = League.objects.create(name="Premier League", country="England")
+        self.kickoff = timezone.make_aware(datetime(2026, 3, 14, 18, 0))
+        Match.objects.create(league=self.league, home_team="Arsenal", away_team="Chelsea", start_time=self.kickoff)
+        Match.objects.create(league=self.league, home_team="Spurs", away_team="Everton", status='finished',
+                             start_time=self.kickoff - timedelta(days=60))
+
+    def test_index_lists_a_section_per_month(self):
+        content = self.client.get('/sitemap.xml', secure=True).content.decode()
+        for section in ('static', 'news', 'matches-2026-01', 'matches-2026-03'):
+            self.assertIn(f"/sitemap-{section}.xml</loc>", content)
+
+    def test_month_section_lists_scheduled_and_finished_matches(self):
+        Match.objects.filter(slug="spurs-vs-everton-2026-01-13").update(
+            updated_at=timezone.make_aware(datetime(2026, 1, 14, 9, 0)))
+        content = self.client.get('/sitemap-matches-2026-01.xml', secure=True).content.decode()
+        # lastmod is when the page last changed, not the kickoff
+        self.assertIn("/predictions/spurs-vs-everton-2026-01-13/</loc><lastmod>2026-01-14</lastmod>", content)
+        self.assertNotIn("arsenal", content)
+        self.assertEqual(self.client.get('/sitemap-matches-2025-01.xml', secure=True).status_code, 200)
+        self.assertEqual(self.client.get('/sitemap-matches-2026-03.xml?p=2', secure=True).status_code, 404)
+
+    def test_section_is_cached_until_its_month_changes(self):
+        url = '/sitemap-matches-2026-03.xml'
+        self.client.get(url, secure=True)
+        with self.assertNumQueries(2):  # section version + cached file
+            self.client.get(url, secure=True)
+
+        source = Source.objects.create(name="Forebet", url="https://example.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            ingest_tips(source, [ScrapedTip("Leeds", "Wolves", self.kickoff + timedelta(days=1), '1')],
+                        self.kickoff - timedelta(days=1))
+        self.assertContains(self.client.get(url, secure=True), "leeds-vs-wolves-2026-03-15")
+        self.assertContains(self.client.get('/sitemap.xml', secure=True), "matches-2026-03")
+
+    def test_results_and_settlement_rebuild_the_month(self):
+        url = '/sitemap-matches-2026-03.xml'
+        self.assertContains(self.client.get(url, secure=True), "<changefreq>hourly</changefreq>")
+        with self.captureOnCommitCallbacks(execute=True):
+            record_results([ResultRow("Arsenal", "Chelsea", self.kickoff, 2, 1)])
+        self.assertContains(self.client.get(url, secure=True), "<changefreq>monthly</changefreq>")
+
+        self.client.get(url, secure=True)
+        version = section_version('matches-2026-03')
+        with self.captureOnCommitCallbacks(execute=True):
+            settle()
+        self.assertNotEqual(section_version('matches-2026-03'), version)
+
+    def test_consensus_changes_and_reschedules_rebuild_the_months(self):
+        match = Match.objects.get(home_team="Arsenal")
+        versions = {section: section_version(section) for section in ('matches-2026-01', 'matches-2026-03')}
+        source = Source.objects.create(name="Forebet", url="https://example.com")
+        with self.captureOnCommitCallbacks(execute=True):
+            # The tip's refresh_consensus moves the match's updated_at, i.e. its lastmod
+            Tip.objects.create(match=match, source=source, prediction='1')
+        self.assertNotEqual(section_version('matches-2026-03'), versions['matches-2026-03'])
+
+        versions = {section: section_version(section) for section in versions}
+        match = Match.objects.get(pk=match.pk)
+        match.start_time -= timedelta(days=60)
+        with self.captureOnCommitCallbacks(execute=True):
+            match.save()
+        # Both the month it left and the month it moved to
+        self.assertTrue(all(section_version(section) != version for section, version in versions.items()))
+
+    @mock.patch('core.sitemaps.SITEMAP_LIMIT', 1)
+    def test_large_months_are_split_into_pages(self):
+        Match.objects.create(league=self.league, home_team="Leeds", away_team="Wolves",
+                             start_time=self.kickoff + timedelta(days=1))
+        self.assertContains(self.client.get('/sitemap.xml', secure=True), "/sitemap-matches-2026-03.xml?p=2</loc>")
+        page_2 = self.client.get('/sitemap-matches-2026-03.xml?p=2', secure=True)
+        self.assertContains(page_2, "leeds-vs-wolves")
+        self.assertNotContains(page_2, "arsenal")
+
+
+@override_settings(PERF_SAMPLE_RATE=0)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.league = League.objects.create(name="Premier League", country="England")
+        self.match = Match.objects.create(league=self.league, home_team="Arsenal", away_team="Chelsea",
+                                          start_time=timezone.now() + timedelta(days=1))
+        self.source = Source.objects.create(name="Forebet", url="https://example.com")
+
+    def revalidate(self, url):
+        first = self.client.get(url, secure=True)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.has_header('Last-Modified'))
+        return self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=first['ETag'],
+                               HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+
+    def test_unchanged_match_page_is_304_without_its_queries(self):
+        url = self.match.get_absolute_url()
+        first = self.client.get(url, secure=True)
+        with self.assertNumQueries(1):  # updated_at only
+            response = self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_tip_changes_match_and_league_pages(self):
+        match_url, league_url = self.match.get_absolute_url(), reverse('league_detail', args=[self.league.slug])
+        etags = [self.client.get(url, secure=True)['ETag'] for url in (match_url, league_url)]
+
+        Tip.objects.create(match=self.match, source=self.source, prediction='1')
+
+        for url, etag in zip((match_url, league_url), etags):
+            self.assertEqual(self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_listings_revalidate_until_data_changes(self):
+        for name in ('home', 'all_predictions', 'news_list'):
+            self.assertEqual(self.revalidate(reverse(name)).status_code, 304)
+
+        etag = self.client.get(reverse('home'), secure=True)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version_on_commit()
+        self.assertEqual(self.client.get(reverse('home'), secure=True, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_differs_for_signed_in_users(self):
+        anonymous = self.client.get(reverse('home'), secure=True)['ETag']
+        self.client.force_login(User.objects.create_user('reader', password='pw'))
+        self.assertEqual(self.client.get(reverse('home'), secure=True, HTTP_IF_NONE_MATCH=anonymous).status_code, 200)
+
+    def test_unknown_match_is_still_404(self):
+        self.assertEqual(self.client.get('/predictions/no-such-match/', secure=True).status_code, 404)
+
+
+@override_settings(PERF_SAMPLE_RATE=1, PERF_FLUSH_SIZE=2, PERF_SLOW_MS=0)
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        perf.buffer.samples.clear()
+
+    def test_samples_are_flushed_in_batches(self):
+        league = League.objects.create(name="Premier League", country="England")
+        Match.objects.create(league=league, home_team="Arsenal", away_team="Chelsea",
+                             start_time=timezone.now() + timedelta(days=1))
+
+        self.client.get(reverse('all_predictions'), secure=True)
+        self.assertFalse(RequestSample.objects.exists())
+        self.client.get(reverse('news_list'), secure=True)
+
+        samples = {s.view_name: s for s in RequestSample.objects.all()}
+        self.assertEqual(set(samples), {'all_predictions', 'news_list'})
+        self.assertEqual(len(perf.buffer.samples), 0)
+        sample = samples['all_predictions']
+        self.assertEqual((sample.method, sample.status), ('GET', 200))
+        self.assertGreater(sample.queries, 0)
+        self.assertGreater(sample.render_ms, 0)
+        self.assertGreater(sample.response_bytes, 0)
+        self.assertEqual(len(sample.sql), min(sample.queries, perf.MAX_SQL))
+
+    @override_settings(PERF_FLUSH_SIZE=1)
+    def test_samples_are_written_after_the_response(self):
+        middleware = PerformanceMiddleware(lambda request: HttpResponse("ok"))
+        middleware(RequestFactory().get('/'))
+        # Nothing is written while the response is still on its way out
+        self.assertFalse(RequestSample.objects.exists())
+        request_finished.send(sender=self.__class__)
+        self.assertEqual(RequestSample.objects.count(), 1)
+
+    def test_old_samples_are_pruned_by_their_job(self):
+        now = timezone.now()
+        for age in (1, 10):
+            RequestSample.objects.create(created_at=now - timedelta(days=age), view_name='home', path='/',
+                                         method='GET', status=200, duration_ms=1, queries=1, db_ms=1,
+                                         render_ms=1, response_bytes=1)
+        out = StringIO()
+        call_command('prune_request_samples', stdout=out)
+        self.assertIn("Deleted 1 request samples", out.getvalue())
+        self.assertEqual(RequestSample.objects.count(), 1)
+
+    @override_settings(PERF_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_recorded(self):
+        self.client.get(reverse('home'), secure=True)
+        self.assertEqual(len(perf.buffer.samples), 0)
+
+    def test_percentiles(self):
+        rows = [('home', ms, 3, 1.0) for ms in range(1, 101)] + [('news_list', 5.0, 1, 0.5)]
+        stats = {row['view']: row for row in perf.view_stats(rows)}
+        self.assertEqual((stats['home']['p50'], stats['home']['p95'], stats['home']['p99']), (50, 95, 99))
+        self.assertEqual(stats['news_list']['count'], 1)
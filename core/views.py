@@ -1,22 +1,34 @@
-from django.http import HttpResponse
-from django.shortcuts import render, get_object_or_404
+from django.http import Http404, HttpResponse
+from django.shortcuts import render
 from django.utils import timezone
 from django.views.decorators.http import require_GET
 
 from news.models import NewsArticle
 from predictions.models import Match
+from predictions.summaries import league_summaries
 
+from .cache import cache_public_page
+from .conditional import conditional_page, listing_modified
+from .sitemaps import sitemap_index_xml, sitemap_section_xml
 
+
+# Leagues listed in the homepage sidebar
+TOP_LEAGUES = 8
+
+
+@conditional_page(listing_modified)
+@cache_public_page
 def index(request):
     now = timezone.now()
-    matches = Match.objects.filter(start_time__gt=now, status='scheduled').order_by('start_time')[:20]
+    matches = Match.objects.filter(start_time__gt=now, status='scheduled').with_consensus().order_by('start_time')[:20]
 
     # Fetch 3 latest news items
     latest_news = NewsArticle.objects.order_by('-published_at')[:3]
 
     return render(request, 'core/index.html', {
         'matches': matches,
-        'news': latest_news  # Pass to template
+        'news': latest_news,  # Pass to template
+        'leagues': league_summaries()[:TOP_LEAGUES],
     })
 
 # core/views.py updates
@@ -30,21 +42,6 @@ def tools_view(request):
     return render(request, 'core/calculator.html')
 
 
-def match_detail(request, slug):
-    match = get_object_or_404(Match, slug=slug)
-    consensus = match.get_consensus_data()
-
-    # Pass data for Chart.js
-    chart_data = [0, 0, 0]
-    if consensus:
-        chart_data = [consensus['1'], consensus['X'], consensus['2']]
-
-    return render(request, 'predictions/match_detail.html', {
-        'match': match,
-        'consensus': consensus,
-        'chart_data': chart_data
-    })
-
 @require_GET
 def ads_txt(request):
     # Standard Google format: google.com, pub-ID, DIRECT, ID
@@ -71,4 +68,23 @@ def robots_txt(request):
 def hilltop_verification(request):
     content = "206915438bf22a58bdf8"
 
-    return HttpResponse(content, content_type="text/plain")
\ No newline at end of file
+    return HttpResponse(content, content_type="text/plain")
+
+
+@require_GET
+def sitemap_index(request):
+    content = sitemap_index_xml(f"{request.scheme}://{request.get_host()}")
+    return HttpResponse(content, content_type="application/xml")
+
+
+@require_GET
+def sitemap_section(request, section):
+    try:
+        page = int(request.GET.get('p', 1))
+    except ValueError:
+        raise Http404("Invalid sitemap page")
+
+    content = sitemap_section_xml(section, page, f"{request.scheme}://{request.get_host()}") if page >= 1 else None
+    if content is None:
+        raise Http404(f"No sitemap '{section}' page {page}")
+    return HttpResponse(content, content_type="application/xml")
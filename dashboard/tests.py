@@ -1,3 +1,86 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import JobRun, RequestSample, ScrapeRun
+
+
+class RunJobViewTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+
+    @mock.patch('core.scheduler.call_command')
+    def test_dashboard_queues_without_running(self, call):
+        self.client.force_login(self.admin)
+
+        self.client.get(reverse('dashboard'), secure=True)
+        response = self.client.post(reverse('run_job', args=['scrape_all']), secure=True)
+
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        run = JobRun.objects.get()
+        self.assertEqual((run.job, run.status, run.requested_by), ('scrape_all', JobRun.QUEUED, self.admin))
+        call.assert_not_called()
+        self.assertContains(self.client.get(reverse('dashboard'), secure=True), "Scheduler Runs", count=1)
+
+    def test_only_superusers_can_queue(self):
+        self.client.force_login(User.objects.create_user('staff', password='pw'))
+        self.client.post(reverse('run_job', args=['scrape_all']), secure=True)
+        self.assertFalse(JobRun.objects.exists())
+
+    def test_unknown_job_is_404(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('run_job', args=['nope']), secure=True)
+        self.assertEqual(response.status_code, 404)
+
+
+class PerformancePageTests(TestCase):
+    def test_shows_percentiles_and_slow_sql(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        for ms in (10, 20, 900):
+            RequestSample.objects.create(created_at=timezone.now(), view_name='match_detail', path='/predictions/x/',
+                                         method='GET', status=200, duration_ms=ms, queries=3, db_ms=2,
+                                         render_ms=1, response_bytes=1000,
+                                         sql=[["SELECT slow_query", 800.0]] if ms == 900 else [])
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse('dashboard_performance'), secure=True)
+
+        self.assertContains(response, "match_detail")
+        self.assertContains(response, "SELECT slow_query")
+        self.assertEqual(response.context['stats'][0]['p99'], 900)
+
+
+class ScraperTrendsTests(TestCase):
+    def test_plots_each_source(self):
+        run = ScrapeRun.objects.create(command='scrape_all')
+        run.sources.create(source='forebet', url='https://example.com', http_status=200, fetch_ms=120,
+                           rows_seen=10, rows_parsed=8, rejected={"no teams": 2}, items_created=8)
+        run.sources.create(source='betwizad', url='https://example.com', error="HTTP 503", http_status=503)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+        response = self.client.get(reverse('dashboard_scrapers'), secure=True)
+
+        self.assertContains(response, "no teams: 2")
+        self.assertContains(response, "HTTP 503")
+        charts = {chart['id']: chart['series'] for chart in response.context['charts']}
+        self.assertEqual(charts['reject_pct']['forebet'][0]['y'], 20.0)
+        self.assertEqual(set(charts['fetch_ms']), {'forebet', 'betwizad'})
+
+    @mock.patch('dashboard.views.SCRAPER_TREND_LIMIT', 2)
+    def test_limit_keeps_the_newest_runs(self):
+        now = timezone.now()
+        for hours_ago in (3, 2, 1):
+            run = ScrapeRun.objects.create(command='scrape_all')
+            ScrapeRun.objects.filter(pk=run.pk).update(started_at=now - timedelta(hours=hours_ago))
+            run.sources.create(source='forebet', url='https://example.com', fetch_ms=hours_ago)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+        response = self.client.get(reverse('dashboard_scrapers'), secure=True)
 
-# Create your tests here.
+        charts = {chart['id']: chart['series'] for chart in response.context['charts']}
+        self.assertEqual([point['y'] for point in charts['fetch_ms']['forebet']], [2, 1])
+        self.assertEqual(response.context['latest'][0].fetch_ms, 1)
@@ -3,6 +3,9 @@ from . import views
 
 urlpatterns = [
     path('', views.dashboard_home, name='dashboard'),
+    path('jobs/<str:job>/run/', views.run_job, name='run_job'),
+    path('performance/', views.performance, name='dashboard_performance'),
+    path('scrapers/', views.scraper_trends, name='dashboard_scrapers'),
     path('match/add/', views.add_match, name='add_match'),
     path('match/<int:match_id>/add-tip/', views.add_tip, name='add_tip'),
 ]
\ No newline at end of file
@@ -1,10 +1,17 @@
 from django.shortcuts import render, redirect
-from django.contrib.auth.decorators import login_required
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.views.decorators.http import require_POST
 
 from news.models import NewsArticle
 from predictions.models import Match, League, Source, Tip
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from datetime import timedelta
+
+from core.models import JobRun, RequestSample, ScrapeSourceRun
+from core.perf import view_stats
+from core.scheduler import get_jobs, queue_job
 
 @login_required
 def dashboard_home(request):
@@ -15,18 +22,104 @@ def dashboard_home(request):
     }
 
     # Fetch recent matches
-    recent_matches = Match.objects.order_by('-start_time')[:5]
+    recent_matches = Match.objects.with_consensus().order_by('-start_time')[:5]
 
     # Fetch recent news (New Addition)
     latest_news = NewsArticle.objects.order_by('-published_at')[:6]
 
+    # Scrapers run in the scheduler worker; the dashboard only shows their history
+    job_runs = JobRun.objects.select_related('requested_by')[:10]
+
     context = {
         'stats': stats,
         'matches': recent_matches,
-        'news': latest_news  # <--- Pass to template
+        'news': latest_news,  # <--- Pass to template
+        'jobs': list(get_jobs()),
+        'job_runs': job_runs,
     }
     return render(request, 'dashboard/home.html', context)
 
+@require_POST
+@user_passes_test(lambda user: user.is_superuser)
+def run_job(request, job):
+    """Queues a job for the scheduler worker. Nothing is scraped in this process."""
+    try:
+        run, created = queue_job(job, request.user)
+    except KeyError:
+        raise Http404(f"Unknown job '{job}'")
+
+    if created:
+        messages.info(request, f"{job} queued. The scheduler will pick it up within a minute.")
+    else:
+        messages.warning(request, f"{job} is already {run.status}.")
+    return redirect('dashboard')
+
+@login_required
+def performance(request):
+    """Latency percentiles and query counts per view, from the sampled requests of the last hours."""
+    try:
+        hours = min(max(int(request.GET.get('hours', 24)), 1), 24 * 7)
+    except ValueError:
+        hours = 24
+    samples = RequestSample.objects.filter(created_at__gte=timezone.now() - timedelta(hours=hours))
+
+    # Bounded so a busy week cannot make this page the slow one
+    rows = samples.order_by('-created_at').values_list('view_name', 'duration_ms', 'queries', 'db_ms')[:50000]
+
+    context = {
+        'hours': hours,
+        'windows': [(1, '1h'), (24, '24h'), (24 * 7, '7d')],
+        'stats': view_stats(rows),
+        'slowest': samples.order_by('-duration_ms')[:20],
+    }
+    return render(request, 'dashboard/performance.html', context)
+
+# (field, chart title) plotted per source on the scraper trends page
+SCRAPER_METRICS = [
+    ('fetch_ms', 'Fetch latency (ms)'),
+    ('parse_ms', 'Parse time (ms)'),
+    ('db_ms', 'DB write time (ms)'),
+    ('rows_parsed', 'Rows parsed'),
+    ('reject_pct', 'Rows rejected (%)'),
+    ('items_created', 'Tips / articles created'),
+]
+# Most recent source runs plotted; past this the oldest in the window are dropped
+SCRAPER_TREND_LIMIT = 5000
+
+@login_required
+def scraper_trends(request):
+    """Per-source scrape telemetry over time, to spot a source slowing down or a parser breaking."""
+    try:
+        days = min(max(int(request.GET.get('days', 14)), 1), 90)
+    except ValueError:
+        days = 14
+    newest = ScrapeSourceRun.objects.filter(run__started_at__gte=timezone.now() - timedelta(days=days)) \
+        .select_related('run').order_by('-run__started_at', '-id')[:SCRAPER_TREND_LIMIT]
+    # Newest first for the limit, oldest first for the charts and `latest`
+    runs = list(newest)[::-1]
+
+    series = {metric: {} for metric, _ in SCRAPER_METRICS}
+    latest = {}
+    for source_run in runs:
+        point = int(source_run.run.started_at.timestamp() * 1000)
+        seen = source_run.rows_seen or source_run.rows_parsed
+        values = {metric: getattr(source_run, metric, None) for metric, _ in SCRAPER_METRICS}
+        values['reject_pct'] = round(source_run.rows_rejected * 100 / seen, 1) if seen else 0
+        if source_run.unchanged:
+            # Nothing was parsed or written; zeros would read as a broken parser
+            values = {'fetch_ms': values['fetch_ms']}
+        for metric, value in values.items():
+            series[metric].setdefault(source_run.source, []).append({'x': point, 'y': value})
+        latest[source_run.source] = source_run
+
+    context = {
+        'days': days,
+        'windows': [(1, '24h'), (14, '14d'), (90, '90d')],
+        'charts': [{'id': metric, 'title': title, 'series': series[metric]} for metric, title in SCRAPER_METRICS],
+        'latest': sorted(latest.values(), key=lambda r: r.source),
+    }
+    return render(request, 'dashboard/scrapers.html', context)
+
 def add_match(request):
     # You will link a ModelForm here later
     return HttpResponse("Add Match Form goes here")
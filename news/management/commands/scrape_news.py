@@ -1,83 +1,84 @@
+import time
+
 from django.core.management.base import BaseCommand
-from news.models import NewsArticle
-import cloudscraper
-from bs4 import BeautifulSoup
+from django.db import transaction
+
+from core.models import ScrapeRun
+from news.scraping import page_url, parse_articles, save_articles
+from predictions.fetching import Fetcher
+from predictions.httpcache import HttpCache
 
 
 class Command(BaseCommand):
     help = 'Scrape football news from Pulse Sports Kenya'
 
-    def handle(self, *args, **kwargs):
-        self.stdout.write("Scraping Pulse Sports...")
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=1,
+                            help='Listing pages to walk for a backfill; stops early once it reaches known articles.')
+        parser.add_argument('--no-cache', action='store_true',
+                            help='Download and process pages even if they have not changed since the last run.')
 
-        # Pulse Sports Football Section
-        URL = "https://www.pulsesports.co.ke/football"
+    def handle(self, *args, **options):
+        self.stdout.write("Scraping Pulse Sports...")
 
-        scraper = cloudscraper.create_scraper(
-            browser={'browser': 'chrome', 'platform': 'windows', 'desktop': True}
-        )
+        fetcher = Fetcher(workers=1, retries=1, cache=None if options['no_cache'] else HttpCache.from_settings())
+        scrape_run = ScrapeRun.objects.create(command='scrape_news')
+        # One telemetry row per listing page, written after the transaction so a failed run still records them
+        telemetry = []
+        created = 0
 
         try:
-            response = scraper.get(URL)
-            if response.status_code != 200:
-                self.stdout.write(self.style.ERROR(f"Failed to fetch: {response.status_code}"))
-                return
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Pulse uses 'article' tags usually, or specific divs
-            # We look for the main article links
-            articles = soup.find_all('article')  # Generic HTML5 tag often used
-
-            if not articles:
-                # Fallback if they use divs
-                articles = soup.find_all('div', class_='c-article-card')
-
-            count = 0
-            for article in articles:
-                try:
-                    # 1. Extract Link & Title
-                    link_tag = article.find('a')
-                    if not link_tag: continue
-
-                    relative_url = link_tag.get('href')
-                    if not relative_url: continue
-
-                    # Ensure full URL
-                    full_url = relative_url if relative_url.startswith(
-                        'http') else f"https://www.pulsesports.co.ke{relative_url}"
-
-                    # Extract Title (try h1, h2, h3)
-                    title_tag = article.find(['h1', 'h2', 'h3'])
-                    if not title_tag: continue
-                    title = title_tag.get_text(" ", strip=True)
-
-                    # 2. Extract Image (Handle Lazy Loading)
-                    img_tag = article.find('img')
-                    image_url = ""
-                    if img_tag:
-                        # Pulse uses 'data-src' often for lazy loading
-                        image_url = img_tag.get('data-src') or img_tag.get('src') or ""
-
-                    # 3. Save to DB
-                    # using update_or_create to avoid duplicates but update generic info
-                    obj, created = NewsArticle.objects.get_or_create(
-                        url=full_url,
-                        defaults={
-                            'title': title,
-                            'image_url': image_url,
-                            'summary': "Click to read full story on Pulse Sports."
-                        }
-                    )
-
-                    if created:
-                        count += 1
-                        self.stdout.write(f"Saved: {title[:30]}...")
-
-                except Exception:
-                    continue
-
-            self.stdout.write(self.style.SUCCESS(f"Successfully scraped {count} new articles."))
+            with transaction.atomic():
+                for page in range(1, max(options['pages'], 1) + 1):
+                    page_created, done = self.scrape_page(fetcher, page, telemetry)
+                    created += page_created
+                    if done:
+                        break
+            self.stdout.write(self.style.SUCCESS(f"Successfully scraped {created} new articles."))
 
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error: {e}"))
\ No newline at end of file
+            if telemetry:
+                telemetry[-1]['error'] = str(e) or e.__class__.__name__
+            self.stdout.write(self.style.ERROR(f"Error: {e}"))
+        finally:
+            scrape_run.sources.bulk_create([scrape_run.sources.model(run=scrape_run, **row) for row in telemetry])
+            scrape_run.finish()
+
+    def scrape_page(self, fetcher, page, telemetry):
+        """Fetches, parses and stores one listing page. Returns (articles created, stop paging)."""
+        url = page_url(page)
+        row = {'source': 'pulsesports', 'url': url}
+        telemetry.append(row)
+        started = time.monotonic()
+
+        try:
+            fetched = fetcher.fetch(url)
+            row.update(http_status=fetched.status or None, attempts=fetched.attempts, bytes=len(fetched.content),
+                       fetch_ms=fetched.elapsed * 1000, unchanged=fetched.unchanged)
+            if not fetched.ok:
+                row['error'] = fetched.error or f"HTTP {fetched.status}"
+                self.stdout.write(self.style.ERROR(f"Failed to fetch {url}: {row['error']}"))
+                return 0, True
+            if fetched.unchanged:
+                # Older pages may still hold articles we have not seen, so a backfill carries on
+                self.stdout.write(f"{url} unchanged since last run.")
+                return 0, False
+
+            parsed = time.monotonic()
+            stats = {}
+            items = parse_articles(fetched.content, stats)
+            written = time.monotonic()
+            created = save_articles(items, stats)
+            # Cache the page only once the articles are committed
+            transaction.on_commit(lambda: fetcher.remember(fetched))
+            row.update(parse_ms=(written - parsed) * 1000, rows_seen=stats['seen'], rows_parsed=len(items),
+                       rejected=stats['rejected'], items_created=len(created),
+                       db_ms=(time.monotonic() - written) * 1000)
+
+            for article in created:
+                self.stdout.write(f"Saved: {article.title[:30]}...")
+            if stats['caught_up']:
+                self.stdout.write(f"Reached {stats['known']} known articles on page {page}, stopping.")
+            return len(created), stats['caught_up'] or not items
+        finally:
+            row['total_ms'] = (time.monotonic() - started) * 1000
@@ -10,6 +10,8 @@ class NewsArticle(models.Model):
 
     class Meta:
         ordering = ['-published_at']
+        # Keyset pagination of news_list walks (published_at, id) newest first
+        indexes = [models.Index(fields=['-published_at', '-id'], name='news_published_idx')]
 
     def __str__(self):
         return self.title
\ No newline at end of file
@@ -0,0 +1,108 @@
+from collections import Counter
+
+from bs4 import BeautifulSoup
+from django.db import transaction
+
+from core.cache import bump_data_version_on_commit
+from core.sitemaps import invalidate_sections
+
+from .models import NewsArticle
+
+# Pulse Sports Football Section
+PULSE_URL = "https://www.pulsesports.co.ke/football"
+
+# The listing is newest first: this many known articles in a row means we have caught up
+KNOWN_STREAK = 10
+
+
+def page_url(page):
+    """Listing page `page` (1-based) of the football section."""
+    return PULSE_URL if page == 1 else f"{PULSE_URL}?page={page}"
+
+
+def parse_articles(html, stats=None):
+    """
+    Returns a list of {'url', 'title', 'image_url'} dicts, one per usable article card.
+    Pass a dict as `stats` to get the number of cards seen and {reason: count} of the rejected ones.
+    """
+    rejected = Counter()
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Pulse uses 'article' tags usually, or specific divs
+    # We look for the main article links
+    articles = soup.find_all('article')  # Generic HTML5 tag often used
+
+    if not articles:
+        # Fallback if they use divs
+        articles = soup.find_all('div', class_='c-article-card')
+
+    items = []
+    for article in articles:
+        try:
+            # 1. Extract Link & Title
+            link_tag = article.find('a')
+            relative_url = link_tag.get('href') if link_tag else None
+            if not relative_url:
+                rejected["no link"] += 1
+                continue
+
+            # Ensure full URL
+            full_url = relative_url if relative_url.startswith(
+                'http') else f"https://www.pulsesports.co.ke{relative_url}"
+
+            # Extract Title (try h1, h2, h3)
+            title_tag = article.find(['h1', 'h2', 'h3'])
+            if not title_tag:
+                rejected["no title"] += 1
+                continue
+            title = title_tag.get_text(" ", strip=True)
+
+            # 2. Extract Image (Handle Lazy Loading)
+            img_tag = article.find('img')
+            image_url = ""
+            if img_tag:
+                # Pulse uses 'data-src' often for lazy loading
+                image_url = img_tag.get('data-src') or img_tag.get('src') or ""
+
+            items.append({'url': full_url, 'title': title, 'image_url': image_url})
+        except Exception as e:
+            rejected[f"error: {e.__class__.__name__}"] += 1
+
+    if stats is not None:
+        stats.update(seen=len(articles), rejected=dict(rejected))
+    return items
+
+
+def save_articles(items, stats=None):
+    """
+    Stores parsed articles, skipping URLs we already have, with one lookup and one insert
+    for the whole page. Returns the new (unsaved-pk) NewsArticle rows.
+    Pass a dict as `stats` to get the number of known articles and whether the page ended
+    with KNOWN_STREAK of them in a row, i.e. older pages have nothing new.
+    """
+    # A card can appear twice on one page (e.g. featured and in the list)
+    unique = {}
+    for item in items:
+        unique.setdefault(item['url'], item)
+    items = list(unique.values())
+    known = set(NewsArticle.objects.filter(url__in=[item['url'] for item in items]).values_list('url', flat=True))
+
+    streak = longest = 0
+    for item in items:
+        streak = streak + 1 if item['url'] in known else 0
+        longest = max(longest, streak)
+
+    new_articles = [
+        NewsArticle(url=item['url'], title=item['title'], image_url=item['image_url'],
+                    summary="Click to read full story on Pulse Sports.")
+        for item in items if item['url'] not in known
+    ]
+    # A concurrent run may have inserted some of these since the lookup
+    NewsArticle.objects.bulk_create(new_articles, ignore_conflicts=True)
+
+    if new_articles:
+        bump_data_version_on_commit()
+        transaction.on_commit(lambda: invalidate_sections(['news']))
+    if stats is not None:
+        stats.update(known=len(known), caught_up=longest >= min(KNOWN_STREAK, len(items)) and bool(known))
+    return new_articles
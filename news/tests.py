@@ -1,3 +1,97 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+
+from core.models import ScrapeSourceRun
+from core.sitemaps import section_version
+from predictions.replay import replay
+
+from .models import NewsArticle
+from .scraping import page_url, save_articles
+
+
+def listing(numbers):
+    cards = "".join(f'<article><a href="/football/story/{n}"><h3>Story {n}</h3></a></article>' for n in numbers)
+    return f"<html><body><main>{cards}</main></body></html>".encode()
+
+
+class ScrapeNewsReplayTests(TestCase):
+    def scrape(self, *args):
+        # Pages are cached once the run commits, so let on_commit callbacks fire
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('scrape_news', *args, stdout=StringIO())
+
+    def test_scrape_news_from_fixture(self):
+        with replay() as transport:
+            self.scrape()
+            created = NewsArticle.objects.count()
+            self.assertGreater(created, 0)
+            self.assertEqual(len(transport.requests), 1)
+
+            # The page has not changed, so the server answers 304 and nothing is parsed
+            self.scrape()
+            # Articles already stored are not saved twice
+            self.scrape('--no-cache')
+        self.assertEqual(NewsArticle.objects.count(), created)
+        self.assertFalse(NewsArticle.objects.filter(title="").exists())
+
+        first, second, third = ScrapeSourceRun.objects.order_by('run__started_at', 'id')
+        self.assertEqual((first.source, first.http_status, first.items_created), ('pulsesports', 200, created))
+        self.assertEqual((second.http_status, second.unchanged, second.bytes, second.rows_parsed), (304, True, 0, 0))
+        self.assertEqual((third.unchanged, third.rows_parsed, third.items_created), (False, first.rows_parsed, 0))
+
+    def test_backfill_stops_at_known_articles(self):
+        NewsArticle.objects.bulk_create(
+            NewsArticle(url=f"https://www.pulsesports.co.ke/football/story/{n}", title=f"Story {n}") for n in range(5, 40))
+        pages = {page_url(1): listing(range(0, 12)), page_url(2): listing(range(12, 24)),
+                 page_url(3): listing(range(24, 36))}
+
+        with replay(pages) as transport:
+            self.scrape('--pages', '3')
+
+        # Page 2 is all known, so page 3 is never requested
+        self.assertEqual(transport.requests, [page_url(1), page_url(2)])
+        self.assertEqual(NewsArticle.objects.count(), 40)
+        self.assertEqual(list(ScrapeSourceRun.objects.order_by('id').values_list('url', 'items_created')),
+                         [(page_url(1), 5), (page_url(2), 0)])
+
+    def test_save_articles_is_one_lookup_and_one_insert(self):
+        NewsArticle.objects.create(url="https://www.pulsesports.co.ke/football/story/0", title="Story 0")
+        items = [{'url': f"https://www.pulsesports.co.ke/football/story/{n}", 'title': f"Story {n}", 'image_url': ""}
+                 for n in [0, 1, 2, 3, 2]]
+        stats = {}
+        with CaptureQueriesContext(connection) as queries:
+            created = save_articles(items, stats)
+        self.assertEqual([article.title for article in created], ["Story 1", "Story 2", "Story 3"])
+        self.assertEqual(len([q for q in queries if 'news_newsarticle' in q['sql']]), 2)
+        self.assertEqual((stats['known'], stats['caught_up']), (1, False))
+
+    def test_news_sitemap_is_rebuilt_only_once_the_articles_commit(self):
+        version = section_version('news')
+        with self.captureOnCommitCallbacks(execute=True):
+            save_articles([{'url': "https://www.pulsesports.co.ke/football/story/1", 'title': "Story 1",
+                            'image_url': ""}])
+            # A rebuild now could cache a sitemap without the new article, or one a rollback undoes
+            self.assertEqual(section_version('news'), version)
+        self.assertNotEqual(section_version('news'), version)
+
+
+@override_settings(PERF_SAMPLE_RATE=0)
+class NewsListTests(TestCase):
+    def test_pages_through_older_articles(self):
+        for n in range(30):
+            NewsArticle.objects.create(url=f"https://www.pulsesports.co.ke/football/story/{n}", title=f"Story {n}")
+
+        response = self.client.get(reverse('news_list'), secure=True)
+        self.assertEqual([a.title for a in response.context['articles']][:2], ["Story 29", "Story 28"])
+        self.assertEqual(len(response.context['articles']), 24)
+        self.assertContains(response, 'rel="next"')
+
+        older = self.client.get(reverse('news_list'), {'cursor': response.context['articles'].next_cursor}, secure=True)
+        self.assertEqual([a.title for a in older.context['articles']], [f"Story {n}" for n in range(5, -1, -1)])
+        self.assertContains(older, 'rel="prev"')
+        self.assertNotContains(older, 'rel="next"')
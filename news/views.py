@@ -1,13 +1,22 @@
 from django.shortcuts import render
+
+from core.cache import cache_public_page
+from core.conditional import conditional_page, news_modified
+from core.pagination import CURSOR_PARAM, paginate
+
 from .models import NewsArticle
 
+PAGE_SIZE = 24
+
 
+@conditional_page(news_modified)
+@cache_public_page
 def news_list(request):
     """
     Public page showing all latest football news.
     """
-    # Get latest 50 articles
-    articles = NewsArticle.objects.order_by('-published_at')[:50]
+    # Newest first, eight rows of three cards per page
+    articles = paginate(NewsArticle.objects.all(), request.GET.get(CURSOR_PARAM), PAGE_SIZE, '-published_at')
 
     return render(request, 'news/news_list.html', {
         'articles': articles,
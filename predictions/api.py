@@ -0,0 +1,117 @@
+"""
+Read-only JSON API for the match list, chart widgets and mobile clients.
+
+Every endpoint serializes straight from values() querysets, or for match
+detail from the match's snapshot, so no model instances are built. Responses go through the same page cache and
+conditional GET handling as the HTML pages, and carry a short public
+Cache-Control so browsers and CDNs can reuse them.
+"""
+from django.db.models import F, Max
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+
+from core.cache import cache_public_page, data_last_modified
+from core.conditional import conditional_page, listing_modified, match_modified
+from core.pagination import CURSOR_PARAM, paginate
+
+from .models import Match
+from .snapshots import load_snapshot
+from .views import upcoming_matches
+
+API_MAX_AGE = 60
+# Most match IDs the consensus endpoint answers in one request
+CONSENSUS_BATCH_LIMIT = 50
+PAGE_SIZE = 50
+
+MATCH_FIELDS = ('id', 'slug', 'home_team', 'away_team', 'start_time', 'status', 'total_votes',
+                'home_pct', 'draw_pct', 'away_pct')
+CONSENSUS_FIELDS = ('id', 'total_votes', 'home_votes', 'draw_votes', 'away_votes', 'home_pct', 'draw_pct', 'away_pct')
+
+
+def api_view(last_modified, params):
+    """Public cache headers, conditional GET and the anonymous page cache, in that order."""
+    def decorator(view):
+        view = cache_public_page(params=params)(view)
+        view = conditional_page(last_modified)(view)
+        return cache_control(public=True, max_age=API_MAX_AGE)(view)
+    return decorator
+
+
+def error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+WEIGHTED_FIELDS = {f'weighted_{side}_pct': F(f'weighted__{side}_pct') for side in ('home', 'draw', 'away')}
+
+
+def match_rows(matches):
+    return matches.values(*MATCH_FIELDS, league_name=F('league__name'), league_slug=F('league__slug'),
+                          **WEIGHTED_FIELDS)
+
+
+def with_urls(rows):
+    for row in rows:
+        row['url'] = reverse('match_detail', kwargs={'slug': row['slug']})
+    return rows
+
+
+def parse_ids(request):
+    """The comma-separated ?ids= as ints, or raises ValueError."""
+    try:
+        ids = [int(part) for part in request.GET.get('ids', '').split(',') if part.strip()]
+    except ValueError:
+        raise ValueError("ids must be comma-separated match IDs")
+    if not ids:
+        raise ValueError("ids is required, e.g. ?ids=1,2,3")
+    if len(ids) > CONSENSUS_BATCH_LIMIT:
+        raise ValueError(f"At most {CONSENSUS_BATCH_LIMIT} ids per request")
+    return sorted(set(ids))
+
+
+def consensus_modified(request):
+    try:
+        ids = parse_ids(request)
+    except ValueError:
+        return None
+    return Match.objects.filter(pk__in=ids).aggregate(last=Max('updated_at'))['last'] or data_last_modified()
+
+
+@api_view(listing_modified, params=('league', 'date', 'from', 'to', CURSOR_PARAM))
+def match_list(request):
+    """Upcoming matches with their consensus, filtered like prediction_list and paged by cursor."""
+    matches = upcoming_matches(request.GET.get('league'), request.GET.get('date'),
+                               request.GET.get('from'), request.GET.get('to'))
+    page = paginate(match_rows(matches), request.GET.get(CURSOR_PARAM), PAGE_SIZE, 'start_time')
+    return JsonResponse({
+        'results': with_urls(list(page)),
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+@api_view(consensus_modified, params=('ids',))
+def consensus(request):
+    """
+    Consensus for up to CONSENSUS_BATCH_LIMIT matches in one query, keyed by match ID,
+    e.g. /predictions/api/consensus/?ids=4,8,15. Unknown IDs are left out.
+    """
+    try:
+        ids = parse_ids(request)
+    except ValueError as e:
+        return error(str(e))
+    rows = Match.objects.filter(pk__in=ids).values(*CONSENSUS_FIELDS, **WEIGHTED_FIELDS)
+    return JsonResponse({'results': {row.pop('id'): row for row in rows}})
+
+
+@api_view(match_modified, params=())
+def match_detail(request, slug):
+    """One match with its consensus, chart data in 1/X/2 order and every tip with its source, from its snapshot."""
+    snapshot = load_snapshot(slug)
+    if snapshot is None:
+        raise Http404("No match found")
+    row = dict(snapshot['match'], url=reverse('match_detail', kwargs={'slug': slug}))
+    for key in ('consensus', 'weighted_consensus', 'chart_data'):
+        row[key] = snapshot[key]
+    row['tips'] = snapshot['trusted_tips'] + snapshot['other_tips']
+    return JsonResponse(row)
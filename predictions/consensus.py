@@ -0,0 +1,57 @@
+from django.db.models import Case, Count, F, FloatField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from core.sitemaps import invalidate_matches_on_commit
+
+from .models import League, Match, Tip
+from .snapshots import invalidate_snapshots
+
+# Keeps each IN (...) list well under SQLite's bound-parameter limit
+BATCH_SIZE = 500
+
+
+def vote_count(prediction):
+    """Correlated subquery: how many of the outer match's tips predict `prediction`."""
+    tips = Tip.objects.filter(match=OuterRef('pk'), prediction=prediction) \
+        .order_by().values('match').annotate(c=Count('id')).values('c')
+    return Coalesce(Subquery(tips), 0)
+
+
+def _share(field, total):
+    return Case(
+        When(GreaterThan(total, 0), then=Cast(F(field), FloatField()) * 100 / total),
+        default=Value(0.0), output_field=FloatField(),
+    )
+
+
+def refresh_consensus(match_ids):
+    """
+    Recomputes the stored consensus columns for the given matches from their tips, marks
+    the matches and their leagues as modified and drops their page snapshots and sitemap
+    months. A handful of statements per batch, whatever the number of matches or tips.
+    """
+    match_ids = sorted({pk for pk in match_ids if pk is not None})
+    total = F('home_votes') + F('draw_votes') + F('away_votes')
+    now = timezone.now()
+    updated = 0
+
+    for i in range(0, len(match_ids), BATCH_SIZE):
+        matches = Match.objects.filter(pk__in=match_ids[i:i + BATCH_SIZE])
+        updated += matches.update(home_votes=vote_count('1'), draw_votes=vote_count('X'),
+                                  away_votes=vote_count('2'))
+        # Runs after the counts are stored, so it can read them back
+        matches.update(
+            total_votes=total,
+            home_pct=_share('home_votes', total),
+            draw_pct=_share('draw_votes', total),
+            away_pct=_share('away_votes', total),
+            updated_at=now,
+        )
+        League.objects.filter(pk__in=matches.values('league_id')).update(updated_at=now)
+        invalidate_snapshots(match_ids[i:i + BATCH_SIZE])
+        # The sitemap's lastmod is updated_at
+        invalidate_matches_on_commit(matches.order_by().values_list('start_time', flat=True))
+
+    return updated
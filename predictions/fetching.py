@@ -0,0 +1,135 @@
+"""
+Concurrent page fetching for the scrapers.
+
+Fetcher.fetch() is safe to call from many threads at once: the scrape runner
+(predictions.sources.runner) submits every page to a pool of Fetcher.workers
+threads and parses and ingests each one as soon as it lands, while slower
+hosts are still downloading. Every host gets its own token bucket in place
+of fixed sleeps, and failed requests are retried with exponential backoff.
+
+Given an HttpCache, the Fetcher also makes conditional requests and marks a
+page unchanged when the server answers 304 or sends back the same body as
+last time. Callers store a page with remember() once they have used it, so
+a page whose ingest failed is fetched and processed again on the next run.
+"""
+import random
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import cloudscraper
+
+from .httpcache import body_hash
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def create_session():
+    return cloudscraper.create_scraper(
+        browser={'browser': 'chrome', 'platform': 'windows', 'desktop': True}
+    )
+
+
+class TokenBucket:
+    """Allows `rate` requests per second per host, with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int = 0
+    content: bytes = b""
+    elapsed: float = 0.0
+    attempts: int = 0
+    error: str = ""
+    etag: str = None
+    last_modified: str = None
+    # 304, or the same body as the cached copy: nothing to parse
+    unchanged: bool = False
+
+    @property
+    def ok(self):
+        return self.status in (200, 304) and not self.error
+
+
+class Fetcher:
+    def __init__(self, workers=4, timeout=20, retries=3, backoff=1.0, rate=0.5, burst=1, cache=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.rate = rate
+        self.burst = burst
+        self.cache = cache  # HttpCache, or None to always download in full
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        # cloudscraper sessions are not thread-safe, so each worker keeps its own
+        self._local = threading.local()
+
+    def _bucket(self, url):
+        host = urlsplit(url).netloc
+        with self._buckets_lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def _session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = create_session()
+        return self._local.session
+
+    def fetch(self, url):
+        result = FetchResult(url=url)
+        started = time.monotonic()
+        cached = self.cache.meta(url) if self.cache else None
+        headers = self.cache.validators(url) if cached else {}
+
+        for attempt in range(1, self.retries + 1):
+            result.attempts = attempt
+            self._bucket(url).acquire()
+            try:
+                response = self._session().get(url, timeout=self.timeout, headers=headers)
+                result.status, result.error = response.status_code, ""
+                if response.status_code not in RETRY_STATUSES:
+                    result.content = response.content
+                    result.etag = response.headers.get('ETag')
+                    result.last_modified = response.headers.get('Last-Modified')
+                    result.unchanged = response.status_code == 304 or (
+                        cached is not None and response.status_code == 200
+                        and body_hash(result.content) == cached['sha256'])
+                    break
+                result.error = f"HTTP {response.status_code}"
+            except Exception as e:
+                result.error = str(e) or e.__class__.__name__
+
+            if attempt < self.retries:
+                # Exponential backoff with jitter: ~1s, 2s, 4s...
+                time.sleep(self.backoff * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2))
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def remember(self, result):
+        """Caches a downloaded page and its validators for the next conditional request."""
+        if self.cache and result.status == 200 and not result.error:
+            self.cache.store(result.url, result.content, result.etag, result.last_modified)
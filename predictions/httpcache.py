@@ -0,0 +1,113 @@
+"""
+On-disk HTTP cache for the scrapers.
+
+Each URL keeps its last body (gzip-compressed) next to a small JSON file with
+the validators (ETag, Last-Modified) and a hash of the body. The Fetcher
+sends those validators as If-None-Match / If-Modified-Since. A 304, or a 200
+whose body hashes the same as last time, marks the page unchanged, and the
+runner skips parsing and ingestion. The cache directory is capped at
+max_bytes, and the least recently used pages go first.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_DIR = Path(tempfile.gettempdir()) / 'bettingintel-scraper-cache'
+DEFAULT_MAX_BYTES = 50 * 2 ** 20
+
+
+def body_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+class HttpCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(getattr(settings, 'SCRAPER_CACHE_DIR', DEFAULT_DIR),
+                   getattr(settings, 'SCRAPER_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.gz"
+
+    def meta(self, url):
+        """The stored validators and body hash for `url`, or None."""
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if not body_path.exists():
+            return None
+        # Reading counts as use for LRU eviction
+        os.utime(meta_path)
+        return meta
+
+    def validators(self, url):
+        """Conditional request headers for `url` (empty if nothing is cached)."""
+        meta = self.meta(url)
+        headers = {}
+        if meta and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta and meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def body(self, url):
+        try:
+            return gzip.decompress(self._paths(url)[1].read_bytes())
+        except (OSError, EOFError):
+            return None
+
+    def store(self, url, content, etag=None, last_modified=None):
+        """Saves a body and its validators, then evicts least recently used pages above the size cap."""
+        meta_path, body_path = self._paths(url)
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified,
+                'sha256': body_hash(content), 'stored_at': time.time()}
+        with self.lock:
+            # Write then rename, so a concurrent reader never sees half a file
+            self._write(body_path, gzip.compress(content, compresslevel=6))
+            self._write(meta_path, json.dumps(meta).encode())
+            self.evict()
+
+    def _write(self, path, data):
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def evict(self):
+        pages = []
+        total = 0
+        for meta_path in self.directory.glob('*.json'):
+            body_path = meta_path.with_suffix('.gz')
+            try:
+                size = meta_path.stat().st_size + body_path.stat().st_size
+                used = meta_path.stat().st_mtime
+            except OSError:
+                continue
+            pages.append((used, size, meta_path, body_path))
+            total += size
+
+        for used, size, meta_path, body_path in sorted(pages):
+            if total <= self.max_bytes:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            total -= size
+        return total
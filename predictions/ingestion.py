@@ -0,0 +1,176 @@
+"""
+Set-based ingestion of scraped tips.
+
+Scrapers collect every parsed row of a source into memory first, then hand the
+whole batch to ingest_tips(), which resolves it against the run's MatchIndex and
+writes new Matches and Tips in bulk inside one transaction.
+"""
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import bump_data_version_on_commit
+from core.sitemaps import invalidate_matches_on_commit
+
+from .consensus import refresh_consensus
+from .matching import MatchIndex
+from .models import League, Match, Tip
+from .summaries import refresh_league_summaries
+from .sources.base import ScrapedTip  # noqa: F401  (re-exported for callers of this module)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestResult:
+    source: str
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    matches_created: int = 0
+    matched: int = 0  # Rows that resolved to a match already in the database
+    elapsed: float = 0.0
+    match_ids: set = field(default_factory=set)
+    skip_reasons: Counter = field(default_factory=Counter)
+
+    def skip(self, reason):
+        self.skipped += 1
+        self.skip_reasons[reason] += 1
+
+    def __str__(self):
+        return (f"{self.source}: {self.inserted} inserted, {self.updated} updated, "
+                f"{self.skipped} skipped, {self.matches_created} new matches ({self.elapsed:.2f}s)")
+
+
+def resolve_matches(rows, now, index, league=None):
+    """
+    Maps each future row to an index entry: an existing scheduled match, or a new
+    unsaved Match stored under entry['match']. Returns (pairs, new_entries).
+    New matches go into `league`, or the "International" catch-all when it is None.
+    """
+    new_entries = []
+    pairs = []
+    try:
+        for row in rows:
+            if row.start_time < now:
+                pairs.append((row, None))
+                continue
+
+            entry, confidence = index.lookup(row.home_team, row.away_team, row.start_time)
+            if entry is None:
+                if league is None:
+                    league, _ = League.objects.get_or_create(name="International", defaults={'country': 'World'})
+                match = Match(
+                    home_team=row.home_team, away_team=row.away_team, league=league,
+                    start_time=row.start_time, local_date=timezone.localdate(row.start_time), status='scheduled',
+                )
+                match.slug = match.build_slug()
+                logger.debug("New match %s vs %s (best confidence %.2f)", row.home_team, row.away_team, confidence)
+                # Later rows in the same run should land on this match too
+                entry = index.add({'match': match, 'home_team': row.home_team,
+                                   'away_team': row.away_team, 'start_time': row.start_time})
+                new_entries.append(entry)
+
+            pairs.append((row, entry))
+    except Exception:
+        # Rows resolved so far must not point later sources at matches that were never saved
+        index.discard(new_entries)
+        raise
+    return pairs, new_entries
+
+
+def ingest_tips(source, rows, now, index=None, league=None):
+    """
+    Writes one source's scraped rows in a single transaction.
+    Existing tips are updated when their prediction or analysis changed.
+    Pass the run's MatchIndex to share it across sources; otherwise one is built here.
+    """
+    started = time.monotonic()
+    result = IngestResult(source=source.name)
+    if index is None:
+        index = MatchIndex.build(now)
+
+    new_entries = []
+    try:
+        with transaction.atomic():
+            pairs, new_entries = resolve_matches(rows, now, index, league)
+
+            if new_entries:
+                # ignore_conflicts leaves pks unset, so read them back by their unique slug
+                new_matches = [entry.pop('match') for entry in new_entries]
+                Match.objects.bulk_create(new_matches, ignore_conflicts=True, batch_size=500)
+                saved = {slug: (pk, fixture) for slug, pk, *fixture in Match.objects
+                         .filter(slug__in=[m.slug for m in new_matches])
+                         .values_list('slug', 'id', 'home_team', 'away_team', 'start_time')}
+                for entry, match in zip(new_entries, new_matches):
+                    pk, fixture = saved.get(match.slug, (None, None))
+                    # The slug can belong to a match the index did not load (finished, or the same
+                    # teams on the same day outside MATCH_WINDOW): the insert was skipped, so not ours
+                    if fixture != [match.home_team, match.away_team, match.start_time]:
+                        logger.warning("Slug %s is taken by another match; not saving %s vs %s at %s",
+                                       match.slug, match.home_team, match.away_team, match.start_time)
+                        entry['conflict'] = True
+                        pk = None
+                    entry['id'] = pk
+                result.matches_created = sum(1 for entry in new_entries if entry['id'] is not None)
+                invalidate_matches_on_commit(m.start_time for m in new_matches)
+                refresh_league_summaries({m.league_id for m in new_matches}, now)
+            index.save_aliases()
+
+            new_ids = {id(entry) for entry in new_entries}
+            wanted = {}
+            for row, entry in pairs:
+                if entry is None:
+                    result.skip("kickoff passed")
+                    continue
+                if id(entry) not in new_ids:
+                    result.matched += 1
+                match_id = entry.get('id')
+                if entry.get('conflict'):
+                    result.skip("slug taken by another match")
+                elif match_id is None:
+                    result.skip("match not saved")
+                elif match_id in wanted:
+                    result.skip("duplicate row")
+                else:
+                    wanted[match_id] = row
+
+            existing = {
+                tip.match_id: tip
+                for tip in Tip.objects.filter(source=source, match_id__in=list(wanted))
+                .only('id', 'match_id', 'prediction', 'analysis_text')
+            }
+
+            to_write = []
+            for match_id, row in wanted.items():
+                tip = existing.get(match_id)
+                if tip is not None and (tip.prediction, tip.analysis_text) == (row.prediction, row.analysis_text):
+                    result.skip("unchanged")
+                    continue
+                if tip is None:
+                    result.inserted += 1
+                else:
+                    result.updated += 1
+                to_write.append(Tip(match_id=match_id, source=source,
+                                    prediction=row.prediction, analysis_text=row.analysis_text))
+
+            # One upsert on the (match, source) constraint covers new and changed tips alike,
+            # and a tip inserted concurrently by another run becomes an update instead of a duplicate
+            Tip.objects.bulk_create(to_write, update_conflicts=True, unique_fields=['match', 'source'],
+                                    update_fields=['prediction', 'analysis_text'], batch_size=500)
+
+            result.match_ids = {tip.match_id for tip in to_write}
+            refresh_consensus(result.match_ids)
+            if result.match_ids or result.matches_created:
+                bump_data_version_on_commit()
+    except Exception:
+        # The new matches were rolled back: later sources sharing the index must not find them
+        index.discard(new_entries)
+        raise
+
+    result.elapsed = time.monotonic() - started
+    return result
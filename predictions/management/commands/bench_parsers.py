@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from predictions.replay import FIXTURES_DIR
+from predictions.sources import get_adapters
+from predictions.sources import parsing
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark the source parsers on saved HTML: legacy full-tree html.parser vs the fast path.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Parses per adapter and mode.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        iterations = options['iterations']
+        self.stdout.write(f"Fast path parser: {parsing.PARSER}, restricted trees: {parsing.RESTRICT}")
+
+        for adapter_class in get_adapters(defaults_only=False):
+            # forebet-kenya -> forebet.html
+            fixture = FIXTURES_DIR / f"{adapter_class.key.split('-')[0]}.html"
+            if not fixture.exists():
+                self.stdout.write(f"{adapter_class.key}: no fixture, skipped")
+                continue
+
+            html = fixture.read_bytes()
+            adapter = adapter_class(now)
+
+            with parsing.legacy_parsing():
+                legacy_rows, legacy_time = self.measure(adapter, html, iterations)
+            fast_rows, fast_time = self.measure(adapter, html, iterations)
+
+            if legacy_rows != fast_rows:
+                self.stdout.write(self.style.WARNING(
+                    f"{adapter_class.key}: fast path returned {len(fast_rows)} rows, legacy {len(legacy_rows)}"))
+
+            legacy_rate = len(legacy_rows) * iterations / legacy_time
+            fast_rate = len(fast_rows) * iterations / fast_time
+            self.stdout.write(
+                f"{adapter_class.key:<20} {len(fast_rows):>4} rows  "
+                f"legacy {legacy_rate:>9.0f} rows/s  fast {fast_rate:>9.0f} rows/s  "
+                f"x{legacy_time / fast_time:.1f}")
+
+    def measure(self, adapter, html, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            rows = list(adapter.parse(html))
+        return rows, time.perf_counter() - started
@@ -0,0 +1,154 @@
+import random
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from news.scraping import PULSE_URL, parse_articles, save_articles
+from predictions import fetching
+from predictions.fetching import Fetcher
+from predictions.replay import fixture_pages, replay
+from predictions.sources import get_adapters
+from predictions.sources.runner import run_sources
+
+PLACES = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Thika", "Machakos", "Nyeri", "Kericho", "Malindi",
+          "London", "Madrid", "Milan", "Lisbon", "Lagos", "Accra", "Cairo", "Durban", "Lyon", "Porto"]
+SUFFIXES = ["Rovers", "United", "City", "Stars", "Athletic", "Wanderers", "Rangers", "Sharks", "Queens", "Albion"]
+
+
+class Command(BaseCommand):
+    help = ('Benchmark every scraper offline: replays the saved HTML corpus (or a synthetic one scaled with '
+            '--scale) through the sources into a throwaway database and reports time, queries and memory.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=0,
+                            help='Generate this many fixtures per source instead of using the saved pages.')
+        parser.add_argument('--runs', type=int, default=2,
+                            help='Passes over the corpus; later passes match against rows written by earlier ones.')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Skip tracemalloc, which slows parsing down noticeably.')
+
+    def handle(self, *args, **options):
+        # Never touch the real database: run against a fresh test database
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.bench(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def bench(self, options):
+        now = timezone.now()
+        pages = self.synthetic_pages(options['scale'], now) if options['scale'] else fixture_pages()
+        adapters = get_adapters(defaults_only=False)
+        self.memory = not options['no_memory']
+
+        with replay(pages):
+            for run in range(1, options['runs'] + 1):
+                self.stdout.write(self.style.MIGRATE_HEADING(f"Run {run}"))
+                self.stdout.write(f"{'source':<24}{'rows':>7}{'fetch':>9}{'parse':>9}{'write':>9}"
+                                  f"{'rows/s':>10}{'queries':>9}{'peak MB':>9}")
+
+                for adapter in adapters:
+                    # Same path as scrape_all / scrape_tips, one source at a time, parsing inline
+                    (source_run,), queries, peak = self.measure(
+                        lambda: list(run_sources([adapter], now, Fetcher(workers=1, rate=1000), parse_workers=0)))
+                    if source_run.error:
+                        self.stdout.write(self.style.ERROR(str(source_run)))
+                        continue
+                    self.report(adapter.key, source_run.rows, source_run.fetched.elapsed,
+                                source_run.parse_time, source_run.result.elapsed, queries, peak)
+
+                (timings, rows), queries, peak = self.measure(self.run_news)
+                self.report('pulsesports (news)', rows, *timings, queries, peak)
+
+    def run_news(self):
+        # Same steps as scrape_news
+        started = time.monotonic()
+        response = fetching.create_session().get(PULSE_URL)
+        fetched = time.monotonic()
+        items = parse_articles(response.content)
+        parsed = time.monotonic()
+        save_articles(items)
+        written = time.monotonic()
+        return (fetched - started, parsed - fetched, written - parsed), len(items)
+
+    def measure(self, func):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(1)
+            return execute(sql, params, many, context)
+
+        if self.memory:
+            tracemalloc.start()
+        try:
+            with connection.execute_wrapper(count):
+                result = func()
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20 if self.memory else 0.0
+        finally:
+            if self.memory:
+                tracemalloc.stop()
+        return result, len(queries), peak
+
+    def report(self, name, rows, fetch, parse, write, queries, peak):
+        total = fetch + parse + write
+        rate = rows / total if total else 0.0
+        peak_text = f"{peak:>9.1f}" if self.memory else f"{'-':>9}"
+        self.stdout.write(f"{name:<24}{rows:>7}{fetch:>8.3f}s{parse:>8.3f}s{write:>8.3f}s"
+                          f"{rate:>10.0f}{queries:>9}{peak_text}")
+
+    # =====================================================
+    # SYNTHETIC CORPUS
+    # =====================================================
+    def synthetic_pages(self, scale, now):
+        """
+        Builds `scale` fixtures spread over the next two weeks and renders them as every
+        source's page. Each source spells teams a little differently, as the real sites do,
+        so later sources exercise both exact and fuzzy matching.
+        """
+        rng = random.Random(42)
+        teams = [f"{place} {suffix}" for place in PLACES for suffix in SUFFIXES]
+        fixtures = []
+        for i in range(scale):
+            home, away = rng.sample(teams, 2)
+            kickoff = timezone.localtime(now + timedelta(minutes=rng.randrange(60, 14 * 24 * 60)))
+            fixtures.append((home, away, kickoff.strftime("%d/%m %H:%M"), rng.randint(0, 3), rng.randint(0, 3)))
+
+        def variant(team, style):
+            if style == 'fc':
+                return f"{team} FC"
+            if style == 'short':
+                return team.replace("United", "Utd").replace("Athletic", "Ath")
+            return team
+
+        forebet = "".join(
+            f'<div class="rcnt tr_{i % 2}"><span class="homeTeam">{h}</span><span class="awayTeam">{a}</span>'
+            f'<span class="date_bah">{when}</span><span class="forepr">{hs} - {as_}</span></div>'
+            for i, (h, a, when, hs, as_) in enumerate(fixtures))
+        betwizad = "".join(
+            f'<tr><td>{when}</td><td>{variant(h, "fc")}</td><td>{hs}-{as_}</td><td>{variant(a, "fc")}</td>'
+            f'<td>{"1" if hs > as_ else "2" if as_ > hs else "X"}</td></tr>'
+            for h, a, when, hs, as_ in fixtures)
+        footballpredictions = "".join(
+            f'<div class="prediction-card"><h3>{variant(h, "short")} vs {variant(a, "short")}</h3>'
+            f'<span>&middot; {when}</span><strong>{"Home Win" if hs > as_ else "Away Win" if as_ > hs else "Draw"}'
+            f'</strong></div>'
+            for h, a, when, hs, as_ in fixtures)
+        news = "".join(
+            f'<article><a href="/football/story/synthetic-{i}"><img data-src="https://img.example/{i}.jpg">'
+            f'<h3>{h} vs {a}: what we know</h3></a></article>'
+            for i, (h, a, *_) in enumerate(fixtures))
+
+        wrap = "<html><body><div class=\"schema\">{}</div><table>{}</table></body></html>".format
+        pages = {PULSE_URL: f"<html><body><main>{news}</main></body></html>".encode()}
+        bodies = {'forebet': wrap(forebet, ""), 'betwizad': wrap("", betwizad),
+                  'footballpredictions': f"<html><body>{footballpredictions}</body></html>"}
+        for adapter in get_adapters(defaults_only=False):
+            body = bodies.get(adapter.key.split('-')[0])
+            if body:
+                for url in adapter.urls:
+                    pages[url] = body.encode()
+        return pages
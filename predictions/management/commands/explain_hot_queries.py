@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from core.sitemaps import match_rows, match_section, month_counts
+from news.models import NewsArticle
+from news.views import PAGE_SIZE as NEWS_PAGE_SIZE
+from predictions.consensus import BATCH_SIZE, vote_count
+from predictions.models import League, Match, MatchSnapshot, Source, Tip
+
+
+class Command(BaseCommand):
+    help = ("Print the query plan (EXPLAIN) of each public view's queries and the ingestion lookups, "
+            "to check they use the Match/Tip indexes. Works on SQLite and PostgreSQL.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true',
+                            help='EXPLAIN ANALYZE: run the queries and show real timings (PostgreSQL only).')
+        parser.add_argument('--sql', action='store_true', help='Also print the SQL of each query.')
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor != 'postgresql':
+                raise CommandError("--analyze needs PostgreSQL; SQLite only reports the plan.")
+            explain_options = {'analyze': True, 'buffers': True}
+
+        self.stdout.write(f"Database: {connection.vendor}")
+        for name, queryset in self.hot_queries():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}"))
+            if options['sql']:
+                self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+
+    def hot_queries(self):
+        """The querysets the views and ingestion run, with real ids where the database has any."""
+        now = timezone.now()
+        league = League.objects.first() or League(pk=0, slug='none')
+        match = Match.objects.first() or Match(pk=0, slug='none')
+        source = Source.objects.first() or Source(pk=0)
+        article = NewsArticle.objects.first() or NewsArticle(pk=0)
+        match_ids = list(Match.objects.values_list('id', flat=True)[:500]) or [0]
+        upcoming = Match.objects.filter(status='scheduled', start_time__gt=now).with_consensus().order_by('start_time')
+
+        return [
+            ("index: next 20 matches", upcoming[:20]),
+            ("prediction_list: page of upcoming matches", upcoming[:20]),
+            ("prediction_list: filtered by league", upcoming.filter(league__slug=league.slug)[:20]),
+            ("prediction_list: one day", upcoming.filter(local_date=timezone.localdate(now))[:20]),
+            ("prediction_list: per-day counts",
+             Match.objects.filter(status='scheduled', start_time__gt=now, local_date__gte=timezone.localdate(now))
+             .values_list('local_date').annotate(n=Count('id')).order_by()),
+            ("league summaries: upcoming matches per league",
+             Match.objects.filter(status='scheduled', start_time__gt=now)
+             .values('league_id').annotate(n=Count('id'), next=Min('start_time')).order_by()),
+            ("league_detail: page of upcoming matches of one league",
+             Match.objects.filter(league=league, status='scheduled', start_time__gt=now)
+             .with_consensus().order_by('start_time', 'pk')[:21]),
+            ("league_archive: page of past matches of one league",
+             Match.objects.filter(league=league, start_time__lte=now).with_consensus().order_by('-start_time', '-pk')[:21]),
+            ("match_detail: match by slug", Match.objects.filter(slug=match.slug)),
+            ("match_detail: snapshot by slug",
+             MatchSnapshot.objects.filter(match__slug=match.slug).values_list('data', flat=True)[:1]),
+            # The sitemap's own builders, so the plan shown is the query it runs
+            ("sitemap: one month of matches", match_rows(match_section(now), 1)),
+            ("sitemap: index of months", month_counts()),
+            ("news_list: first page", NewsArticle.objects.order_by('-published_at', '-pk')[:NEWS_PAGE_SIZE + 1]),
+            ("news_list: page after a cursor",
+             NewsArticle.objects.filter(Q(published_at__lt=now) | Q(published_at=now, pk__lt=article.pk))
+             .order_by('-published_at', '-pk')[:NEWS_PAGE_SIZE + 1]),
+            ("ingestion: existing tips of a source",
+             Tip.objects.filter(source=source, match_id__in=match_ids).only('id', 'match_id', 'prediction', 'analysis_text')),
+            # refresh_consensus runs these subqueries in an UPDATE, which explain() cannot take;
+            # the same SELECT shows how each correlated count finds its tips
+            ("consensus: per-outcome vote subqueries",
+             Match.objects.filter(pk__in=match_ids[:BATCH_SIZE])
+             .values('pk').annotate(home=vote_count('1'), draw=vote_count('X'), away=vote_count('2'))),
+        ]
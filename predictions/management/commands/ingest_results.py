@@ -0,0 +1,58 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from predictions.settlement import ResultRow, record_results, settle
+from predictions.weighting import refresh_weighted_consensus
+
+COLUMNS = ('home_team', 'away_team', 'kickoff', 'home_score', 'away_score')
+
+
+class Command(BaseCommand):
+    help = ('Record final scores from a CSV with columns home_team,away_team,kickoff,home_score,away_score '
+            '(kickoff as "YYYY-MM-DD HH:MM", local time unless it has an offset).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file, or - for stdin.')
+        parser.add_argument('--settle', action='store_true', help='Score the tips of the finished matches right away.')
+
+    def handle(self, *args, **options):
+        try:
+            stream = sys.stdin if options['path'] == '-' else open(options['path'], newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(e)
+
+        with stream:
+            reader = csv.DictReader(stream)
+            missing = set(COLUMNS) - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"Missing columns: {', '.join(sorted(missing))}")
+            rows = [self.parse_row(line, number) for number, line in enumerate(reader, start=2)]
+
+        updated, unmatched = record_results(rows)
+        for row in unmatched:
+            self.stdout.write(self.style.WARNING(
+                f"No match for {row.home_team} vs {row.away_team} at {row.start_time:%Y-%m-%d %H:%M}"))
+        self.stdout.write(self.style.SUCCESS(f"Recorded {updated} results, {len(unmatched)} unmatched."))
+
+        if options['settle']:
+            self.stdout.write(str(settle()))
+            self.stdout.write(f"Weighted consensus rewritten for {refresh_weighted_consensus()} matches")
+
+    def parse_row(self, line, number):
+        # A short row leaves its missing cells as None
+        cell = {column: (line.get(column) or '').strip() for column in COLUMNS}
+        try:
+            # None for a malformed value, ValueError for an impossible date such as 2026-02-30
+            kickoff = parse_datetime(cell['kickoff'])
+            if kickoff is None:
+                raise ValueError(f"bad kickoff {cell['kickoff']!r}")
+            if timezone.is_naive(kickoff):
+                kickoff = timezone.make_aware(kickoff)
+            return ResultRow(cell['home_team'], cell['away_team'], kickoff,
+                             int(cell['home_score']), int(cell['away_score']))
+        except (TypeError, ValueError) as e:
+            raise CommandError(f"Line {number}: {e}")
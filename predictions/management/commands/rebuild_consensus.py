@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from predictions.consensus import refresh_consensus
+from predictions.models import Match
+from predictions.weighting import refresh_weighted_consensus
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored 1/X/2 consensus columns on every match from its tips.'
+
+    def handle(self, *args, **kwargs):
+        match_ids = list(Match.objects.values_list('id', flat=True))
+        self.stdout.write(f"Rebuilding consensus for {len(match_ids)} matches...")
+
+        with transaction.atomic():
+            updated = refresh_consensus(match_ids)
+
+        self.stdout.write(self.style.SUCCESS(f"Consensus rebuilt for {updated} matches."))
+
+        weighted = refresh_weighted_consensus()
+        self.stdout.write(self.style.SUCCESS(f"Weighted consensus rewritten for {weighted} upcoming matches."))
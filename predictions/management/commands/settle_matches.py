@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from predictions.settlement import BATCH_SIZE, settle
+from predictions.weighting import refresh_weighted_consensus
+
+
+class Command(BaseCommand):
+    help = 'Score the tips of matches whose result is in and update every source\'s accuracy.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Matches settled per transaction.')
+
+    def handle(self, *args, **options):
+        result = settle(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(str(result)))
+        if result.matches:
+            # Fresh accuracy figures reweight the upcoming matches
+            rewritten = refresh_weighted_consensus()
+            self.stdout.write(f"Weighted consensus rewritten for {rewritten} matches")
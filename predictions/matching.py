@@ -0,0 +1,205 @@
+"""
+Team-name resolution for scraped rows.
+
+MatchIndex is built once per scrape run. It keys scheduled matches by
+(home key, away key, time bucket) so the common case is a dict lookup, and
+falls back to token-set / trigram similarity over the matches in
+neighbouring time buckets only. Confident fuzzy hits are remembered as TeamAlias
+rows, so the next run resolves them exactly.
+"""
+import logging
+import re
+import unicodedata
+from datetime import timedelta
+from functools import lru_cache
+
+from .models import Match, TeamAlias
+
+logger = logging.getLogger(__name__)
+
+# Scraped kickoff times drift between sites, so matches within this window are the same game
+MATCH_WINDOW = timedelta(hours=4)
+
+# Club-type affixes carry no identity. Words like 'city' or 'united' do (Manchester City vs United).
+FLUFF_TOKENS = {'fc', 'cf', 'afc', 'sc', 'ac', 'as', 'cd', 'fk', 'sk', 'club', 'the'}
+
+# Tokens that name a different side of the same club: 'Chelsea U21' and 'Arsenal Women'
+# are never 'Chelsea' or 'Arsenal', however similar the rest of the name is
+VARIANT_TOKENS = {'women', 'w', 'ladies', 'femenino', 'b', 'ii', 'reserves', 'res', 'youth'}
+
+# Minimum similarity on each side for a fuzzy match to be accepted
+FUZZY_THRESHOLD = 0.75
+# A fuzzy hit is only remembered as a TeamAlias above this; an alias is permanent
+ALIAS_THRESHOLD = 0.9
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_AGE_GROUP = re.compile(r'\bu (\d{2})\b')
+
+
+def normalize_team_name(name):
+    """'Atlético Madrid FC' -> 'atletico madrid', 'Chelsea U-21' -> 'chelsea u21'. Only whole fluff tokens go."""
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    tokens = _AGE_GROUP.sub(r'u\1', _NON_ALNUM.sub(' ', name.lower())).split()
+    kept = [t for t in tokens if t not in FLUFF_TOKENS]
+    return ' '.join(kept or tokens)
+
+
+@lru_cache(maxsize=65536)
+def trigrams(key):
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _is_abbreviation(short, long):
+    """'utd' -> 'united', 'man' -> 'manchester': same first letter, letters appear in order."""
+    if len(short) < 2 or len(short) >= len(long) or short[0] != long[0]:
+        return False
+    rest = iter(long)
+    return all(ch in rest for ch in short)
+
+
+def _token_similarity(a, b):
+    if a == b:
+        return 1.0
+    if _is_abbreviation(a, b) or _is_abbreviation(b, a):
+        return 0.9
+    ta, tb = trigrams(a), trigrams(b)
+    return len(ta & tb) / len(ta | tb)
+
+
+def _variant(tokens):
+    return {t for t in tokens if t in VARIANT_TOKENS or (len(t) == 3 and t[0] == 'u' and t[1:].isdigit())}
+
+
+@lru_cache(maxsize=262144)
+def similarity(a, b):
+    """
+    Similarity of two keys, 0.0 - 1.0: the better of whole-key trigram overlap and a
+    token-set score. Tokens are paired one to one, best pairs first, and the sum is divided
+    by the longer key's token count, so an unpaired token ('inter' vs 'inter miami') costs.
+    Keys for different sides of a club (women, youth, reserves) score 0.
+    """
+    if a == b:
+        return 1.0
+    tokens_a, tokens_b = a.split(), b.split()
+    if _variant(tokens_a) != _variant(tokens_b):
+        return 0.0
+    ta, tb = trigrams(a), trigrams(b)
+    jaccard = len(ta & tb) / len(ta | tb) if ta and tb else 0.0
+    if not tokens_a or not tokens_b:
+        return jaccard
+
+    pairs = sorted(((_token_similarity(t, u), i, j) for i, t in enumerate(tokens_a) for j, u in enumerate(tokens_b)),
+                   reverse=True)
+    used_a, used_b, total = set(), set(), 0.0
+    for score, i, j in pairs:
+        if i not in used_a and j not in used_b:
+            used_a.add(i)
+            used_b.add(j)
+            total += score
+    return max(jaccard, total / max(len(tokens_a), len(tokens_b)))
+
+
+class MatchIndex:
+    """In-memory index of scheduled matches, keyed by canonical team keys and time bucket."""
+
+    def __init__(self, aliases=None):
+        self.aliases = aliases or {}  # key -> canonical team key
+        self.by_key = {}  # (home, away, bucket) -> [entry]
+        self.by_bucket = {}  # bucket -> [entry]
+        self.learned = {}  # key -> TeamAlias, pending save
+
+    @classmethod
+    def build(cls, since, until=None, include_finished=False):
+        """
+        Loads every alias and every scheduled match kicking off after `since` (and before
+        `until`) in two queries. Results ingestion passes include_finished to correct scores.
+        """
+        index = cls(dict(TeamAlias.objects.values_list('key', 'team_key')))
+        matches = Match.objects.filter(start_time__gte=since - MATCH_WINDOW)
+        if until is not None:
+            matches = matches.filter(start_time__lte=until + MATCH_WINDOW)
+        if not include_finished:
+            matches = matches.filter(status='scheduled')
+        matches = matches.values_list('id', 'home_team', 'away_team', 'start_time')
+        for pk, home, away, start_time in matches:
+            index.add({'id': pk, 'home_team': home, 'away_team': away, 'start_time': start_time})
+        return index
+
+    def canonical(self, name):
+        key = normalize_team_name(name)
+        return self.aliases.get(key, key)
+
+    def bucket(self, start_time):
+        return int(start_time.timestamp() // MATCH_WINDOW.total_seconds())
+
+    def add(self, entry):
+        entry['home_key'] = self.canonical(entry['home_team'])
+        entry['away_key'] = self.canonical(entry['away_team'])
+        bucket = self.bucket(entry['start_time'])
+        self.by_key.setdefault((entry['home_key'], entry['away_key'], bucket), []).append(entry)
+        self.by_bucket.setdefault(bucket, []).append(entry)
+        return entry
+
+    def discard(self, entries):
+        """Takes entries back out, e.g. new matches whose transaction rolled back."""
+        for entry in entries:
+            bucket = self.bucket(entry['start_time'])
+            for index, key in ((self.by_key, (entry['home_key'], entry['away_key'], bucket)),
+                               (self.by_bucket, bucket)):
+                if key in index:
+                    index[key] = [e for e in index[key] if e is not entry]
+
+    def _nearby(self, start_time):
+        bucket = self.bucket(start_time)
+        for b in (bucket, bucket - 1, bucket + 1):
+            for entry in self.by_bucket.get(b, ()):
+                if abs(entry['start_time'] - start_time) <= MATCH_WINDOW:
+                    yield entry
+
+    def lookup(self, home_team, away_team, start_time):
+        """Returns (entry, confidence) for the best match within the window, or (None, best score)."""
+        home, away = self.canonical(home_team), self.canonical(away_team)
+
+        bucket = self.bucket(start_time)
+        for b in (bucket, bucket - 1, bucket + 1):
+            for entry in self.by_key.get((home, away, b), ()):
+                if abs(entry['start_time'] - start_time) <= MATCH_WINDOW:
+                    return entry, 1.0
+
+        best, best_score, sides = None, 0.0, (0.0, 0.0)
+        for entry in self._nearby(start_time):
+            # The score is the weaker side, so skip the away side when home already fails
+            home_score = similarity(home, entry['home_key'])
+            if home_score < FUZZY_THRESHOLD or home_score <= best_score:
+                continue
+            away_score = similarity(away, entry['away_key'])
+            score = min(home_score, away_score)
+            if score > best_score:
+                best, best_score, sides = entry, score, (home_score, away_score)
+
+        if best is None or best_score < FUZZY_THRESHOLD:
+            return None, best_score
+
+        logger.info("Fuzzy matched %s vs %s -> %s vs %s (confidence %.2f)",
+                    home_team, away_team, best['home_team'], best['away_team'], best_score)
+        self.learn(home_team, best['home_key'], sides[0])
+        self.learn(away_team, best['away_key'], sides[1])
+        return best, best_score
+
+    def learn(self, name, team_key, confidence):
+        """Remembers `name` as `team_key` for later runs, if the match was confident enough to keep."""
+        key = normalize_team_name(name)
+        if key == team_key or key in self.aliases or confidence < ALIAS_THRESHOLD:
+            return
+        self.aliases[key] = team_key
+        self.learned[key] = TeamAlias(name=name[:100], key=key[:100], team_key=team_key[:100], confidence=confidence)
+
+    def save_aliases(self):
+        """Persists aliases learned from fuzzy matches so later runs resolve them exactly."""
+        if not self.learned:
+            return 0
+        TeamAlias.objects.bulk_create(self.learned.values(), ignore_conflicts=True)
+        count = len(self.learned)
+        self.learned = {}
+        return count
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:25
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_consensus(apps, schema_editor):
+    Match = apps.get_model('predictions', 'Match')
+    Tip = apps.get_model('predictions', 'Tip')
+
+    counts = {}
+    rows = Tip.objects.values('match_id', 'prediction').annotate(c=Count('id')).order_by()
+    for row in rows:
+        counts.setdefault(row['match_id'], {'1': 0, 'X': 0, '2': 0})[row['prediction']] = row['c']
+
+    matches = []
+    for match_id, c in counts.items():
+        total = c['1'] + c['X'] + c['2']
+        if not total:
+            continue
+        matches.append(Match(
+            pk=match_id,
+            home_votes=c['1'], draw_votes=c['X'], away_votes=c['2'], total_votes=total,
+            home_pct=c['1'] / total * 100, draw_pct=c['X'] / total * 100, away_pct=c['2'] / total * 100,
+        ))
+    Match.objects.bulk_update(matches, [
+        'home_votes', 'draw_votes', 'away_votes', 'total_votes', 'home_pct', 'draw_pct', 'away_pct',
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='away_pct',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='away_votes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='draw_pct',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='draw_votes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='home_pct',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='home_votes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='total_votes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_consensus, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0002_match_consensus_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('team_key', models.CharField(db_index=True, max_length=100)),
+                ('confidence', models.FloatField(default=1.0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:42
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def drop_duplicate_tips(apps, schema_editor):
+    """Keeps the newest tip per (match, source) so the unique constraint can be added."""
+    Match = apps.get_model('predictions', 'Match')
+    Tip = apps.get_model('predictions', 'Tip')
+
+    duplicates = Tip.objects.values('match_id', 'source_id').annotate(n=Count('id'), keep=Max('id')).filter(n__gt=1)
+    match_ids = set()
+    for row in duplicates:
+        Tip.objects.filter(match_id=row['match_id'], source_id=row['source_id']).exclude(id=row['keep']).delete()
+        match_ids.add(row['match_id'])
+
+    # Historical models have no signals, so recount the affected matches here
+    for match_id in match_ids:
+        c = {'1': 0, 'X': 0, '2': 0}
+        for row in Tip.objects.filter(match_id=match_id).values('prediction').annotate(n=Count('id')).order_by():
+            c[row['prediction']] = row['n']
+        total = c['1'] + c['X'] + c['2']
+        share = (lambda v: v / total * 100) if total else (lambda v: 0.0)
+        Match.objects.filter(pk=match_id).update(
+            home_votes=c['1'], draw_votes=c['X'], away_votes=c['2'], total_votes=total,
+            home_pct=share(c['1']), draw_pct=share(c['X']), away_pct=share(c['2']),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0003_teamalias'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['status', 'start_time'], name='match_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['league', 'status', 'start_time'], name='match_league_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(condition=models.Q(('status', 'scheduled')), fields=['start_time'], name='match_scheduled_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tip',
+            index=models.Index(fields=['match', 'prediction'], name='tip_match_prediction_idx'),
+        ),
+        migrations.RunPython(drop_duplicate_tips, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tip',
+            constraint=models.UniqueConstraint(fields=('match', 'source'), name='unique_tip_per_source'),
+        ),
+    ]
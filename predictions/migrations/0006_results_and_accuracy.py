@@ -0,0 +1,77 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0005_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceAccuracy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tips_scored', models.PositiveIntegerField(default=0)),
+                ('tips_correct', models.PositiveIntegerField(default=0)),
+                ('accuracy', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='away_score',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='home_score',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='result',
+            field=models.CharField(blank=True, choices=[('1', 'Home'), ('X', 'Draw'), ('2', 'Away')], max_length=1),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='settled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='source',
+            name='tips_correct',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='source',
+            name='tips_scored',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tip',
+            name='is_correct',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(condition=models.Q(('settled_at__isnull', True), models.Q(('result', ''), _negated=True)), fields=['id'], name='match_unsettled_idx'),
+        ),
+        migrations.AddField(
+            model_name='sourceaccuracy',
+            name='league',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='source_accuracy', to='predictions.league'),
+        ),
+        migrations.AddField(
+            model_name='sourceaccuracy',
+            name='source',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='league_accuracy', to='predictions.source'),
+        ),
+        migrations.AddConstraint(
+            model_name='sourceaccuracy',
+            constraint=models.UniqueConstraint(fields=('source', 'league'), name='unique_source_league_accuracy'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0006_results_and_accuracy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchSnapshot',
+            fields=[
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='predictions.match')),
+                ('data', models.BinaryField()),
+                ('built_at', models.DateTimeField()),
+            ],
+        ),
+    ]
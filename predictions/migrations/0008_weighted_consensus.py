@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0007_matchsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeightedConsensus',
+            fields=[
+                ('match', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='weighted', serialize=False, to='predictions.match')),
+                ('home_pct', models.FloatField(default=0.0)),
+                ('draw_pct', models.FloatField(default=0.0)),
+                ('away_pct', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:20
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_local_date(apps, schema_editor):
+    Match = apps.get_model('predictions', 'Match')
+    matches = []
+    for pk, start_time in Match.objects.values_list('id', 'start_time').iterator():
+        matches.append(Match(pk=pk, local_date=timezone.localdate(start_time)))
+    Match.objects.bulk_update(matches, ['local_date'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0008_weighted_consensus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='local_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_local_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='match',
+            name='local_date',
+            field=models.DateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['status', 'local_date', 'start_time'], name='match_status_date_idx'),
+        ),
+    ]
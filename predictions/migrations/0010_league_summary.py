@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:21
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+from django.utils import timezone
+
+
+def fill_summaries(apps, schema_editor):
+    League = apps.get_model('predictions', 'League')
+    Match = apps.get_model('predictions', 'Match')
+    summaries = Match.objects.filter(status='scheduled', start_time__gt=timezone.now()) \
+        .values('league_id').annotate(n=Count('id'), next=Min('start_time')).order_by()
+    for row in summaries:
+        League.objects.filter(pk=row['league_id']).update(upcoming_count=row['n'], next_kickoff=row['next'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0009_match_local_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='league',
+            name='next_kickoff',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='league',
+            name='upcoming_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
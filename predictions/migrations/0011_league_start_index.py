@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0010_league_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['league', 'start_time'], name='match_league_start_idx'),
+        ),
+    ]
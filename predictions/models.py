@@ -1,7 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.text import slugify
 from django.urls import reverse
-from django.db.models import Count
 
 
 class League(models.Model):
@@ -9,6 +10,11 @@ class League(models.Model):
     country = models.CharField(max_length=100)
     # Add this line below:
     slug = models.SlugField(unique=True, blank=True)
+    # Bumped whenever one of its matches changes; drives Last-Modified on the league page
+    updated_at = models.DateTimeField(auto_now=True)
+    # Summary of its scheduled matches, maintained by predictions.summaries
+    upcoming_count = models.PositiveIntegerField(default=0)
+    next_kickoff = models.DateTimeField(null=True, blank=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -24,48 +30,108 @@ class Source(models.Model):
     name = models.CharField(max_length=100)
     url = models.URLField()
     accuracy_score = models.FloatField(default=0.0)  # Percentage (0-100)
+    # Settled tips so far, maintained incrementally by predictions.settlement
+    tips_scored = models.PositiveIntegerField(default=0)
+    tips_correct = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.name
 
 
+class MatchQuerySet(models.QuerySet):
+    def with_consensus(self):
+        """
+        Loads each match's league and weighted consensus in the same query, so listings render
+        league and both consensus figures without per-row queries. The 1/X/2 figures come from
+        the stored consensus columns (predictions.consensus).
+        """
+        return self.select_related('league', 'weighted')
+
+
 class Match(models.Model):
     STATUS_CHOICES = (('scheduled', 'Scheduled'), ('finished', 'Finished'))
+    RESULT_CHOICES = (('1', 'Home'), ('X', 'Draw'), ('2', 'Away'))
 
     league = models.ForeignKey(League, on_delete=models.CASCADE)
     home_team = models.CharField(max_length=100)
     away_team = models.CharField(max_length=100)
     start_time = models.DateTimeField(db_index=True)  # Indexed for speed
+    # Kickoff day in TIME_ZONE, set on save; the date filters are equality/range lookups on it
+    local_date = models.DateField(editable=False)
     slug = models.SlugField(max_length=255, unique=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='scheduled')
+    # Set on save and by refresh_consensus; drives Last-Modified on the match page
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Denormalized consensus, maintained by predictions.consensus whenever tips change
+    home_votes = models.PositiveIntegerField(default=0)
+    draw_votes = models.PositiveIntegerField(default=0)
+    away_votes = models.PositiveIntegerField(default=0)
+    total_votes = models.PositiveIntegerField(default=0)
+    home_pct = models.FloatField(default=0.0)
+    draw_pct = models.FloatField(default=0.0)
+    away_pct = models.FloatField(default=0.0)
+    # Final score, recorded by ingest_results; settle_matches then scores the tips and sets settled_at
+    home_score = models.PositiveSmallIntegerField(null=True, blank=True)
+    away_score = models.PositiveSmallIntegerField(null=True, blank=True)
+    result = models.CharField(max_length=1, choices=RESULT_CHOICES, blank=True)
+    settled_at = models.DateTimeField(null=True, blank=True)
+
+    objects = MatchQuerySet.as_manager()
 
     class Meta:
         ordering = ['start_time']
         unique_together = ('home_team', 'away_team', 'start_time')
+        indexes = [
+            # Listings and the sitemap: status='scheduled' AND start_time > now ORDER BY start_time
+            models.Index(fields=['status', 'start_time'], name='match_status_start_idx'),
+            models.Index(fields=['league', 'status', 'start_time'], name='match_league_status_start_idx'),
+            # League archive: league_id = ? AND start_time <= now ORDER BY start_time DESC, whatever the status
+            models.Index(fields=['league', 'start_time'], name='match_league_start_idx'),
+            # Day filters and the per-day counts: status='scheduled' AND local_date [=|BETWEEN] ... ORDER BY start_time
+            models.Index(fields=['status', 'local_date', 'start_time'], name='match_status_date_idx'),
+            # Only upcoming matches; skipped on backends without partial indexes
+            models.Index(fields=['start_time'], condition=Q(status='scheduled'), name='match_scheduled_start_idx'),
+            # Settlement queue: a result is in but the tips are not scored yet
+            models.Index(fields=['id'], condition=Q(settled_at__isnull=True) & ~Q(result=''),
+                         name='match_unsettled_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(f"{self.home_team}-vs-{self.away_team}-{self.start_time.strftime('%Y-%m-%d')}")
+            self.slug = self.build_slug()
+        self.local_date = timezone.localdate(self.start_time)
         super().save(*args, **kwargs)
 
+    def build_slug(self):
+        return slugify(f"{self.home_team}-vs-{self.away_team}-{self.start_time.strftime('%Y-%m-%d')}")
+
     def get_absolute_url(self):
         return reverse('match_detail', kwargs={'slug': self.slug})
 
     # --- THE ADSENSE VALUE GENERATOR ---
     def get_consensus_data(self):
-        """Returns the percentage of votes for Home, Draw, Away based on scraped tips."""
-        tips = self.tips.all()
-        total = tips.count()
-        if total == 0:
-            return None
+        """Returns the percentage of votes for Home, Draw, Away based on scraped tips.
 
-        counts = tips.values('prediction').annotate(c=Count('prediction'))
-        data = {'1': 0, 'X': 0, '2': 0}
+        Reads the stored consensus columns, so it costs no queries.
+        """
+        if not self.total_votes:
+            return None
 
-        for item in counts:
-            data[item['prediction']] = (item['c'] / total) * 100
+        return {'1': self.home_pct, 'X': self.draw_pct, '2': self.away_pct}
 
-        return data
+    def get_weighted_consensus(self):
+        """
+        Accuracy-weighted 1/X/2 percentages, or None before the first weighting pass.
+        Free when the match was loaded through with_consensus(), which joins them in.
+        """
+        try:
+            weighted = self.weighted
+        except WeightedConsensus.DoesNotExist:
+            return None
+        if not self.total_votes:
+            return None
+        return {'1': weighted.home_pct, 'X': weighted.draw_pct, '2': weighted.away_pct}
 
 
 class Tip(models.Model):
@@ -75,6 +141,83 @@ class Tip(models.Model):
     source = models.ForeignKey(Source, on_delete=models.CASCADE)
     prediction = models.CharField(max_length=5, choices=PREDICTION_CHOICES)
     analysis_text = models.TextField(blank=True, null=True)  # Short unique text
+    # Set when the match is settled; None until then
+    is_correct = models.BooleanField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # One tip per source per match; ingestion upserts against it
+            models.UniqueConstraint(fields=['match', 'source'], name='unique_tip_per_source'),
+        ]
+        indexes = [
+            # Consensus counts group a match's tips by prediction without reading the rows
+            models.Index(fields=['match', 'prediction'], name='tip_match_prediction_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .consensus import refresh_consensus
+
+        # Keep the stored consensus in the same transaction as the tip write.
+        # _loaded_match_id is set by predictions.signals so a re-pointed tip refreshes both matches.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            refresh_consensus({self.match_id, getattr(self, '_loaded_match_id', None)})
+        self._loaded_match_id = self.match_id
+
+    def __str__(self):
+        return f"{self.match} - {self.prediction}"
+
+class WeightedConsensus(models.Model):
+    """
+    A match's 1/X/2 shares with each tip weighted by its source's accuracy (see predictions.weighting).
+    A table of its own rather than columns on Match so the batch pass can rewrite thousands of rows
+    with one upsert per batch.
+    """
+    match = models.OneToOneField(Match, primary_key=True, related_name='weighted', on_delete=models.CASCADE)
+    home_pct = models.FloatField(default=0.0)
+    draw_pct = models.FloatField(default=0.0)
+    away_pct = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Weighted consensus of match {self.match_id}"
+
+
+class MatchSnapshot(models.Model):
+    """
+    Everything the match page shows, as one zlib-compressed JSON blob (see predictions.snapshots).
+    Deleted whenever the match, its tips or its sources' accuracy change, and rebuilt on the next read.
+    """
+    match = models.OneToOneField(Match, primary_key=True, related_name='snapshot', on_delete=models.CASCADE)
+    data = models.BinaryField()
+    built_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Snapshot of match {self.match_id}"
+
+
+class SourceAccuracy(models.Model):
+    """A source's settled-tip record in one league, maintained incrementally by predictions.settlement."""
+    source = models.ForeignKey(Source, related_name='league_accuracy', on_delete=models.CASCADE)
+    league = models.ForeignKey(League, related_name='source_accuracy', on_delete=models.CASCADE)
+    tips_scored = models.PositiveIntegerField(default=0)
+    tips_correct = models.PositiveIntegerField(default=0)
+    accuracy = models.FloatField(default=0.0)  # Percentage (0-100)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['source', 'league'], name='unique_source_league_accuracy')]
+
+    def __str__(self):
+        return f"{self.source} in {self.league}: {self.accuracy:.1f}%"
+
+
+class TeamAlias(models.Model):
+    """Maps a normalized spelling of a team, as seen on some source, to the canonical team key."""
+    name = models.CharField(max_length=100)  # Raw spelling as scraped
+    key = models.CharField(max_length=100, unique=True)  # normalize_team_name(name)
+    team_key = models.CharField(max_length=100, db_index=True)  # Key of the canonical spelling
+    confidence = models.FloatField(default=1.0)  # Similarity score when the alias was learned
 
     def __str__(self):
-        return f"{self.match} - {self.prediction}"
\ No newline at end of file
+        return f"{self.name} -> {self.team_key}"
@@ -0,0 +1,81 @@
+"""
+Offline replay of scraped pages.
+
+replay() swaps predictions.fetching.create_session for one that returns a
+plain requests.Session whose transport serves canned bodies by URL, so
+scrape_all, scrape_tips and scrape_news run unchanged against saved HTML.
+Pages carry an ETag and honour If-None-Match like a real server, and each
+replay gets its own empty scraper cache.
+"""
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+import requests
+from django.test import override_settings
+from requests.adapters import BaseAdapter
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'html_fixtures'
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests transport that answers from a {url: bytes} mapping; anything else is a 404."""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request.url)
+        body = self.pages.get(request.url)
+
+        response = requests.Response()
+        response.status_code = 200 if body is not None else 404
+        response._content = body if body is not None else b""
+        if body is not None:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            response.headers['ETag'] = etag
+            if request.headers.get('If-None-Match') == etag:
+                response.status_code, response._content = 304, b""
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def fixture_pages():
+    """Maps every known source URL to its saved page under html_fixtures/."""
+    from news.scraping import PULSE_URL
+    from .sources import REGISTRY
+
+    pages = {PULSE_URL: (FIXTURES_DIR / 'pulsesports.html').read_bytes()}
+    for adapter in REGISTRY.values():
+        # forebet-kenya -> forebet.html
+        fixture = FIXTURES_DIR / f"{adapter.key.split('-')[0]}.html"
+        if fixture.exists():
+            for url in adapter.urls:
+                pages[url] = fixture.read_bytes()
+    return pages
+
+
+@contextmanager
+def replay(pages=None):
+    """Serves `pages` (default: the fixture corpus) to every scraper session opened inside the block."""
+    transport = ReplayAdapter(fixture_pages() if pages is None else pages)
+
+    def create_session():
+        session = requests.Session()
+        session.mount('http://', transport)
+        session.mount('https://', transport)
+        return session
+
+    with tempfile.TemporaryDirectory() as cache_dir, override_settings(SCRAPER_CACHE_DIR=cache_dir), \
+            mock.patch('predictions.fetching.create_session', create_session):
+        yield transport
@@ -0,0 +1,197 @@
+"""
+Results and tip settlement.
+
+record_results() stores final scores on matches (ingest_results). settle()
+then takes matches with a result but no settled_at, in batches, and per batch:
+
+  1. marks every tip right or wrong with two UPDATEs (no rows in Python),
+  2. counts right/wrong per (source, league) with one GROUP BY,
+  3. adds those counts to the running totals on Source and SourceAccuracy.
+
+Only the newly settled batch is read, never the history, so a run costs the
+same with a hundred settled tips as with millions. Source.accuracy_score
+switches from its seeded default to the measured figure once the source has
+MIN_SCORED settled tips.
+"""
+import logging
+import time
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from core.cache import bump_data_version_on_commit
+from core.sitemaps import invalidate_matches_on_commit
+
+from .matching import MatchIndex
+from .models import League, Match, Source, SourceAccuracy, Tip
+from .snapshots import invalidate_snapshots
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+# Settled tips before the measured accuracy replaces a source's seeded score
+MIN_SCORED = 20
+
+
+@dataclass
+class ResultRow:
+    home_team: str
+    away_team: str
+    start_time: object  # aware datetime
+    home_score: int
+    away_score: int
+
+    @property
+    def result(self):
+        if self.home_score > self.away_score:
+            return '1'
+        return '2' if self.away_score > self.home_score else 'X'
+
+
+@dataclass
+class SettleResult:
+    matches: int = 0
+    tips: int = 0
+    correct: int = 0
+    elapsed: float = 0.0
+
+    def __str__(self):
+        rate = self.correct * 100 / self.tips if self.tips else 0.0
+        return (f"{self.matches} matches settled, {self.tips} tips scored, {self.correct} correct "
+                f"({rate:.1f}%) in {self.elapsed:.2f}s")
+
+
+def record_results(rows, now=None):
+    """
+    Stores final scores for `rows` (ResultRows) on the matches they resolve to,
+    using the same team matching as the scrapers. Returns (matches updated, unmatched rows).
+    """
+    now = now or timezone.now()
+    rows = list(rows)
+    if not rows:
+        return 0, []
+
+    kickoffs = [row.start_time for row in rows]
+    index = MatchIndex.build(min(kickoffs), max(kickoffs), include_finished=True)
+    updates, unmatched, kickoffs = {}, [], set()
+    for row in rows:
+        entry, _ = index.lookup(row.home_team, row.away_team, row.start_time)
+        if entry is None:
+            unmatched.append(row)
+            continue
+        updates[entry['id']] = Match(pk=entry['id'], home_score=row.home_score, away_score=row.away_score,
+                                     result=row.result, status='finished', updated_at=now)
+        kickoffs.add(entry['start_time'])
+
+    with transaction.atomic():
+        # A corrected score un-settles the match so settle() scores it again
+        Match.objects.bulk_update(updates.values(), ['home_score', 'away_score', 'result', 'status', 'updated_at'],
+                                  batch_size=BATCH_SIZE)
+        unsettle(updates)
+        invalidate_snapshots(updates)
+        invalidate_matches_on_commit(kickoffs)
+        # The league archive pages show the scores
+        League.objects.filter(pk__in=Match.objects.filter(pk__in=list(updates)).values('league_id')) \
+            .update(updated_at=now)
+        index.save_aliases()
+        if updates:
+            bump_data_version_on_commit()
+    return len(updates), unmatched
+
+
+def unsettle(match_ids):
+    """Takes already-settled matches back out of the totals, so settle() can score them again."""
+    settled = list(Match.objects.filter(pk__in=list(match_ids), settled_at__isnull=False)
+                   .values_list('id', flat=True))
+    if settled:
+        _apply_counts(settled, sign=-1)
+        Tip.objects.filter(match_id__in=settled).update(is_correct=None)
+        Match.objects.filter(pk__in=settled).update(settled_at=None)
+
+
+def settle(now=None, batch_size=BATCH_SIZE):
+    """Scores the tips of every match with a result that has not been settled yet. Returns a SettleResult."""
+    now = now or timezone.now()
+    started = time.monotonic()
+    total = SettleResult()
+    touched_sources = set()
+
+    while True:
+        with transaction.atomic():
+            ids = list(Match.objects.filter(settled_at__isnull=True).exclude(result='')
+                       .order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+
+            tips = Tip.objects.filter(match_id__in=ids)
+            tips.update(is_correct=False)
+            tips.filter(prediction=F('match__result')).update(is_correct=True)
+
+            counts = _apply_counts(ids, sign=1)
+            settled = Match.objects.filter(pk__in=ids)
+            settled.update(settled_at=now, status='finished', updated_at=now)
+            invalidate_snapshots(ids)
+            invalidate_matches_on_commit(settled.values_list('start_time', flat=True))
+
+            total.matches += len(ids)
+            for (source_id, _), (scored, correct) in counts.items():
+                touched_sources.add(source_id)
+                total.tips += scored
+                total.correct += correct
+
+    if touched_sources:
+        # Measured accuracy replaces the seeded default once there is enough history
+        measured = Source.objects.filter(pk__in=touched_sources, tips_scored__gte=MIN_SCORED)
+        measured_ids = list(measured.values_list('id', flat=True))
+        measured.update(accuracy_score=Cast(F('tips_correct'), FloatField()) * 100 / F('tips_scored'))
+        invalidate_snapshots(source_ids=measured_ids)
+        bump_data_version_on_commit()
+
+    total.elapsed = time.monotonic() - started
+    logger.info("Settlement: %s", total)
+    return total
+
+
+def _apply_counts(match_ids, sign):
+    """
+    Adds (sign=1) or removes (sign=-1) the scored tips of `match_ids` to the per-league and
+    per-source totals. Returns {(source_id, league_id): (scored, correct)}.
+    """
+    counts = {
+        (row['source_id'], row['match__league_id']): (row['scored'], row['correct'])
+        for row in Tip.objects.filter(match_id__in=match_ids, is_correct__isnull=False)
+        .values('source_id', 'match__league_id')
+        .annotate(scored=Count('id'), correct=Count('id', filter=Q(is_correct=True)))
+        .order_by()
+    }
+    if not counts:
+        return counts
+
+    # Per league: read the few affected rows, add the batch, write them back in one upsert
+    existing = {
+        (row.source_id, row.league_id): row
+        for row in SourceAccuracy.objects.filter(source_id__in={s for s, _ in counts},
+                                                 league_id__in={l for _, l in counts})
+    }
+    rows = []
+    for (source_id, league_id), (scored, correct) in counts.items():
+        row = existing.get((source_id, league_id)) or SourceAccuracy(source_id=source_id, league_id=league_id)
+        row.tips_scored = max(row.tips_scored + sign * scored, 0)
+        row.tips_correct = max(row.tips_correct + sign * correct, 0)
+        row.accuracy = row.tips_correct * 100 / row.tips_scored if row.tips_scored else 0.0
+        rows.append(row)
+    SourceAccuracy.objects.bulk_create(rows, update_conflicts=True, unique_fields=['source', 'league'],
+                                       update_fields=['tips_scored', 'tips_correct', 'accuracy', 'updated_at'])
+
+    # Overall: one UPDATE per source (a handful), incrementing in SQL
+    per_source = {}
+    for (source_id, _), (scored, correct) in counts.items():
+        done = per_source.get(source_id, (0, 0))
+        per_source[source_id] = (done[0] + scored, done[1] + correct)
+    for source_id, (scored, correct) in per_source.items():
+        Source.objects.filter(pk=source_id).update(tips_scored=F('tips_scored') + sign * scored,
+                                                   tips_correct=F('tips_correct') + sign * correct)
+    return counts
@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .consensus import refresh_consensus
+from .models import League, Match, Source, Tip
+from .snapshots import invalidate_snapshots
+from .summaries import refresh_league_summaries
+
+
+@receiver(post_init, sender=Tip)
+def remember_tip_match(sender, instance, **kwargs):
+    instance._loaded_match_id = instance.match_id
+
+
+@receiver(post_delete, sender=Tip)
+def refresh_consensus_on_delete(sender, instance, origin=None, **kwargs):
+    # Runs inside the deletion transaction. Skip it when the match itself is going away.
+    if isinstance(origin, Match) or getattr(origin, 'model', None) is Match:
+        return
+    refresh_consensus([instance.match_id])
+
+
+# Admin edits of what a match snapshot shows; tip changes go through refresh_consensus
+@receiver(post_save, sender=Match)
+def drop_match_snapshot(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_snapshots(match_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def refresh_league_summary(sender, instance, origin=None, **kwargs):
+    # Nothing to summarize when the league itself is being deleted
+    if isinstance(origin, League) or getattr(origin, 'model', None) is League:
+        return
+    refresh_league_summaries([instance.league_id])
+
+
+@receiver(post_save, sender=League)
+def drop_league_snapshots(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_snapshots(league_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Source)
+def drop_source_snapshots(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_snapshots(source_ids=[instance.pk])
@@ -0,0 +1,113 @@
+"""
+Precomputed match-page snapshots.
+
+The match page needs the match and its league, every tip with its source,
+the trusted/other split, the consensus, the chart data and the
+accuracy-weighted consensus (predictions.weighting). build_snapshots() assembles all of that for a
+batch of matches in two queries and stores it as one compressed JSON blob per
+match. The page then costs a single read: load_snapshot() joins on the slug
+and decompresses.
+
+Snapshots are dropped, not rebuilt, when something they show changes: the
+match or its league (signals), its tips (refresh_consensus, which every tip
+write goes through), the accuracy of one of its sources (settlement and
+source edits), or its weighted consensus. The next read rebuilds the snapshot.
+"""
+import json
+import zlib
+
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Match, MatchSnapshot, Tip
+
+# Sources at or above this accuracy are listed as trusted
+TRUSTED_ACCURACY = 55.0
+BATCH_SIZE = 500
+
+MATCH_FIELDS = ('id', 'slug', 'home_team', 'away_team', 'start_time', 'status', 'total_votes',
+                'home_pct', 'draw_pct', 'away_pct')
+
+
+def _snapshot(match, tips):
+    consensus = {'1': match['home_pct'], 'X': match['draw_pct'], '2': match['away_pct']} \
+        if match['total_votes'] else None
+
+    weighted = [match.pop(f'weighted_{side}') for side in ('home', 'draw', 'away')]
+    for tip in tips:
+        tip['trusted'] = tip['accuracy'] >= TRUSTED_ACCURACY
+
+    match['start_time'] = match['start_time'].isoformat()
+    return {
+        'match': match,
+        'consensus': consensus,
+        # From the last predictions.weighting pass; None until the match has been through one
+        'weighted_consensus': dict(zip('1X2', weighted)) if consensus and weighted[0] is not None else None,
+        'chart_data': [consensus['1'], consensus['X'], consensus['2']] if consensus else [0, 0, 0],
+        'trusted_tips': [tip for tip in tips if tip['trusted']],
+        'other_tips': [tip for tip in tips if not tip['trusted']],
+    }
+
+
+def build_snapshots(match_ids):
+    """Builds and stores the snapshots of `match_ids`, two reads and one upsert per batch. Returns {id: snapshot}."""
+    match_ids = sorted(set(match_ids))
+    built = {}
+    now = timezone.now()
+
+    for i in range(0, len(match_ids), BATCH_SIZE):
+        batch = match_ids[i:i + BATCH_SIZE]
+        matches = Match.objects.filter(pk__in=batch).values(
+            *MATCH_FIELDS, league_name=F('league__name'), league_country=F('league__country'),
+            league_slug=F('league__slug'), weighted_home=F('weighted__home_pct'),
+            weighted_draw=F('weighted__draw_pct'), weighted_away=F('weighted__away_pct'))
+
+        tips = {}
+        for tip in Tip.objects.filter(match_id__in=batch).order_by('-source__accuracy_score', 'source__name') \
+                .values('match_id', 'prediction', 'analysis_text',
+                        source_name=F('source__name'), accuracy=F('source__accuracy_score')):
+            tips.setdefault(tip.pop('match_id'), []).append(tip)
+
+        rows = []
+        for match in matches:
+            snapshot = _snapshot(match, tips.get(match['id'], []))
+            built[match['id']] = snapshot
+            rows.append(MatchSnapshot(match_id=match['id'], built_at=now,
+                                      data=zlib.compress(json.dumps(snapshot, separators=(',', ':')).encode())))
+        MatchSnapshot.objects.bulk_create(rows, update_conflicts=True, unique_fields=['match'],
+                                          update_fields=['data', 'built_at'])
+    return built
+
+
+def load_snapshot(slug):
+    """The snapshot of the match with `slug`, building it if needed, or None if there is no such match."""
+    data = MatchSnapshot.objects.filter(match__slug=slug).values_list('data', flat=True).first()
+    if data is not None:
+        snapshot = json.loads(zlib.decompress(data))
+    else:
+        match_id = Match.objects.filter(slug=slug).values_list('id', flat=True).first()
+        if match_id is None:
+            return None
+        snapshot = build_snapshots([match_id])[match_id]
+
+    # Templates format the kickoff with |date
+    snapshot['match']['start_time'] = parse_datetime(snapshot['match']['start_time'])
+    return snapshot
+
+
+def invalidate_snapshots(match_ids=None, league_ids=None, source_ids=None):
+    """
+    Drops the snapshots of the given matches, of every match in the given leagues, and of the
+    unsettled matches with a tip from the given sources. One DELETE per argument given.
+    Settled matches keep showing the accuracy their sources had when they were played.
+    """
+    if match_ids:
+        MatchSnapshot.objects.filter(match_id__in=list(match_ids)).delete()
+    if league_ids:
+        MatchSnapshot.objects.filter(match__league_id__in=list(league_ids)).delete()
+    if source_ids:
+        MatchSnapshot.objects.filter(
+            match__settled_at__isnull=True,
+            match_id__in=Tip.objects.filter(source_id__in=list(source_ids)).values('match_id'),
+        ).delete()
@@ -0,0 +1,10 @@
+"""
+Prediction-site adapters.
+
+Each adapter module registers itself on import; add new sites by creating a
+module here and importing it below.
+"""
+from .base import REGISTRY, ScrapedTip, SourceAdapter, get_adapters, register
+from . import forebet, betwizad, footballpredictions  # noqa: F401  (registers the adapters, in run order)
+
+__all__ = ['REGISTRY', 'ScrapedTip', 'SourceAdapter', 'get_adapters', 'register']
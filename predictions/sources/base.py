@@ -0,0 +1,140 @@
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import importlib
+import re
+import time
+
+from django.utils import timezone
+
+# Adapters register themselves here by key, in import order
+REGISTRY = {}
+
+# Compiled once; extract_datetime runs for every scraped row
+FULL_DATE_RE = re.compile(r'(\d{1,2})/(\d{1,2})\s+(\d{1,2}:\d{2})')
+TIME_RE = re.compile(r'(\d{1,2}:\d{2})')
+
+
+@dataclass
+class ScrapedTip:
+    """One parsed row from a prediction site, before it touches the database."""
+    home_team: str
+    away_team: str
+    start_time: datetime
+    prediction: str
+    analysis_text: str = ""
+
+
+def register(adapter_class):
+    """Class decorator that adds an adapter to the registry under its key."""
+    REGISTRY[adapter_class.key] = adapter_class
+    return adapter_class
+
+
+def get_adapters(include=None, exclude=None, defaults_only=True):
+    """
+    Returns registered adapter classes filtered by key.
+    With no `include`, only adapters flagged as default are returned.
+    """
+    exclude = set(exclude or ())
+    unknown = (set(include or ()) | exclude) - set(REGISTRY)
+    if unknown:
+        raise KeyError(f"Unknown source(s): {', '.join(sorted(unknown))}. Known: {', '.join(REGISTRY)}")
+
+    if include:
+        keys = [key for key in REGISTRY if key in include]
+    else:
+        keys = [key for key, adapter in REGISTRY.items() if adapter.default or not defaults_only]
+    return [REGISTRY[key] for key in keys if key not in exclude]
+
+
+def init_parse_worker():
+    """
+    Process-pool initializer. Under spawn or forkserver (macOS, and the default from Python 3.14)
+    a worker starts with unconfigured settings and an empty REGISTRY, so set both up.
+    Lives here rather than in the runner, which imports models and cannot be unpickled before setup.
+    """
+    import django
+    django.setup()
+    importlib.import_module(__package__)
+
+
+def parse_page(key, now, html):
+    """
+    Process-pool entry point: parses one page with the adapter registered under `key`.
+    Returns (rows, seconds spent parsing, {'seen': candidate rows, 'rejected': {reason: count}}).
+    """
+    started = time.monotonic()
+    adapter = REGISTRY[key](now)
+    rows = list(adapter.parse(html))
+    return rows, time.monotonic() - started, {'seen': adapter.seen, 'rejected': dict(adapter.rejected)}
+
+
+def extract_datetime(text_content, now):
+    """
+    Scans text for time patterns like '14:30' or '18/11 14:00'.
+    Returns a timezone-aware datetime object.
+    """
+    # 1. Try to find full date+time: "18/11 14:30"
+    full_match = FULL_DATE_RE.search(text_content)
+
+    if full_match:
+        day, month, time_str = full_match.groups()
+        # Logic to handle Year (if scraping Dec matches in Jan)
+        year = now.year
+        if now.month == 12 and int(month) == 1:
+            year += 1
+
+        hour, minute = time_str.split(':')
+        dt_obj = datetime(year, int(month), int(day), int(hour), int(minute))
+        return timezone.make_aware(dt_obj)
+
+    # 2. If no date, find just time: "14:30" and assume TODAY (or Tomorrow if time passed)
+    time_match = TIME_RE.search(text_content)
+    if time_match:
+        hour, minute = time_match.group(1).split(':')
+        # Combine Today's Date + Found Time
+        dt_obj = datetime(now.year, now.month, now.day, int(hour), int(minute))
+        dt_aware = timezone.make_aware(dt_obj)
+
+        # If that time has already passed significantly (e.g. > 2 hours ago),
+        # assume it's a game for TOMORROW (since we filter out past games)
+        if dt_aware < (now - timedelta(hours=2)):
+            dt_aware += timedelta(days=1)
+
+        return dt_aware
+
+    # 3. Last Resort Fallback (Only if NO time found)
+    return now + timedelta(hours=24)
+
+
+class SourceAdapter:
+    """
+    One prediction site. Subclasses declare where to fetch and how to parse;
+    they must not touch the ORM, because parse() runs in a worker process.
+    """
+    key = None  # Used by --source / --exclude
+    name = None  # Source.name in the database
+    urls = []
+    accuracy = 0.0  # Source.accuracy_score when the source is first created
+    league = None  # (name, country) for matches this source creates; None means "International"
+    default = True  # Included when no --source filter is given
+
+    def __init__(self, now):
+        self.now = now
+        # Telemetry: candidate rows looked at, and why the unusable ones were dropped
+        self.seen = 0
+        self.rejected = Counter()
+
+    def reject(self, reason):
+        self.rejected[reason] += 1
+
+    def extract_datetime(self, text_content):
+        return extract_datetime(text_content, self.now)
+
+    def parse(self, html):
+        """
+        Yields a ScrapedTip per usable row. Counts every candidate row in self.seen;
+        bad rows are skipped through self.reject(reason), never raised.
+        """
+        raise NotImplementedError
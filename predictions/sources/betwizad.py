@@ -0,0 +1,44 @@
+from .base import ScrapedTip, SourceAdapter, register
+from .parsing import make_soup, only
+
+
+@register
+class BetWizadAdapter(SourceAdapter):
+    key = 'betwizad'
+    name = "BetWizad"
+    urls = ["https://betwizad.com/premier-league/england"]
+    accuracy = 65.0
+
+    def parse(self, html):
+        # Find generic rows in tables
+        for row in make_soup(html, only('tr')).find_all('tr'):
+            self.seen += 1
+            try:
+                text = row.get_text(" ", strip=True)
+                # Must look like a match row: contains time (:) and prediction (1/X/2)
+                if ":" not in text or len(text) < 20:
+                    self.reject("not a match row")
+                    continue
+
+                cols = row.find_all('td')
+                if len(cols) < 4:
+                    self.reject("too few columns")
+                    continue
+
+                # Betwizad usually: Date | Home | Score | Away | Tip
+                home = cols[1].get_text(strip=True)
+                away = cols[3].get_text(strip=True)
+                tip = cols[-1].get_text(strip=True)
+
+                outcome = 'X'
+                if '1' in tip:
+                    outcome = '1'
+                elif '2' in tip:
+                    outcome = '2'
+
+                # Looks for HH:MM in the row
+                match_date = self.extract_datetime(text)
+
+                yield ScrapedTip(home, away, match_date, outcome, f"Tip: {tip}")
+            except Exception as e:
+                self.reject(f"error: {e.__class__.__name__}")
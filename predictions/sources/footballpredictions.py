@@ -0,0 +1,50 @@
+from datetime import timedelta
+import re
+
+from .base import ScrapedTip, SourceAdapter, register
+from .parsing import make_soup, only
+
+TEAMS_RE = re.compile(r'([A-Za-z0-9 ]{3,}) vs ([A-Za-z0-9 ]{3,})')
+
+
+@register
+class FootballPredictionsAdapter(SourceAdapter):
+    key = 'footballpredictions'
+    name = "FootballPredictions.com"
+    urls = ["https://footballpredictions.com/betting-tips/"]
+    accuracy = 70.0
+
+    def parse(self, html):
+        cards = make_soup(html, only('div', 'prediction-card')).find_all('div', class_='prediction-card')
+        if not cards: cards = make_soup(html, only('article')).find_all('article')
+
+        for card in cards:
+            self.seen += 1
+            try:
+                text = card.get_text(" ", strip=True)
+
+                teams_match = TEAMS_RE.search(text)
+                if not teams_match:
+                    self.reject("no teams")
+                    continue
+
+                home, away = teams_match.group(1).strip(), teams_match.group(2).strip()
+
+                outcome = 'X'
+                if "Home Win" in text or "1" in text:
+                    outcome = '1'
+                elif "Away Win" in text or "2" in text:
+                    outcome = '2'
+
+                # Try to find time in text, otherwise stagger it
+                # FP usually doesn't list exact time, so we rely on a "safe" future time
+                match_date = self.extract_datetime(text)
+
+                # If extract_datetime returns the fallback (meaning no time found),
+                # let's push it to tomorrow noon to be safe
+                if match_date.hour == self.now.hour:
+                    match_date = self.now.replace(hour=13, minute=0) + timedelta(days=1)
+
+                yield ScrapedTip(home, away, match_date, outcome, "Expert Analysis")
+            except Exception as e:
+                self.reject(f"error: {e.__class__.__name__}")
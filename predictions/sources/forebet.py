@@ -0,0 +1,68 @@
+import re
+
+from .base import ScrapedTip, SourceAdapter, register
+from .parsing import make_soup, only
+
+SCORE_RE = re.compile(r'(\d+)\s*-\s*(\d+)')
+
+
+@register
+class ForebetAdapter(SourceAdapter):
+    key = 'forebet'
+    name = "Forebet"
+    urls = ["https://www.forebet.com/en/football-tips-and-predictions-for-today"]
+    accuracy = 80.0
+
+    def parse(self, html):
+        # Forebet often uses 'rcnt' or 'tr_0' / 'tr_1' classes
+        rows = make_soup(html, only('div', 'rcnt')).find_all('div', class_='rcnt')
+        if not rows:
+            # Fallback: Try finding rows via table structure if div structure fails
+            rows = make_soup(html, only(None, 'schema')).select('.schema tr')
+
+        for row in rows:
+            self.seen += 1
+            try:
+                text = row.get_text(" ", strip=True)
+
+                # Extract Teams: specific classes first, team links if the classes change
+                h_node = row.find('span', class_='homeTeam')
+                a_node = row.find('span', class_='awayTeam')
+                if h_node and a_node:
+                    home, away = h_node.get_text(strip=True), a_node.get_text(strip=True)
+                else:
+                    links = row.find_all('a', class_='tnm')
+                    if len(links) < 2:
+                        self.reject("no teams")
+                        continue
+                    home, away = links[0].get_text(strip=True), links[1].get_text(strip=True)
+
+                match_date = self.extract_datetime(text)
+
+                # Extract Score Tip, preferring the dedicated prediction cell
+                pred_node = row.find('span', class_='forepr')
+                score_text = pred_node.get_text(" ", strip=True) if pred_node else text
+                score_match = SCORE_RE.search(score_text) or SCORE_RE.search(text)
+                outcome = 'X'
+                analysis = "Draw predicted"
+                if score_match:
+                    h, a = int(score_match.group(1)), int(score_match.group(2))
+                    if h > a:
+                        outcome = '1'
+                    elif a > h:
+                        outcome = '2'
+                    analysis = f"Correct Score: {h} - {a}"
+
+                yield ScrapedTip(home, away, match_date, outcome, analysis)
+            except Exception as e:
+                self.reject(f"error: {e.__class__.__name__}")
+
+
+@register
+class ForebetKenyaAdapter(ForebetAdapter):
+    """Kenya Premier League page, historically scraped by scrape_tips."""
+    key = 'forebet-kenya'
+    urls = ["https://www.forebet.com/en/football-tips-and-predictions-for-kenya/premier-league"]
+    accuracy = 75.0
+    league = ("Kenya Premier League", "Kenya")
+    default = False
@@ -0,0 +1,47 @@
+"""
+Shared HTML parsing helpers for the adapters.
+
+make_soup() uses lxml when it is installed (several times faster than
+html.parser) and can restrict the tree to the containers a source actually
+reads through a SoupStrainer, so page chrome, scripts and ads are never built.
+"""
+from contextlib import contextmanager
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+# Turned off by legacy_parsing() so benchmarks can measure the old full-tree path
+RESTRICT = True
+
+
+def has_class(name):
+    """Strainer attribute test for one class among many (class="rcnt tr_0" matches 'rcnt')."""
+    return lambda value: bool(value) and name in value.split()
+
+
+def only(tag, css_class=None):
+    """SoupStrainer for <tag> elements (any tag when None), optionally carrying `css_class`."""
+    if css_class:
+        return SoupStrainer(tag, attrs={'class': has_class(css_class)})
+    return SoupStrainer(tag)
+
+
+def make_soup(html, strainer=None):
+    return BeautifulSoup(html, PARSER, parse_only=strainer if RESTRICT else None)
+
+
+@contextmanager
+def legacy_parsing():
+    """Temporarily parse the way the scrapers used to: html.parser, whole document."""
+    global PARSER, RESTRICT
+    saved = PARSER, RESTRICT
+    PARSER, RESTRICT = 'html.parser', False
+    try:
+        yield
+    finally:
+        PARSER, RESTRICT = saved
@@ -0,0 +1,131 @@
+"""
+Runs a set of adapters end to end.
+
+Pages are fetched on the Fetcher's thread pool and parsed in a process pool
+(BeautifulSoup is CPU-bound and holds the GIL). Parsed rows are ingested
+one page at a time on the calling thread, through the same bulk path for
+every source. Pages the Fetcher reports unchanged since the last run skip
+both stages.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from ..ingestion import ingest_tips
+from ..matching import MatchIndex
+from ..models import League, Source
+from .base import init_parse_worker, parse_page
+
+
+@dataclass
+class SourceRun:
+    adapter: type
+    url: str
+    fetched: object = None  # FetchResult
+    rows: int = 0
+    parse_time: float = 0.0
+    parse_stats: dict = None  # {'seen': n, 'rejected': {reason: count}} from parse_page
+    result: object = None  # IngestResult
+    error: str = ""
+    started: float = field(default_factory=time.monotonic)
+    total_time: float = 0.0
+
+    def __str__(self):
+        if self.error:
+            return f"{self.adapter.name} Failed: {self.error}"
+        if self.fetched.unchanged:
+            return f"{self.adapter.name}: unchanged since last run (fetch {self.fetched.elapsed:.2f}s)"
+        return (f"{self.adapter.name}: fetch {self.fetched.elapsed:.2f}s, parse {self.parse_time:.2f}s "
+                f"({self.rows} rows), ingest {self.result.elapsed:.2f}s\n  {self.result}")
+
+    def telemetry(self):
+        """Fields for a core.models.ScrapeSourceRun row."""
+        fetched, result, stats = self.fetched, self.result, self.parse_stats or {}
+        rejected = dict(stats.get('rejected', {}))
+        if result:
+            for reason, count in result.skip_reasons.items():
+                if reason != "unchanged":
+                    rejected[reason] = rejected.get(reason, 0) + count
+        return {
+            'source': self.adapter.key,
+            'url': self.url,
+            'error': self.error,
+            'unchanged': bool(fetched and fetched.unchanged),
+            'http_status': (fetched.status or None) if fetched else None,
+            'attempts': fetched.attempts if fetched else 0,
+            'fetch_ms': fetched.elapsed * 1000 if fetched else 0.0,
+            'bytes': len(fetched.content) if fetched else 0,
+            'parse_ms': self.parse_time * 1000,
+            'rows_seen': stats.get('seen', 0),
+            'rows_parsed': self.rows,
+            'rejected': rejected,
+            'matches_created': result.matches_created if result else 0,
+            'matches_matched': result.matched if result else 0,
+            'items_created': result.inserted if result else 0,
+            'items_updated': result.updated if result else 0,
+            'db_ms': result.elapsed * 1000 if result else 0.0,
+            'total_ms': self.total_time * 1000,
+        }
+
+
+def _ingest(run, rows, now, index, fetcher):
+    adapter = run.adapter
+    source, _ = Source.objects.get_or_create(name=adapter.name, defaults={'url': run.url, 'accuracy_score': adapter.accuracy})
+    league = None
+    if adapter.league:
+        league, _ = League.objects.get_or_create(name=adapter.league[0], country=adapter.league[1])
+    run.rows = len(rows)
+    run.result = ingest_tips(source, rows, now, index, league)
+    # Only cached once written, so a page that failed to ingest is processed again next run
+    fetcher.remember(run.fetched)
+    run.total_time = time.monotonic() - run.started
+    return run
+
+
+def run_sources(adapters, now, fetcher, parse_workers=2):
+    """
+    Yields a SourceRun per page as soon as it has been fetched, parsed and ingested.
+    With parse_workers=0 pages are parsed inline instead of in a process pool.
+    """
+    # Built once and shared by every source, so team lookups are dict hits
+    index = MatchIndex.build(now)
+    pages = {url: adapter for adapter in adapters for url in adapter.urls}
+
+    parse_pool = ProcessPoolExecutor(max_workers=parse_workers, initializer=init_parse_worker) \
+        if parse_workers else None
+    try:
+        with ThreadPoolExecutor(max_workers=fetcher.workers) as fetch_pool:
+            pending = {fetch_pool.submit(fetcher.fetch, url): SourceRun(pages[url], url) for url in pages}
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    run = pending.pop(future)
+                    try:
+                        if run.fetched is None:
+                            # Fetch stage finished: hand the page to the parse stage
+                            run.fetched = future.result()
+                            if not run.fetched.ok:
+                                run.error = (f"{run.fetched.error or run.fetched.status} after "
+                                             f"{run.fetched.attempts} attempt(s), {run.fetched.elapsed:.2f}s")
+                                run.total_time = time.monotonic() - run.started
+                                yield run
+                            elif run.fetched.unchanged:
+                                run.total_time = time.monotonic() - run.started
+                                yield run
+                            elif parse_pool:
+                                pending[parse_pool.submit(parse_page, run.adapter.key, now, run.fetched.content)] = run
+                            else:
+                                rows, run.parse_time, run.parse_stats = parse_page(run.adapter.key, now, run.fetched.content)
+                                yield _ingest(run, rows, now, index, fetcher)
+                        else:
+                            # Parse stage finished: write to the database
+                            rows, run.parse_time, run.parse_stats = future.result()
+                            yield _ingest(run, rows, now, index, fetcher)
+                    except Exception as e:
+                        run.error = str(e) or e.__class__.__name__
+                        run.total_time = time.monotonic() - run.started
+                        yield run
+    finally:
+        if parse_pool:
+            parse_pool.shutdown(cancel_futures=True)
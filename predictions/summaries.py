@@ -0,0 +1,61 @@
+"""
+League summaries for the sidebars and the homepage.
+
+Each League carries its number of upcoming matches and next kickoff, so the
+pages read a few small rows instead of grouping the whole Match table on every
+request. refresh_league_summaries() recomputes them for a set of leagues with
+one GROUP BY on match_league_status_start_idx. Ingestion calls it for the
+leagues it adds matches to, the Match signals for admin edits, and scrape_all
+for every league so matches that kicked off since drop out of the counts.
+league_summaries() is the cached list the pages share.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from core.cache import bump_data_version_on_commit, data_version
+
+from .models import League, Match
+
+SUMMARY_FIELDS = ('id', 'name', 'country', 'slug', 'upcoming_count', 'next_kickoff', 'updated_at')
+
+
+def refresh_league_summaries(league_ids=None, now=None):
+    """
+    Recomputes upcoming_count and next_kickoff of the given leagues, or of every league when
+    None. Leagues whose summary changed are written in one bulk UPDATE and get a new updated_at.
+    Returns the number of leagues changed.
+    """
+    now = now or timezone.now()
+    leagues = League.objects.all()
+    matches = Match.objects.filter(status='scheduled', start_time__gt=now)
+    if league_ids is not None:
+        league_ids = list(set(league_ids))
+        leagues = leagues.filter(pk__in=league_ids)
+        matches = matches.filter(league_id__in=league_ids)
+
+    current = {
+        row['league_id']: (row['n'], row['next'])
+        for row in matches.values('league_id').annotate(n=Count('id'), next=Min('start_time')).order_by()
+    }
+    changed = []
+    for league in leagues.only('id', 'upcoming_count', 'next_kickoff'):
+        summary = current.get(league.pk, (0, None))
+        if (league.upcoming_count, league.next_kickoff) != summary:
+            league.upcoming_count, league.next_kickoff = summary
+            league.updated_at = now
+            changed.append(league)
+
+    if changed:
+        League.objects.bulk_update(changed, ['upcoming_count', 'next_kickoff', 'updated_at'], batch_size=500)
+        bump_data_version_on_commit()
+    return len(changed)
+
+
+def league_summaries():
+    """Leagues with upcoming matches, busiest first, as dicts of SUMMARY_FIELDS. Cached per data version."""
+    def load():
+        return list(League.objects.filter(upcoming_count__gt=0)
+                    .order_by('-upcoming_count', 'name').values(*SUMMARY_FIELDS))
+    return cache.get_or_set(f"league-summaries:{data_version()}", load, settings.PAGE_CACHE_TIMEOUT)
@@ -1,3 +1,800 @@
-from django.test import TestCase
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import ScrapeSourceRun
+
+from .fetching import Fetcher
+from .httpcache import HttpCache
+from .ingestion import ingest_tips
+from .matching import ALIAS_THRESHOLD, FUZZY_THRESHOLD, MatchIndex, normalize_team_name, similarity
+from .models import League, Match, MatchSnapshot, Source, SourceAccuracy, TeamAlias, Tip
+from .replay import replay
+from .settlement import ResultRow, record_results, settle
+from .snapshots import build_snapshots, load_snapshot
+from .summaries import league_summaries, refresh_league_summaries
+from .sources import ScrapedTip, get_adapters
+from .sources.base import init_parse_worker, parse_page
+from .sources.runner import run_sources
+from .views import LEAGUE_PAGE_SIZE, date_window, upcoming_day_counts, upcoming_matches
+from .weighting import refresh_weighted_consensus
+
+
+class ConsensusColumnsTests(TestCase):
+    def setUp(self):
+        self.league = League.objects.create(name="Premier League", country="England")
+        self.match = Match.objects.create(
+            league=self.league, home_team="Arsenal", away_team="Chelsea",
+            start_time=timezone.now() + timedelta(days=1),
+        )
+        self.sources = [Source.objects.create(name=f"Source {i}", url="https://example.com") for i in range(4)]
+
+    def test_no_tips_means_no_consensus(self):
+        self.assertIsNone(self.match.get_consensus_data())
+
+    def test_tip_writes_update_stored_consensus(self):
+        for source, prediction in zip(self.sources, ['1', '1', 'X', '2']):
+            Tip.objects.create(match=self.match, source=source, prediction=prediction)
+
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.total_votes, 4)
+        self.assertEqual(self.match.get_consensus_data(), {'1': 50.0, 'X': 25.0, '2': 25.0})
+
+        tip = Tip.objects.get(source=self.sources[2])
+        tip.prediction = '1'
+        tip.save()
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.home_votes, 3)
+
+        tip.delete()
+        self.match.refresh_from_db()
+        self.assertEqual((self.match.home_votes, self.match.total_votes), (2, 3))
+
+    def test_get_consensus_data_runs_no_queries(self):
+        Tip.objects.create(match=self.match, source=self.sources[0], prediction='2')
+        match = Match.objects.get(pk=self.match.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(match.get_consensus_data()['2'], 100.0)
+
+    def test_rebuild_command_repairs_counters(self):
+        Tip.objects.create(match=self.match, source=self.sources[0], prediction='X')
+        Match.objects.filter(pk=self.match.pk).update(draw_votes=0, total_votes=0, draw_pct=0)
+
+        call_command('rebuild_consensus', stdout=StringIO())
+
+        self.match.refresh_from_db()
+        self.assertEqual((self.match.draw_votes, self.match.draw_pct), (1, 100.0))
+
+    def test_stored_consensus_matches_a_count_of_the_tips(self):
+        for source, prediction in zip(self.sources, ['1', '2', '2', '2']):
+            Tip.objects.create(match=self.match, source=source, prediction=prediction)
+        Match.objects.create(league=self.league, home_team="Spurs", away_team="Everton",
+                             start_time=timezone.now() + timedelta(days=2))
+        call_command('rebuild_consensus', stdout=StringIO())
+
+        counted = {}
+        for match in Match.objects.all():
+            votes = [match.tips.filter(prediction=outcome).count() for outcome in '1X2']
+            counted[match.pk] = dict(zip('1X2', (v * 100 / sum(votes) for v in votes))) if sum(votes) else None
+        with self.assertNumQueries(1):
+            stored = {m.pk: (m.get_consensus_data(), m.league.name) for m in Match.objects.with_consensus()}
+        self.assertEqual({pk: data for pk, (data, _) in stored.items()}, counted)
+        self.assertEqual(stored[self.match.pk], ({'1': 25.0, 'X': 0.0, '2': 75.0}, "Premier League"))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}, PERF_SAMPLE_RATE=0)
+class ListingQueryCountTests(TestCase):
+    """Listing pages must not issue per-match queries, however many matches and tips they show."""
+
+    def setUp(self):
+        self.league = League.objects.create(name="Premier League", country="England")
+        self.sources = [Source.objects.create(name=f"Source {i}", url="https://example.com") for i in range(3)]
+
+    def add_matches(self, count):
+        start = timezone.now() + timedelta(days=1)
+        for i in range(Match.objects.count(), Match.objects.count() + count):
+            match = Match.objects.create(league=self.league, home_team=f"Home {i}", away_team=f"Away {i}",
+                                         start_time=start + timedelta(hours=i))
+            for source, prediction in zip(self.sources, '1X2'):
+                Tip.objects.create(match=match, source=source, prediction=prediction)
+        refresh_weighted_consensus()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+        return len(queries)
+
+    def test_query_count_is_constant(self):
+        urls = [reverse('home'), reverse('all_predictions'), reverse('league_detail', args=[self.league.slug])]
+        self.add_matches(2)
+        small = [self.count_queries(url) for url in urls]
+        self.add_matches(10)
+        large = [self.count_queries(url) for url in urls]
+        self.assertEqual(small, large)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}, PERF_SAMPLE_RATE=0)
+class LeagueSummaryTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.league = League.objects.create(name="Premier League", country="England")
+        self.source = Source.objects.create(name="Forebet", url="https://example.com")
+
+    def test_ingestion_keeps_the_summary_current(self):
+        first = self.now + timedelta(hours=2)
+        ingest_tips(self.source, [ScrapedTip("Arsenal", "Chelsea", first, '1'),
+                                  ScrapedTip("Leeds", "Everton", first + timedelta(days=1), 'X')],
+                    self.now, league=self.league)
+        self.league.refresh_from_db()
+        self.assertEqual((self.league.upcoming_count, self.league.next_kickoff), (2, first))
+
+        # Once the first match kicks off, the next full refresh drops it; nothing else is written
+        self.assertEqual(refresh_league_summaries(now=first + timedelta(minutes=1)), 1)
+        self.league.refresh_from_db()
+        self.assertEqual((self.league.upcoming_count, self.league.next_kickoff), (1, first + timedelta(days=1)))
+        self.assertEqual(refresh_league_summaries(now=first + timedelta(minutes=1)), 0)
+
+    def test_admin_edits_and_deletes_refresh_the_league(self):
+        match = Match.objects.create(league=self.league, home_team="Arsenal", away_team="Chelsea",
+                                     start_time=self.now + timedelta(days=1))
+        self.assertEqual([row['upcoming_count'] for row in league_summaries()], [1])
+        match.status = 'finished'
+        match.save()
+        self.league.refresh_from_db()
+        self.assertEqual((self.league.upcoming_count, self.league.next_kickoff), (0, None))
+        self.assertEqual(league_summaries(), [])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+                       PERF_SAMPLE_RATE=0)
+    def test_sidebars_do_not_group_matches_by_league(self):
+        for i in range(3):
+            Match.objects.create(league=self.league, home_team=f"Home {i}", away_team="Away",
+                                 start_time=self.now + timedelta(days=1, hours=i))
+        for url in (reverse('home'), reverse('all_predictions'), reverse('league_detail', args=[self.league.slug])):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertContains(self.client.get(url, secure=True), "Premier League")
+            grouped = [q['sql'] for q in queries if 'GROUP BY' in q['sql'] and 'league_id' in q['sql']]
+            self.assertEqual(grouped, [], url)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}, PERF_SAMPLE_RATE=0)
+class LeaguePageTests(TestCase):
+    def setUp(self):
+        self.league = League.objects.create(name="International", country="World")
+        self.now = timezone.now()
+
+    def add_matches(self, count, start, step=timedelta(hours=1)):
+        return [Match.objects.create(league=self.league, home_team=f"Home {start:%d%H} {i}", away_team="Away",
+                                     start_time=start + step * i) for i in range(count)]
+
+    def get(self, name, **params):
+        return self.client.get(reverse(name, args=[self.league.slug]), params, secure=True)
+
+    def test_upcoming_pages_are_bounded(self):
+        upcoming = self.add_matches(25, self.now + timedelta(hours=1))
+        # Kicked off but not yet marked finished: belongs to the archive
+        self.add_matches(1, self.now - timedelta(minutes=10))
+
+        with CaptureQueriesContext(connection) as queries:
+            first = self.get('league_detail')
+        self.assertEqual(list(first.context['matches']), upcoming[:LEAGUE_PAGE_SIZE])
+        self.assertTrue([q for q in queries if f"LIMIT {LEAGUE_PAGE_SIZE + 1}" in q['sql']])
+
+        second = self.get('league_detail', cursor=first.context['matches'].next_cursor)
+        self.assertEqual(list(second.context['matches']), upcoming[LEAGUE_PAGE_SIZE:])
+        self.assertFalse(second.context['matches'].has_next())
+
+    def test_archive_lists_past_matches_newest_first(self):
+        past = self.add_matches(3, self.now - timedelta(days=3), step=timedelta(days=1))
+        self.add_matches(1, self.now + timedelta(hours=1))
+        Match.objects.filter(pk=past[0].pk).update(home_score=2, away_score=1, status='finished')
+
+        response = self.get('league_archive')
+        self.assertEqual(list(response.context['matches']), past[::-1])
+        self.assertContains(response, "FT 2 - 1")
+        self.assertContains(response, "Result pending")
+
+
+class DateWindowTests(SimpleTestCase):
+    wednesday = date(2026, 10, 14)
+
+    def test_named_days(self):
+        self.assertEqual(date_window('today', today=self.wednesday), (self.wednesday, self.wednesday))
+        self.assertEqual(date_window('tomorrow', today=self.wednesday), (date(2026, 10, 15),) * 2)
+        self.assertEqual(date_window('weekend', today=self.wednesday), (date(2026, 10, 17), date(2026, 10, 18)))
+        self.assertEqual(date_window('weekend', today=date(2026, 10, 17)), (date(2026, 10, 17), date(2026, 10, 18)))
+        self.assertEqual(date_window('weekend', today=date(2026, 10, 18)), (date(2026, 10, 18),) * 2)
+
+    def test_days_and_ranges(self):
+        self.assertEqual(date_window('2026-10-20'), (date(2026, 10, 20),) * 2)
+        self.assertEqual(date_window(None, '2026-10-20', '2026-10-22'), (date(2026, 10, 20), date(2026, 10, 22)))
+        self.assertEqual(date_window(None, None, '2026-10-22'), (None, date(2026, 10, 22)))
+        # A day wins over a range; nonsense is ignored
+        self.assertEqual(date_window('2026-10-20', '2026-10-01'), (date(2026, 10, 20),) * 2)
+        self.assertIsNone(date_window('2026-02-30', 'soon', ''))
+
+
+class LocalDateTests(TestCase):
+    # 21:30 UTC is 00:30 the next day in Nairobi
+    now = datetime(2026, 10, 14, 12, 0, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        self.league = League.objects.create(name="Premier League", country="England")
+
+    def add_match(self, home, hour, day=14):
+        return Match.objects.create(league=self.league, home_team=home, away_team="Away",
+                                    start_time=datetime(2026, 10, day, hour, 30, tzinfo=dt_timezone.utc))
+
+    def test_local_day_boundaries(self):
+        evening = self.add_match("Evening", 20)
+        late = self.add_match("Late", 21)
+        self.assertEqual((evening.local_date, late.local_date), (date(2026, 10, 14), date(2026, 10, 15)))
+
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            self.assertEqual(list(upcoming_matches(date_filter='today')), [evening])
+            self.assertEqual(list(upcoming_matches(date_filter='tomorrow')), [late])
+            self.assertEqual(list(upcoming_matches(date_from='2026-10-14', date_to='2026-10-15')), [evening, late])
+
+    def test_ingested_matches_get_their_local_day(self):
+        source = Source.objects.create(name="Forebet", url="https://example.com")
+        kickoff = datetime(2026, 10, 14, 22, 0, tzinfo=dt_timezone.utc)
+        ingest_tips(source, [ScrapedTip("Arsenal", "Chelsea", kickoff, '1')], self.now)
+        self.assertEqual(Match.objects.get().local_date, date(2026, 10, 15))
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_day_counts(self):
+        for i, (hour, day) in enumerate([(13, 14), (20, 14), (21, 14), (9, 16)]):
+            self.add_match(f"Home {i}", hour, day)
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            days = upcoming_day_counts(3)
+        self.assertEqual(days, [(date(2026, 10, 14), 2), (date(2026, 10, 15), 1), (date(2026, 10, 16), 1)])
+
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            response = self.client.get(reverse('all_predictions'), {'from': '2026-10-15', 'to': '2026-10-16'},
+                                       secure=True)
+        self.assertContains(response, "Thu 15 Oct")
+        self.assertEqual([match.home_team for match in response.context['matches']], ["Home 2", "Home 3"])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                       PERF_SAMPLE_RATE=0)
+    def test_league_links_are_not_shared_across_date_ranges(self):
+        self.add_match("Home", 13, 15)
+        with mock.patch('django.utils.timezone.now', return_value=self.now):
+            ranged = self.client.get(reverse('all_predictions'), {'from': '2026-10-15', 'to': '2026-10-16'},
+                                     secure=True)
+            plain = self.client.get(reverse('all_predictions'), secure=True)
+        self.assertContains(ranged, "from=2026-10-15")
+        self.assertNotContains(plain, "from=2026-10-15")
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}, PERF_SAMPLE_RATE=0)
+class ApiTests(TestCase):
+    def setUp(self):
+        league = League.objects.create(name="Premier League", country="England")
+        sources = [Source.objects.create(name=f"Source {i}", url="https://example.com", accuracy_score=50 + i)
+                   for i in range(3)]
+        start = timezone.now() + timedelta(days=1)
+        self.matches = [Match.objects.create(league=league, home_team=f"Home {i}", away_team=f"Away {i}",
+                                             start_time=start + timedelta(hours=i)) for i in range(3)]
+        for source, prediction in zip(sources, '11X'):
+            Tip.objects.create(match=self.matches[0], source=source, prediction=prediction)
+
+    def test_match_list(self):
+        response = self.client.get(reverse('api_matches'), {'league': 'england-premier-league'}, secure=True)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertTrue(response.has_header('ETag'))
+        data = response.json()
+        self.assertEqual([row['home_team'] for row in data['results']], ["Home 0", "Home 1", "Home 2"])
+        first = data['results'][0]
+        self.assertEqual((first['league_slug'], first['total_votes'], first['url']),
+                         ('england-premier-league', 3, self.matches[0].get_absolute_url()))
+        self.assertIsNone(data['next'])
+
+    def test_consensus_batch_is_one_query(self):
+        ids = ",".join(str(match.pk) for match in self.matches) + ",999"
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(reverse('api_consensus'), {'ids': ids}, secure=True).json()
+        # Last-Modified lookup, then the batch itself
+        self.assertEqual(len([q for q in queries if 'predictions_match' in q['sql']]), 2)
+        self.assertEqual(set(data['results']), {str(match.pk) for match in self.matches})
+        self.assertAlmostEqual(data['results'][str(self.matches[0].pk)]['home_pct'], 200 / 3)
+
+        too_many = ",".join(str(i) for i in range(1, 60))
+        self.assertEqual(self.client.get(reverse('api_consensus'), {'ids': too_many}, secure=True).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_consensus'), {'ids': 'x'}, secure=True).status_code, 400)
+
+    def test_match_detail(self):
+        data = self.client.get(reverse('api_match_detail', args=[self.matches[0].slug]), secure=True).json()
+        self.assertEqual([tip['source_name'] for tip in data['tips']], ["Source 2", "Source 1", "Source 0"])
+        self.assertEqual(data['chart_data'], [data['home_pct'], data['draw_pct'], data['away_pct']])
+        self.assertEqual(self.client.get(reverse('api_match_detail', args=['nope']), secure=True).status_code, 404)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}, PERF_SAMPLE_RATE=0)
+class MatchSnapshotTests(TestCase):
+    def setUp(self):
+        league = League.objects.create(name="Premier League", country="England")
+        self.match = Match.objects.create(league=league, home_team="Arsenal", away_team="Chelsea",
+                                          start_time=timezone.now() + timedelta(days=1))
+        self.sharp = Source.objects.create(name="Sharp", url="https://example.com", accuracy_score=80)
+        self.blunt = Source.objects.create(name="Blunt", url="https://example.com", accuracy_score=40)
+        Tip.objects.create(match=self.match, source=self.sharp, prediction='1')
+        Tip.objects.create(match=self.match, source=self.blunt, prediction='2')
+
+    def test_snapshot_contents(self):
+        refresh_weighted_consensus()
+        snapshot = load_snapshot(self.match.slug)
+        self.assertEqual([tip['source_name'] for tip in snapshot['trusted_tips']], ["Sharp"])
+        self.assertEqual([tip['source_name'] for tip in snapshot['other_tips']], ["Blunt"])
+        self.assertEqual(snapshot['chart_data'], [50.0, 0.0, 50.0])
+        self.assertAlmostEqual(snapshot['weighted_consensus']['1'], 200 / 3)
+        self.assertEqual(snapshot['match']['start_time'], self.match.start_time)
+        self.assertIsNone(load_snapshot("no-such-match"))
+
+    def test_page_is_one_read_once_built(self):
+        url = self.match.get_absolute_url()
+        self.assertContains(self.client.get(url, secure=True), "Trusted (80%)")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, secure=True)
+        self.assertContains(response, "Acc: 40%")
+        statements = [q['sql'] for q in queries]
+        # Last-Modified lookup and the snapshot itself; tips and sources are not read
+        self.assertEqual(len(statements), 2)
+        self.assertFalse([sql for sql in statements if 'predictions_tip' in sql])
+
+    def test_tip_and_accuracy_changes_drop_the_snapshot(self):
+        build_snapshots([self.match.pk])
+        Tip.objects.filter(source=self.blunt).delete()
+        self.assertFalse(MatchSnapshot.objects.exists())
+
+        build_snapshots([self.match.pk])
+        self.sharp.accuracy_score = 50
+        self.sharp.save()
+        self.assertFalse(MatchSnapshot.objects.exists())
+        self.assertEqual(load_snapshot(self.match.slug)['other_tips'][0]['accuracy'], 50)
+
+
+class SettlementTests(TestCase):
+    def setUp(self):
+        self.league = League.objects.create(name="Premier League", country="England")
+        self.sharp = Source.objects.create(name="Sharp", url="https://example.com", accuracy_score=80)
+        self.blunt = Source.objects.create(name="Blunt", url="https://example.com", accuracy_score=80)
+        self.kickoff = timezone.now() - timedelta(days=1)
+
+    def add_match(self, home, away, hours=0):
+        match = Match.objects.create(league=self.league, home_team=home, away_team=away,
+                                     start_time=self.kickoff + timedelta(hours=hours))
+        Tip.objects.create(match=match, source=self.sharp, prediction='1')
+        Tip.objects.create(match=match, source=self.blunt, prediction='2')
+        return match
+
+    def totals(self, source):
+        source.refresh_from_db()
+        record = SourceAccuracy.objects.get(source=source, league=self.league)
+        return (source.tips_scored, source.tips_correct), (record.tips_scored, record.tips_correct)
+
+    @mock.patch('predictions.settlement.MIN_SCORED', 2)
+    def test_settles_tips_and_updates_accuracy(self):
+        arsenal = self.add_match("Arsenal", "Chelsea")
+        self.add_match("Spurs", "Everton", hours=3)
+        updated, unmatched = record_results([
+            ResultRow("Arsenal FC", "Chelsea", self.kickoff, 2, 0),
+            ResultRow("Spurs", "Everton", self.kickoff + timedelta(hours=3), 1, 1),
+            ResultRow("Nobody", "Else", self.kickoff, 0, 0),
+        ])
+        self.assertEqual((updated, len(unmatched)), (2, 1))
+
+        result = settle()
+        self.assertEqual((result.matches, result.tips, result.correct), (2, 4, 1))
+        self.assertEqual(set(arsenal.tips.values_list('source__name', 'is_correct')), {("Sharp", True), ("Blunt", False)})
+        self.assertEqual(self.totals(self.sharp), ((2, 1), (2, 1)))
+        self.assertEqual(self.sharp.accuracy_score, 50.0)
+        arsenal.refresh_from_db()
+        self.assertEqual((arsenal.status, arsenal.result), ('finished', '1'))
+
+        # Nothing new: a second run does nothing
+        self.assertEqual(settle().matches, 0)
+
+        # A corrected score takes the old outcome back out of the totals before re-scoring
+        record_results([ResultRow("Arsenal", "Chelsea", self.kickoff, 0, 1)])
+        settle()
+        self.assertEqual(self.totals(self.sharp), ((2, 0), (2, 0)))
+        self.assertEqual(self.totals(self.blunt), ((2, 1), (2, 1)))
+
+    def test_cost_does_not_grow_with_history(self):
+        def settle_one(home, hours):
+            self.add_match(home, "Away", hours)
+            record_results([ResultRow(home, "Away", self.kickoff + timedelta(hours=hours), 1, 0)])
+            with CaptureQueriesContext(connection) as queries:
+                settle()
+            return len(queries)
+
+        first = settle_one("Team 0", 0)
+        for i in range(1, 10):
+            settle_one(f"Team {i}", i * 5)
+        self.assertEqual(settle_one("Team 10", 50), first)
+
+    def test_ingest_results_command(self):
+        self.add_match("Arsenal", "Chelsea")
+        kickoff = timezone.localtime(self.kickoff).strftime("%Y-%m-%d %H:%M")
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+            csv_file.write(f"home_team,away_team,kickoff,home_score,away_score\nArsenal,Chelsea,{kickoff},0,0\n")
+        self.addCleanup(os.remove, csv_file.name)
+
+        out = StringIO()
+        call_command('ingest_results', csv_file.name, '--settle', stdout=out)
+        self.assertIn("Recorded 1 results, 0 unmatched", out.getvalue())
+        self.assertEqual(Tip.objects.filter(is_correct=False).count(), 2)
+
+    def test_ingest_results_reports_bad_lines(self):
+        header = "home_team,away_team,kickoff,home_score,away_score\n"
+        for line, error in [("Arsenal,Chelsea,2026-02-30 10:00,1,0", "Line 2: day is out of range"),
+                            ("Arsenal,Chelsea,soon,1,0", "Line 2: bad kickoff 'soon'"),
+                            ("Arsenal,Chelsea", "Line 2: bad kickoff ''"),
+                            ("Arsenal,Chelsea,2026-02-10 10:00,1", "Line 2: invalid literal")]:
+            with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+                csv_file.write(header + line + "\n")
+            self.addCleanup(os.remove, csv_file.name)
+            with self.assertRaisesMessage(CommandError, error):
+                call_command('ingest_results', csv_file.name, stdout=StringIO())
+
+
+class WeightedConsensusTests(TestCase):
+    def setUp(self):
+        self.premier = League.objects.create(name="Premier League", country="England")
+        self.liga = League.objects.create(name="La Liga", country="Spain")
+        self.sharp = Source.objects.create(name="Sharp", url="https://example.com", accuracy_score=80)
+        self.blunt = Source.objects.create(name="Blunt", url="https://example.com", accuracy_score=40)
+        start = timezone.now() + timedelta(days=1)
+        self.matches = {}
+        for league in (self.premier, self.liga):
+            match = Match.objects.create(league=league, home_team=f"{league.name} Home", away_team="Away",
+                                         start_time=start)
+            Tip.objects.create(match=match, source=self.sharp, prediction='1')
+            Tip.objects.create(match=match, source=self.blunt, prediction='2')
+            self.matches[league.pk] = match
+
+    def shares(self, league):
+        return Match.objects.get(pk=self.matches[league.pk].pk).get_weighted_consensus()
+
+    def test_tips_count_for_their_source_accuracy(self):
+        self.assertEqual(refresh_weighted_consensus(), 2)
+        shares = self.shares(self.premier)
+        self.assertAlmostEqual(shares['1'], 200 / 3)
+        self.assertAlmostEqual(shares['2'], 100 / 3)
+        self.assertEqual(shares['X'], 0)
+
+        # Nothing moved: nothing is rewritten
+        self.assertEqual(refresh_weighted_consensus(), 0)
+
+    @mock.patch('predictions.weighting.MIN_SCORED', 10)
+    def test_league_accuracy_overrides_overall(self):
+        # Blunt is the better source in Spain, with enough settled tips to count
+        SourceAccuracy.objects.create(source=self.blunt, league=self.liga, tips_scored=10, tips_correct=9, accuracy=90)
+        SourceAccuracy.objects.create(source=self.sharp, league=self.premier, tips_scored=5, tips_correct=0, accuracy=0)
+        refresh_weighted_consensus()
+        self.assertAlmostEqual(self.shares(self.liga)['2'], 90 * 100 / 170)
+        # Too few settled tips in England: the overall 80 still applies
+        self.assertAlmostEqual(self.shares(self.premier)['1'], 200 / 3)
+
+        refresh_weighted_consensus(per_league=False)
+        self.assertAlmostEqual(self.shares(self.liga)['2'], 100 / 3)
+
+    def test_only_moved_matches_are_rewritten(self):
+        refresh_weighted_consensus()
+        build_snapshots(match.pk for match in self.matches.values())
+        Tip.objects.create(match=self.matches[self.liga.pk], source=Source.objects.create(
+            name="Third", url="https://example.com", accuracy_score=80), prediction='X')
+        build_snapshots(match.pk for match in self.matches.values())
+
+        self.assertEqual(refresh_weighted_consensus(), 1)
+        self.assertEqual(list(MatchSnapshot.objects.values_list('match_id', flat=True)),
+                         [self.matches[self.premier.pk].pk])
+        self.assertAlmostEqual(self.shares(self.liga)['X'], 40.0)
+
+    def test_finished_matches_are_left_alone(self):
+        Match.objects.filter(pk=self.matches[self.liga.pk].pk).update(start_time=timezone.now() - timedelta(days=1))
+        self.assertEqual(refresh_weighted_consensus(), 1)
+        self.assertIsNone(self.shares(self.liga))
+
+
+class IngestTipsTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.source = Source.objects.create(name="Forebet", url="https://example.com", accuracy_score=80.0)
+        self.kickoff = self.now + timedelta(hours=5)
+
+    def test_bulk_ingest_creates_matches_and_tips(self):
+        rows = [
+            ScrapedTip("Arsenal", "Chelsea", self.kickoff, '1', "Correct Score: 2 - 0"),
+            ScrapedTip("Leeds", "Everton", self.kickoff, 'X'),
+            ScrapedTip("Old", "Game", self.now - timedelta(hours=1), '2'),
+        ]
+        result = ingest_tips(self.source, rows, self.now)
+
+        self.assertEqual((result.inserted, result.updated, result.skipped), (2, 0, 1))
+        self.assertEqual(Match.objects.count(), 2)
+        match = Match.objects.get(home_team="Arsenal")
+        self.assertEqual(match.slug, match.build_slug())
+        self.assertEqual(match.home_votes, 1)
+
+    def test_reingest_matches_existing_rows_and_updates_changes(self):
+        ingest_tips(self.source, [ScrapedTip("Arsenal FC", "Chelsea", self.kickoff, '1')], self.now)
+
+        rows = [ScrapedTip("Arsenal", "Chelsea FC", self.kickoff + timedelta(hours=1), '2')]
+        index = MatchIndex.build(self.now)
+        # Savepoints, tip lookup and upsert, consensus (3 UPDATEs, snapshot DELETE, kickoffs for the sitemap)
+        with self.assertNumQueries(9):
+            result = ingest_tips(self.source, rows, self.now, index)
+
+        self.assertEqual((result.inserted, result.updated), (0, 1))
+        self.assertEqual(Match.objects.count(), 1)
+        self.assertEqual(Match.objects.get().away_votes, 1)
+
+    def test_slug_clash_with_unloaded_match_is_not_attached(self):
+        # Same teams and day, but far enough from the scraped kickoff that the index misses it
+        league = League.objects.create(name="Premier League", country="England")
+        kickoff = timezone.localtime(self.now).replace(hour=23, minute=0) + timedelta(days=1)
+        other = Match.objects.create(league=league, home_team="Arsenal", away_team="Chelsea",
+                                     start_time=kickoff - timedelta(hours=10))
+
+        with self.assertLogs('predictions.ingestion', 'WARNING'):
+            result = ingest_tips(self.source, [ScrapedTip("Arsenal", "Chelsea", kickoff, '1')], self.now)
+        self.assertEqual((result.inserted, result.matches_created), (0, 0))
+        self.assertEqual(result.skip_reasons["slug taken by another match"], 1)
+        self.assertFalse(other.tips.exists())
+
+    def test_a_failed_source_leaves_no_phantom_matches_in_the_shared_index(self):
+        index = MatchIndex.build(self.now)
+        row = ScrapedTip("Arsenal", "Chelsea", self.kickoff, '1')
+        with mock.patch('predictions.ingestion.refresh_consensus', side_effect=DatabaseError("disk I/O error")):
+            with self.assertRaises(DatabaseError):
+                ingest_tips(self.source, [row], self.now, index)
+        self.assertFalse(Match.objects.exists())
+
+        # The next source in the run creates the match itself instead of pointing at the rolled-back id
+        other = Source.objects.create(name="Betwizad", url="https://example.com")
+        result = ingest_tips(other, [row], self.now, index)
+        self.assertEqual((result.inserted, result.matches_created), (1, 1))
+        self.assertEqual(Match.objects.get().home_votes, 1)
+
+
+class MatchIndexTests(TestCase):
+    def setUp(self):
+        self.kickoff = timezone.now() + timedelta(days=1)
+        league = League.objects.create(name="Premier League", country="England")
+        for home, away in [("Manchester City", "Arsenal"), ("Manchester United", "Chelsea")]:
+            Match.objects.create(league=league, home_team=home, away_team=away, start_time=self.kickoff)
+
+    def test_normalize_drops_only_whole_fluff_tokens(self):
+        self.assertEqual(normalize_team_name("Atlético Madrid FC"), "atletico madrid")
+        self.assertEqual(normalize_team_name("Manchester City"), "manchester city")
+        self.assertEqual(normalize_team_name("Fcsb"), "fcsb")
+
+    def test_exact_lookup_respects_window_and_does_not_merge_similar_clubs(self):
+        index = MatchIndex.build(timezone.now())
+        entry, confidence = index.lookup("Man City", "Chelsea", self.kickoff)
+        self.assertIsNone(entry)
+
+        entry, confidence = index.lookup("Manchester United FC", "Chelsea", self.kickoff + timedelta(hours=2))
+        self.assertEqual((entry['home_team'], confidence), ("Manchester United", 1.0))
+
+        entry, _ = index.lookup("Manchester United", "Chelsea", self.kickoff + timedelta(hours=5))
+        self.assertIsNone(entry)
+
+    def test_fuzzy_hit_is_learned_as_alias(self):
+        index = MatchIndex.build(timezone.now())
+        entry, confidence = index.lookup("Manchester Utd", "Chelsea", self.kickoff)
+        self.assertEqual(entry['home_team'], "Manchester United")
+        self.assertLess(confidence, 1.0)
+
+        index.save_aliases()
+        alias = TeamAlias.objects.get(key="manchester utd")
+        self.assertEqual(alias.team_key, "manchester united")
+
+        entry, confidence = MatchIndex.build(timezone.now()).lookup("Manchester Utd", "Chelsea", self.kickoff)
+        self.assertEqual(confidence, 1.0)
+
+    def test_other_sides_of_a_club_and_subset_names_do_not_match(self):
+        for a, b in [("arsenal women", "arsenal"), ("real madrid b", "real madrid"), ("chelsea u21", "chelsea"),
+                     ("inter miami", "inter"), ("river plate montevideo", "river plate"), ("al ahly", "al hilal")]:
+            self.assertLess(similarity(a, b), FUZZY_THRESHOLD, (a, b))
+            self.assertLess(similarity(b, a), FUZZY_THRESHOLD, (b, a))
+        self.assertEqual(normalize_team_name("Chelsea U-21"), "chelsea u21")
+
+        index = MatchIndex.build(timezone.now())
+        self.assertEqual(index.lookup("Manchester United", "Chelsea U21", self.kickoff), (None, 0.0))
+        self.assertEqual(index.save_aliases(), 0)
+
+    def test_only_confident_fuzzy_hits_become_aliases(self):
+        Match.objects.create(league=League.objects.get(), home_team="Atletico de Madrid", away_team="Getafe",
+                             start_time=self.kickoff)
+        index = MatchIndex.build(timezone.now())
+        entry, confidence = index.lookup("Atletico Madrid", "Getafe", self.kickoff)
+        self.assertEqual(entry['home_team'], "Atletico de Madrid")
+        self.assertLess(confidence, ALIAS_THRESHOLD)
+        index.save_aliases()
+        self.assertFalse(TeamAlias.objects.exists())
+
+
+class FetcherTests(SimpleTestCase):
+    def test_same_body_without_validators_is_unchanged(self):
+        session = mock.Mock()
+        session.get.return_value = mock.Mock(status_code=200, content=b"<html></html>", headers={})
+        with tempfile.TemporaryDirectory() as cache_dir:
+            fetcher = Fetcher(retries=1, rate=1000, cache=HttpCache(cache_dir))
+            with mock.patch('predictions.fetching.create_session', return_value=session):
+                first = fetcher.fetch("https://example.com/a")
+                fetcher.remember(first)
+                second = fetcher.fetch("https://example.com/a")
+        self.assertEqual((first.unchanged, second.unchanged), (False, True))
+
+
+class HttpCacheTests(SimpleTestCase):
+    def test_round_trip_and_validators(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HttpCache(cache_dir)
+            self.assertEqual(cache.validators("https://example.com/a"), {})
+            cache.store("https://example.com/a", b"<html>a</html>", etag='"v1"', last_modified="Sat, 17 Oct 2026 10:00:00 GMT")
+            self.assertEqual(cache.body("https://example.com/a"), b"<html>a</html>")
+            self.assertEqual(cache.validators("https://example.com/a"),
+                             {'If-None-Match': '"v1"', 'If-Modified-Since': "Sat, 17 Oct 2026 10:00:00 GMT"})
+
+    def test_evicts_least_recently_used_pages_over_the_cap(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HttpCache(cache_dir, max_bytes=10 ** 9)
+            for i, url in enumerate(["https://example.com/a", "https://example.com/b", "https://example.com/c"]):
+                cache.store(url, os.urandom(2000))
+                # Spread the access times so the LRU order does not depend on timer resolution
+                meta_path = cache._paths(url)[0]
+                os.utime(meta_path, (1000 + i, 1000 + i))
+            os.utime(cache._paths("https://example.com/a")[0], (2000, 2000))  # a was used most recently
+
+            cache.max_bytes = 5000
+            cache.evict()
+            self.assertIsNotNone(cache.meta("https://example.com/a"))
+            self.assertIsNone(cache.meta("https://example.com/b"))
+            self.assertIsNotNone(cache.meta("https://example.com/c"))
+
+
+FOREBET_PAGE = b"""
+<div class="schema">
+  <div class="rcnt"><span class="homeTeam">Gor Mahia</span><span class="awayTeam">AFC Leopards</span>
+    <span class="date_bah">18/11 15:00</span><span class="forepr">2 - 1</span></div>
+  <div class="rcnt"><span class="homeTeam">Tusker</span><span class="awayTeam">Bandari</span>
+    <span class="date_bah">18/11 17:00</span><span class="forepr">0 - 0</span></div>
+  <div class="rcnt"><span class="homeTeam">Broken row</span></div>
+</div>
+"""
+
+
+class SourceRegistryTests(TestCase):
+    def test_filters(self):
+        self.assertEqual([a.key for a in get_adapters(['forebet-kenya'])], ['forebet-kenya'])
+        self.assertNotIn('forebet-kenya', [a.key for a in get_adapters()])
+        self.assertNotIn('betwizad', [a.key for a in get_adapters(exclude=['betwizad'])])
+        with self.assertRaises(KeyError):
+            get_adapters(['nope'])
+
+    def test_run_sources_parses_and_ingests_into_adapter_league(self):
+        session = mock.Mock()
+        session.get.return_value = mock.Mock(status_code=200, content=FOREBET_PAGE)
+        now = timezone.make_aware(timezone.datetime(2025, 11, 18, 9, 0))
+
+        with mock.patch('predictions.fetching.create_session', return_value=session):
+            runs = list(run_sources(get_adapters(['forebet-kenya']), now, Fetcher(rate=1000), parse_workers=0))
+
+        self.assertEqual(len(runs), 1)
+        self.assertEqual((runs[0].error, runs[0].rows, runs[0].result.inserted), ("", 2, 2))
+        gor = Match.objects.get(home_team="Gor Mahia")
+        self.assertEqual((gor.league.name, gor.home_votes), ("Kenya Premier League", 1))
+        self.assertEqual(timezone.localtime(gor.start_time).hour, 15)
+        self.assertEqual(Tip.objects.get(match__home_team="Tusker").prediction, 'X')
+
+        telemetry = runs[0].telemetry()
+        self.assertEqual((telemetry['http_status'], telemetry['rows_seen'], telemetry['rows_parsed']), (200, 3, 2))
+        self.assertEqual(telemetry['rejected'], {"no teams": 1})
+        self.assertEqual((telemetry['matches_created'], telemetry['items_created']), (2, 2))
+
+    def test_run_sources_retries_transient_fetch_errors(self):
+        session = mock.Mock()
+        session.get.side_effect = [
+            mock.Mock(status_code=503, content=b""),
+            mock.Mock(status_code=200, content=FOREBET_PAGE),
+        ]
+        fetcher = Fetcher(workers=2, retries=3, backoff=0, rate=1000)
+        now = timezone.make_aware(timezone.datetime(2025, 11, 18, 9, 0))
+
+        with mock.patch('predictions.fetching.create_session', return_value=session):
+            runs = list(run_sources(get_adapters(['forebet-kenya']), now, fetcher, parse_workers=0))
+
+        self.assertEqual((runs[0].error, runs[0].fetched.attempts, runs[0].result.inserted), ("", 2, 2))
+        session.get.assert_called_with(get_adapters(['forebet-kenya'])[0].urls[0], timeout=fetcher.timeout,
+                                       headers={})
+
+    def test_parse_pool_works_under_spawn(self):
+        # A spawned worker starts with no settings and no registry; the initializer sets both up
+        now = timezone.make_aware(timezone.datetime(2025, 11, 18, 9, 0))
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=init_parse_worker) as pool:
+            rows, _, stats = pool.submit(parse_page, 'forebet-kenya', now, FOREBET_PAGE).result()
+        self.assertEqual((len(rows), stats['seen']), (2, 3))
+
+
+class ReplayTests(TestCase):
+    def test_scrape_all_from_fixture(self):
+        with replay() as transport:
+            call_command('scrape_all', '--source', 'forebet', '--parse-workers', '0', stdout=StringIO())
+        self.assertEqual(len(transport.requests), 1)
+        self.assertTrue(Tip.objects.filter(source__name="Forebet").exists())
+        match = Match.objects.filter(total_votes__gt=0).first()
+        self.assertEqual(match.total_votes, match.tips.count())
+
+        source_run = ScrapeSourceRun.objects.get()
+        self.assertEqual((source_run.run.command, source_run.source, source_run.http_status),
+                         ('scrape_all', 'forebet', 200))
+        self.assertEqual(source_run.items_created, Tip.objects.count())
+        self.assertGreater(source_run.bytes, 0)
+        self.assertIsNotNone(source_run.run.finished_at)
+
+    def test_second_run_skips_unchanged_pages(self):
+        with replay():
+            call_command('scrape_all', '--source', 'forebet', '--parse-workers', '0', stdout=StringIO())
+            tips = Tip.objects.count()
+            with mock.patch('predictions.sources.runner.ingest_tips') as ingest:
+                call_command('scrape_all', '--source', 'forebet', '--parse-workers', '0', stdout=StringIO())
+        ingest.assert_not_called()
+        self.assertEqual(Tip.objects.count(), tips)
+
+        first, second = ScrapeSourceRun.objects.order_by('run__started_at', 'id')
+        self.assertEqual((first.unchanged, second.unchanged), (False, True))
+        self.assertEqual((second.http_status, second.bytes, second.rows_parsed), (304, 0, 0))
+
+    def test_unknown_url_is_404(self):
+        with replay({}):
+            result = Fetcher(retries=1, rate=1000).fetch("https://example.com/missing")
+        self.assertEqual(result.status, 404)
+        self.assertFalse(result.ok)
+
+
+class HotQueryPlanTests(TestCase):
+    def test_listing_queries_use_match_indexes(self):
+        league = League.objects.create(name="Premier League", country="England")
+        Match.objects.create(league=league, home_team="Arsenal", away_team="Chelsea",
+                             start_time=timezone.now() + timedelta(days=1))
+        out = StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        plans = out.getvalue()
+
+        self.assertIn("index: next 20 matches", plans)
+        self.assertRegex(plans, r"match_(status|scheduled)_start_idx")
+        self.assertIn("match_league_status_start_idx", plans)
+        self.assertIn("match_status_date_idx", plans)
+        self.assertIn("match_league_start_idx", plans)
+
+    def test_sitemap_plan_is_of_the_query_the_sitemap_runs(self):
+        out = StringIO()
+        call_command('explain_hot_queries', '--sql', stdout=out)
+        sitemap = out.getvalue().split("sitemap: one month of matches")[1].split("sitemap: index of months")[0]
+        self.assertIn('"updated_at"', sitemap)
+
+    def test_one_tip_per_source_and_match(self):
+        league = League.objects.create(name="Premier League", country="England")
+        match = Match.objects.create(league=league, home_team="Arsenal", away_team="Chelsea",
+                                     start_time=timezone.now() + timedelta(days=1))
+        source = Source.objects.create(name="Forebet", url="https://example.com")
+        Tip.objects.create(match=match, source=source, prediction='1')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Tip.objects.create(match=match, source=source, prediction='2')
@@ -1,8 +1,13 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.prediction_list, name='all_predictions'),
+    # JSON API (see predictions/api.py); before the match slug catch-all
+    path('api/matches/', api.match_list, name='api_matches'),
+    path('api/matches/<slug:slug>/', api.match_detail, name='api_match_detail'),
+    path('api/consensus/', api.consensus, name='api_consensus'),
     path('league/<slug:league_slug>/', views.league_detail, name='league_detail'),
+    path('league/<slug:league_slug>/archive/', views.league_archive, name='league_archive'),
     path('<slug:slug>/', views.match_detail, name='match_detail'),
 ]
@@ -1,103 +1,177 @@
 from datetime import timedelta
 
-from django.core.paginator import Paginator
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
 from django.shortcuts import render, get_object_or_404
 from django.db.models import Count, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
-from .models import Match, League, Tip
+from core.cache import cache_public_page, data_version
+from core.conditional import conditional_page, league_modified, listing_modified, match_modified
+from core.pagination import CURSOR_PARAM, paginate
 
+from .models import Match, League
+from .snapshots import load_snapshot
+from .summaries import league_summaries
 
-def prediction_list(request):
-    # 1. Base Query: Future matches only
-    now = timezone.now()
-    matches = Match.objects.filter(status='scheduled', start_time__gt=now).select_related('league').order_by('start_time')
 
-    # 2. Filtering Logic
-    league_slug = request.GET.get('league')
-    date_filter = request.GET.get('date') # 'today', 'tomorrow'
+# Days listed with their match counts in the prediction_list sidebar
+SIDEBAR_DAYS = 7
+# Matches per league page (upcoming or archive)
+LEAGUE_PAGE_SIZE = 20
+
+
+def parse_day(value):
+    """A YYYY-MM-DD string as a date, or None if it is missing or not a real date."""
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def date_window(date_filter=None, date_from=None, date_to=None, today=None):
+    """
+    The (first, last) local days a listing covers, or None for no limit; either end of a
+    from/to range may be None. `date_filter` is 'today', 'tomorrow', 'weekend' or a
+    YYYY-MM-DD day and wins over the range. Values that do not parse are ignored.
+    """
+    today = today or timezone.localdate()
+    if date_filter == 'today':
+        return today, today
+    if date_filter == 'tomorrow':
+        return today + timedelta(days=1), today + timedelta(days=1)
+    if date_filter == 'weekend':
+        # The rest of this weekend on Saturday and Sunday, else the coming one
+        if today.weekday() == 6:
+            return today, today
+        saturday = today + timedelta(days=5 - today.weekday())
+        return saturday, saturday + timedelta(days=1)
+    day = parse_day(date_filter)
+    if day:
+        return day, day
+
+    first, last = parse_day(date_from), parse_day(date_to)
+    return (first, last) if first or last else None
+
+
+def upcoming_matches(league_slug=None, date_filter=None, date_from=None, date_to=None):
+    """
+    Scheduled matches yet to kick off, optionally for one league and a day or range of days
+    (see date_window). Days are Match.local_date, so each is one lookup on match_status_date_idx.
+    """
+    now = timezone.now()
+    matches = Match.objects.filter(status='scheduled', start_time__gt=now)
 
     if league_slug:
         matches = matches.filter(league__slug=league_slug)
 
-    if date_filter == 'today':
-        end_of_day = now.replace(hour=23, minute=59)
-        matches = matches.filter(start_time__range=(now, end_of_day))
-    elif date_filter == 'tomorrow':
-        start_tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0)
-        end_tomorrow = (now + timedelta(days=1)).replace(hour=23, minute=59)
-        matches = matches.filter(start_time__range=(start_tomorrow, end_tomorrow))
-
-    # 3. Pagination (20 matches per page)
-    paginator = Paginator(matches, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    window = date_window(date_filter, date_from, date_to, timezone.localdate(now))
+    if window:
+        first, last = window
+        if first == last:
+            matches = matches.filter(local_date=first)
+        else:
+            if first:
+                matches = matches.filter(local_date__gte=first)
+            if last:
+                matches = matches.filter(local_date__lte=last)
+    return matches
 
-    # 4. Context Data
-    leagues = League.objects.annotate(match_count=Count('match')).filter(match_count__gt=0).order_by('-match_count')
 
+def upcoming_day_counts(days=SIDEBAR_DAYS):
+    """
+    [(day, matches)] for today and the following days, from one GROUP BY on the date index.
+    Computed once per data version and day rather than on every page view.
+    """
+    today = timezone.localdate()
+
+    def count():
+        counts = dict(Match.objects.filter(status='scheduled', start_time__gt=timezone.now(),
+                                           local_date__range=(today, today + timedelta(days=days - 1)))
+                      .values_list('local_date').annotate(n=Count('id')).order_by())
+        return [(day, counts.get(day, 0)) for day in (today + timedelta(days=i) for i in range(days))]
+
+    return cache.get_or_set(f"day-counts:{data_version()}:{today}:{days}", count, settings.PAGE_CACHE_TIMEOUT)
+
+
+@conditional_page(listing_modified)
+@cache_public_page
+def prediction_list(request):
+    # 1. Base Query: Future matches only, 2. filtered by league and day or range of days
+    league_slug = request.GET.get('league')
+    date_filter = request.GET.get('date') # 'today', 'tomorrow', 'weekend', YYYY-MM-DD
+    date_from, date_to = request.GET.get('from'), request.GET.get('to')
+    matches = upcoming_matches(league_slug, date_filter, date_from, date_to).with_consensus()
+
+    # 3. Pagination (20 matches per page), continuing from the last kickoff shown
+    page_obj = paginate(matches, request.GET.get(CURSOR_PARAM), 20, 'start_time',
+                        count_key=f"predictions:{league_slug}:{date_window(date_filter, date_from, date_to)}")
+
+    # 4. Context Data
     context = {
         'matches': page_obj,
-        'leagues': leagues,
+        'leagues': league_summaries(),
+        'days': upcoming_day_counts(),
         'current_league': league_slug,
-        'current_date': date_filter
+        'current_date': date_filter,
+        'current_from': date_from,
+        'current_to': date_to,
     }
     return render(request, 'predictions/match_list.html', context)
 
 
-def league_detail(request, league_slug):
-    """
-    SEO Page: Shows predictions specific to one league (e.g., /predictions/premier-league/)
-    """
+def league_page(request, league_slug, archive):
     league = get_object_or_404(League, slug=league_slug)
-    matches = Match.objects.filter(league=league, status='scheduled') \
-        .order_by('start_time')
+    now = timezone.now()
+    if archive:
+        # Everything that has kicked off, latest first, with its score once recorded
+        matches, order = Match.objects.filter(league=league, start_time__lte=now), '-start_time'
+    else:
+        matches, order = Match.objects.filter(league=league, status='scheduled', start_time__gt=now), 'start_time'
+
+    # Keyset pages: never more than LEAGUE_PAGE_SIZE + 1 rows loaded, however big the league
+    page_obj = paginate(matches.with_consensus(), request.GET.get(CURSOR_PARAM), LEAGUE_PAGE_SIZE, order)
 
     context = {
         'league': league,
-        'matches': matches,
-        'page_title': f'{league.name} Betting Tips & Predictions'
+        'matches': page_obj,
+        'archive': archive,
+        'leagues': league_summaries(),
+        'page_title': f'{league.name} {"Results & Past Predictions" if archive else "Betting Tips & Predictions"}'
     }
     return render(request, 'predictions/league_detail.html', context)
 
 
-def match_detail(request, slug):
+@conditional_page(league_modified)
+@cache_public_page
+def league_detail(request, league_slug):
     """
-    THE MONEY PAGE.
-    Displays the analysis, consensus, and charts for a specific match.
+    SEO Page: Shows predictions specific to one league (e.g., /predictions/premier-league/)
+    Upcoming matches only; past ones are on league_archive.
     """
-    match = get_object_or_404(Match, slug=slug)
+    return league_page(request, league_slug, archive=False)
 
-    # 1. Fetch all tips for this match with source info to avoid N+1 queries
-    all_tips = match.tips.select_related('source').all()
 
-    # 2. Separate "Trusted" sources (Accuracy > 55%) from others
-    # This adds "Programmatic Value" by filtering bad advice
-    trusted_tips = [t for t in all_tips if t.source.accuracy_score >= 55.0]
-    other_tips = [t for t in all_tips if t.source.accuracy_score < 55.0]
+@conditional_page(league_modified)
+@cache_public_page
+def league_archive(request, league_slug):
+    """The league's matches that have kicked off, newest first, with their results."""
+    return league_page(request, league_slug, archive=True)
 
-    # 3. Get Consensus Data (Using the method we added to the Model)
-    consensus = match.get_consensus_data()
 
-    # 4. Prepare Data for Chart.js (Must be a simple list: [Home%, Draw%, Away%])
-    # We handle the case where consensus is None (no tips yet)
-    if consensus:
-        chart_data = [consensus['1'], consensus['X'], consensus['2']]
-    else:
-        chart_data = [0, 0, 0]  # Empty chart
-
-    context = {
-        'match': match,
-        'trusted_tips': trusted_tips,
-        'other_tips': other_tips,
-        'consensus': consensus,
-        'chart_data': chart_data,
-        'total_votes': len(all_tips)
-    }
+@conditional_page(match_modified)
+@cache_public_page
+def match_detail(request, slug):
+    """
+    THE MONEY PAGE.
+    Displays the analysis, consensus, and charts for a specific match.
+    Everything comes from the match's precomputed snapshot (see predictions/snapshots.py): one read.
+    """
+    snapshot = load_snapshot(slug)
+    if snapshot is None:
+        raise Http404("No Match matches the given query.")
 
+    context = dict(snapshot, tips=snapshot['trusted_tips'] + snapshot['other_tips'])
     return render(request, 'predictions/match_detail.html', context)
-
-
-from django.shortcuts import render
-
-# Create your views here.
@@ -0,0 +1,118 @@
+"""
+Accuracy-weighted consensus, computed in one vectorized pass.
+
+The stored consensus (predictions.consensus) is a raw vote share: every tip
+counts once. Here each tip counts for its source's accuracy instead, or for
+the source's accuracy in the match's league once that has MIN_SCORED settled
+tips. refresh_weighted_consensus() loads (match, source, league, prediction)
+for every upcoming match's tips into NumPy arrays, sums the weights per match
+and outcome with a single bincount, and upserts only the matches whose shares
+moved into WeightedConsensus.
+"""
+import logging
+import time
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import bump_data_version_on_commit
+from core.sitemaps import invalidate_matches_on_commit
+
+from .models import Match, Source, SourceAccuracy, Tip, WeightedConsensus
+from .settlement import MIN_SCORED
+from .snapshots import invalidate_snapshots
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = '1X2'
+# Sources with no accuracy yet still count, barely
+MIN_WEIGHT = 1.0
+# Shares that moved by less than this (in points) are not rewritten
+TOLERANCE = 0.01
+BATCH_SIZE = 500
+
+
+def _lookup(keys, values, default):
+    """Vectorized dict lookup: values[i] where keys[i] == each query, `default` where absent."""
+    order = np.argsort(keys)
+    keys, values = keys[order], values[order]
+
+    def get(query):
+        if not len(keys):
+            return np.full(len(query), default, dtype=float)
+        pos = np.clip(np.searchsorted(keys, query), 0, len(keys) - 1)
+        return np.where(keys[pos] == query, values[pos], default)
+    return get
+
+
+def weighted_shares(match_ids, source_ids, league_ids, outcomes, per_league=True):
+    """
+    Arrays in, arrays out: one row per tip (outcomes as 0/1/2 for 1/X/2). Returns
+    (matches, shares) where shares[i] are the weighted 1/X/2 percentages of matches[i].
+    """
+    accuracy = list(Source.objects.values_list('id', 'accuracy_score'))
+    source_keys = np.array([pk for pk, _ in accuracy], dtype=np.int64)
+    source_acc = np.array([score for _, score in accuracy], dtype=float)
+    weights = _lookup(source_keys, source_acc, 0.0)(source_ids)
+
+    if per_league:
+        measured = list(SourceAccuracy.objects.filter(tips_scored__gte=MIN_SCORED)
+                        .values_list('source_id', 'league_id', 'accuracy'))
+        if measured:
+            pairs, league_acc = np.array([(s, l) for s, l, _ in measured]), np.array([a for _, _, a in measured])
+            # (source, league) packed into one int64 key so the lookup stays a single searchsorted
+            span = int(max(league_ids.max(initial=0), pairs[:, 1].max())) + 1
+            by_league = _lookup(pairs[:, 0] * span + pairs[:, 1], league_acc, np.nan)(source_ids * span + league_ids)
+            weights = np.where(np.isnan(by_league), weights, by_league)
+
+    weights = np.maximum(weights, MIN_WEIGHT)
+    matches, index = np.unique(match_ids, return_inverse=True)
+    sums = np.bincount(index * 3 + outcomes, weights=weights, minlength=len(matches) * 3).reshape(-1, 3)
+    totals = sums.sum(axis=1, keepdims=True)
+    shares = np.divide(sums * 100, totals, out=np.zeros_like(sums), where=totals > 0)
+    return matches, shares
+
+
+def refresh_weighted_consensus(now=None, per_league=True):
+    """Recomputes the weighted consensus of every upcoming match. Returns the number of matches rewritten."""
+    now = now or timezone.now()
+    started = time.monotonic()
+    upcoming = Match.objects.filter(status='scheduled', start_time__gt=now)
+
+    tips = list(Tip.objects.filter(match__in=upcoming, prediction__in=list(OUTCOMES))
+                .values_list('match_id', 'source_id', 'match__league_id', 'prediction'))
+    if not tips:
+        return 0
+
+    # One (n, 3) int array for the ids, then the predictions mapped to 0/1/2
+    ids = np.array([tip[:3] for tip in tips], dtype=np.int64)
+    outcomes = np.array([OUTCOMES.index(tip[3]) for tip in tips], dtype=np.int64)
+    matches, shares = weighted_shares(ids[:, 0], ids[:, 1], ids[:, 2], outcomes, per_league)
+
+    # Only rewrite the matches whose shares moved
+    stored = {pk: shares for pk, *shares in WeightedConsensus.objects.filter(match__in=upcoming)
+              .values_list('match_id', 'home_pct', 'draw_pct', 'away_pct')}
+    current = np.array([stored.get(pk, (-1.0,) * 3) for pk in matches.tolist()], dtype=float).reshape(-1, 3)
+    changed = np.abs(current - shares).max(axis=1) >= TOLERANCE
+
+    rows = [WeightedConsensus(match_id=int(pk), home_pct=float(home), draw_pct=float(draw), away_pct=float(away),
+                              updated_at=now)
+            for pk, (home, draw, away) in zip(matches[changed], shares[changed])]
+    with transaction.atomic():
+        for i in range(0, len(rows), BATCH_SIZE):
+            batch = rows[i:i + BATCH_SIZE]
+            ids = [row.match_id for row in batch]
+            WeightedConsensus.objects.bulk_create(batch, update_conflicts=True, unique_fields=['match'],
+                                                  update_fields=['home_pct', 'draw_pct', 'away_pct', 'updated_at'])
+            # The match pages show the weighted figures: new Last-Modified, fresh snapshot and sitemap lastmod
+            rewritten = Match.objects.filter(pk__in=ids)
+            rewritten.update(updated_at=now)
+            invalidate_snapshots(ids)
+            invalidate_matches_on_commit(rewritten.order_by().values_list('start_time', flat=True))
+        if rows:
+            bump_data_version_on_commit()
+
+    logger.info("Weighted consensus: %d tips over %d matches, %d rewritten in %.2fs",
+                len(outcomes), len(matches), len(rows), time.monotonic() - started)
+    return len(rows)